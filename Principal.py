@@ -2,20 +2,33 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from utils.carrega_dados import carregar_dados, obter_estatisticas_basicas
+from utils.carrega_dados import carregar_faixas, obter_estatisticas_basicas, relatorio_deduplicacao, versao_dataset
+from utils.desempenho import iniciar_medicao, medir
+from utils.painel import exibir_estatisticas_cache, exibir_grafico, exibir_painel_desempenho, exibir_relatorio_colunas
+
+# Colunas usadas por esta página: só elas são lidas do armazém e calculadas
+COLUNAS_PAGINA = [
+    'track_name', 'primeiro_artista', 'album_name', 'track_genre', 'popularity', 'duration_min',
+    'energy', 'danceability', 'categoria_popularidade'
+]
 
 st.set_page_config(
     page_title="Spotify Music Analytics",
     page_icon="🏠",
     layout="wide"
 )
+iniciar_medicao('Principal')
 
 st.title("🏠 Spotify Music Analytics")
 st.markdown("### Dashboard Interativo para Análise de Dados Musicais do Spotify")
 
-# Carrega os dados usando a função cacheada
-df = carregar_dados()
-stats = obter_estatisticas_basicas()
+# Carrega os dados usando a função cacheada (uma linha por faixa única)
+with medir('carregar dados', 'dados'):
+    # Versão do CSV: chave dos caches do armazém (muda quando o dataset muda)
+    versao = versao_dataset()
+    df = carregar_faixas(versao, COLUNAS_PAGINA)
+    stats = obter_estatisticas_basicas(versao)
+exibir_relatorio_colunas(versao, COLUNAS_PAGINA)
 
 # Header com métricas principais
 st.markdown("---")
@@ -90,7 +103,7 @@ with col2:
     **🎸 Gênero Mais Comum**
     
     **{stats['genero_mais_comum'].title()}**  
-    ({df['track_genre'].value_counts().iloc[0]:,} faixas)
+    ({stats['tracks_genero_mais_comum']:,} faixas)
     """)
 
 # Gráfico de popularidade geral
@@ -105,7 +118,7 @@ fig_pop = px.histogram(
     color_discrete_sequence=['#1DB954']
 )
 fig_pop.update_layout(height=400)
-st.plotly_chart(fig_pop, use_container_width=True)
+exibir_grafico(fig_pop, use_container_width=True)
 
 # Preview dos dados
 st.markdown("---")
@@ -153,6 +166,19 @@ with col2:
     - **Assinaturas temporais**: de 0 a 5 batidas por compasso
     """)
 
+with st.expander("🧹 Deduplicação de faixas"):
+    dedup = relatorio_deduplicacao(versao)
+    st.markdown(f"""
+    No CSV original a mesma faixa aparece uma vez para cada gênero em que está classificada.
+    O dashboard trabalha com uma tabela de faixas únicas e uma matriz esparsa faixa × gênero.
+    
+    - **Pares faixa × gênero**: {dedup['pares_faixa_genero']:,}
+    - **Faixas únicas**: {dedup['faixas_unicas']:,} ({dedup['linhas_duplicadas']:,} linhas duplicadas removidas)
+    - **Memória estimada do formato original**: {dedup['bytes_originais'] / 1024**2:,.1f} MB
+    - **Memória da tabela canônica + matriz**: {dedup['bytes_canonicos'] / 1024**2:,.1f} MB
+    - **Economia**: {dedup['bytes_economizados'] / 1024**2:,.1f} MB
+    """)
+
 st.markdown("""
 ---
 **🎨 Desenvolvido com Streamlit | 📊 Visualizações com Plotly | 🐍 Python & Pandas**
@@ -173,9 +199,11 @@ with st.sidebar:
     
     st.markdown("---")
     st.subheader("🎯 Top Gênero")
-    top_genre = df['track_genre'].value_counts().head(1)
-    st.write(f"**{top_genre.index[0]}**")
-    st.write(f"{top_genre.iloc[0]:,} faixas")
+    st.write(f"**{stats['genero_mais_comum']}**")
+    st.write(f"{stats['tracks_genero_mais_comum']:,} faixas")
     
     st.markdown("---")
     st.info("💡 Use as páginas do menu para explorar análises detalhadas!")
+
+exibir_estatisticas_cache()
+exibir_painel_desempenho()
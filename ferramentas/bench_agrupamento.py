@@ -0,0 +1,61 @@
+"""
+Mede o ganho dos agrupamentos sobre códigos inteiros em relação ao pandas com strings
+
+Uso (a partir da raiz do projeto):
+    python -m ferramentas.bench_agrupamento
+"""
+import time
+
+import numpy as np
+
+from utils.agrupamento import agrupar, contagem_valores, num_unicos
+from utils.carrega_dados import COLUNAS_CODIFICADAS, carregar_faixas, versao_dataset
+
+AGREGACOES = {
+    'track_id': 'count',
+    'popularity': ['mean', 'std', 'max'],
+    'danceability': 'mean',
+    'energy': 'mean',
+    'valence': 'mean',
+    'acousticness': 'mean',
+    'duration_min': 'mean'
+}
+
+
+def cronometrar(funcao, repeticoes=5):
+    """
+    Retorna o melhor tempo (em ms) entre algumas execuções
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) * 1000
+
+def main():
+    df = carregar_faixas(versao_dataset())
+    df_texto = df.astype({coluna: object for coluna in COLUNAS_CODIFICADAS})
+
+    print(f"{len(df):,} faixas")
+    print(f"{'operação':<36}{'strings (ms)':>14}{'códigos (ms)':>14}{'ganho':>8}")
+
+    for coluna in COLUNAS_CODIFICADAS:
+        casos = [
+            ('value_counts', lambda: df_texto[coluna].value_counts(), lambda: contagem_valores(df[coluna])),
+            ('nunique', lambda: df_texto[coluna].nunique(), lambda: num_unicos(df[coluna])),
+            ('agg', lambda: df_texto.groupby(coluna).agg(AGREGACOES), lambda: agrupar(df, coluna, AGREGACOES)),
+        ]
+        for nome, referencia, otimizada in casos:
+            tempo_ref = cronometrar(referencia)
+            tempo_opt = cronometrar(otimizada)
+            print(f"{coluna + '.' + nome:<36}{tempo_ref:>14.2f}{tempo_opt:>14.2f}{tempo_ref / max(tempo_opt, 1e-9):>7.1f}x")
+
+    # Garante que os dois caminhos produzem os mesmos números
+    for coluna in COLUNAS_CODIFICADAS:
+        esperado = df_texto.groupby(coluna).agg(AGREGACOES)
+        obtido = agrupar(df, coluna, AGREGACOES)
+        assert np.allclose(esperado.to_numpy(dtype=float), obtido.to_numpy(dtype=float), equal_nan=True), coluna
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Executa as páginas sem navegador (AppTest) sobre datasets sintéticos e mede cada uma
+
+Para cada tamanho de dataset, gera (uma vez) um CSV sintético em
+`<diretorio>/<linhas>/Dataset/dataset.csv` e roda `Principal.py` e cada
+página de `pages/`: a carga inicial e, em seguida, uma interação por widget
+(cada uma a partir do estado padrão da página). Registra tempo de parede,
+pico de memória alocada (tracemalloc, em uma execução separada) e o tamanho
+das figuras Plotly enviadas ao navegador.
+
+Uso (a partir da raiz do projeto):
+    python -m ferramentas.bench_paginas --linhas 114000 1000000 --saida bench.json
+    python -m ferramentas.bench_paginas --linhas 114000 --paginas Artistas --sem-interacoes
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from ferramentas.dados_sinteticos import gerar_dataset
+from utils import cache_compartilhado
+
+PAGINAS = [os.path.join(RAIZ, 'Principal.py')] + sorted(glob.glob(os.path.join(RAIZ, 'pages', '*.py')))
+TEMPO_LIMITE = 600
+
+
+def _limpar_caches():
+    """
+    Esvazia os caches do Streamlit e do processo, para que cada tamanho comece do zero
+    """
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    cache_compartilhado._memoria.clear()
+
+def _preparar_dataset(diretorio, linhas):
+    """
+    Gera o CSV sintético (se ainda não existir) e remove armazém e cache derivados dele
+    """
+    pasta = os.path.join(os.path.abspath(diretorio), str(linhas))
+    caminho = os.path.join(pasta, 'Dataset', 'dataset.csv')
+    if not os.path.exists(caminho):
+        print(f"gerando {linhas:,} linhas em {caminho}...", flush=True)
+        gerar_dataset(linhas, caminho)
+    for derivado in ('colunar', 'cache'):
+        shutil.rmtree(os.path.join(pasta, 'Dataset', derivado), ignore_errors=True)
+    return pasta
+
+def _interacoes(app):
+    """
+    Lista as interações a medir: uma por widget, a partir do estado padrão
+
+    Cada interação é (descrição, função que altera o widget no AppTest).
+    """
+    interacoes = []
+
+    for i, widget in enumerate(app.selectbox):
+        if len(widget.options) > 1:
+            opcao = widget.options[1] if widget.index != 1 else widget.options[0]
+            interacoes.append((f"selectbox '{widget.label}' = {opcao}", lambda a, i=i, o=opcao: a.selectbox[i].select(o)))
+
+    for i, widget in enumerate(app.slider):
+        if isinstance(widget.value, (tuple, list)):
+            inicio, fim = widget.value
+            quarto = (fim - inicio) / 4
+            valor = (type(inicio)(inicio + quarto), type(fim)(fim - quarto))
+        else:
+            # Um quarto do intervalo: filtra sem esvaziar a página
+            valor = widget.min + (widget.max - widget.min) / 4
+            valor = type(widget.value)(round(valor / widget.step) * widget.step)
+        if valor != widget.value:
+            interacoes.append((f"slider '{widget.label}' = {valor}", lambda a, i=i, v=valor: a.slider[i].set_value(v)))
+
+    for i, widget in enumerate(app.multiselect):
+        if len(widget.value) > 1:
+            valor = list(widget.value[:1])
+            interacoes.append((f"multiselect '{widget.label}' = {valor}", lambda a, i=i, v=valor: a.multiselect[i].set_value(v)))
+
+    for i, widget in enumerate(app.radio):
+        if len(widget.options) > 1:
+            opcao = widget.options[1] if widget.index != 1 else widget.options[0]
+            interacoes.append((f"radio '{widget.label}' = {opcao}", lambda a, i=i, o=opcao: a.radio[i].set_value(o)))
+
+    return interacoes
+
+def _executar(pagina, interacao=None):
+    """
+    Roda a página (e a interação, se houver) e mede apenas a última execução
+    """
+    app = AppTest.from_file(pagina, default_timeout=TEMPO_LIMITE)
+    if interacao is not None:
+        app.run()
+        interacao(app)
+
+    inicio = time.perf_counter()
+    app.run()
+    return app, time.perf_counter() - inicio
+
+def _pico_memoria(pagina, interacao=None):
+    """
+    Pico de memória alocada durante a execução medida, em uma rodada separada (tracemalloc é lento)
+    """
+    app = AppTest.from_file(pagina, default_timeout=TEMPO_LIMITE)
+    if interacao is not None:
+        app.run()
+        interacao(app)
+
+    tracemalloc.start()
+    try:
+        app.run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def _medir(pagina, acao, interacao, linhas, repeticoes):
+    """
+    Mede uma execução da página e retorna o registro do relatório
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        app, tempo = _executar(pagina, interacao)
+        tempos.append(tempo)
+
+    figuras = [len(figura.proto.SerializeToString()) for figura in app.get('plotly_chart')]
+    return {
+        'linhas': linhas,
+        'pagina': os.path.basename(pagina),
+        'acao': acao,
+        'tempo_s': round(min(tempos), 4),
+        'tempos_s': [round(tempo, 4) for tempo in tempos],
+        'pico_memoria_mb': round(_pico_memoria(pagina, interacao) / 1024**2, 2),
+        'num_figuras': len(figuras),
+        'bytes_figuras': sum(figuras),
+        'excecoes': [excecao.value for excecao in app.exception]
+    }
+
+def _versao_codigo():
+    """
+    Commit atual do repositório, para comparar relatórios entre versões
+    """
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[114_000], help="tamanhos (ex.: 114000 1000000 10000000)")
+    parser.add_argument('--diretorio', default='bench_dados', help="onde guardar os datasets sintéticos")
+    parser.add_argument('--paginas', nargs='*', default=[], help="filtra páginas pelo nome")
+    parser.add_argument('--repeticoes', type=int, default=3, help="execuções por medida (vale a mais rápida)")
+    parser.add_argument('--sem-interacoes', action='store_true', help="mede só a carga das páginas")
+    parser.add_argument('--saida', default='bench_paginas.json')
+    args = parser.parse_args()
+
+    paginas = [p for p in PAGINAS if not args.paginas or any(filtro in p for filtro in args.paginas)]
+    diretorio_original = os.getcwd()
+    saida = os.path.abspath(args.saida)
+    resultados = []
+
+    for linhas in args.linhas:
+        pasta = _preparar_dataset(args.diretorio, linhas)
+        os.chdir(pasta)
+        _limpar_caches()
+        try:
+            # A primeira execução inclui a construção do armazém colunar e dos índices
+            app, tempo = _executar(paginas[0])
+            resultados.append({
+                'linhas': linhas, 'pagina': os.path.basename(paginas[0]), 'acao': 'carga fria',
+                'tempo_s': round(tempo, 4), 'excecoes': [excecao.value for excecao in app.exception]
+            })
+
+            for pagina in paginas:
+                app, _ = _executar(pagina)
+                acoes = [('carga', None)] + ([] if args.sem_interacoes else _interacoes(app))
+                for acao, interacao in acoes:
+                    registro = _medir(pagina, acao, interacao, linhas, args.repeticoes)
+                    resultados.append(registro)
+                    print(f"{linhas:>10,} {registro['pagina']:<30} {registro['tempo_s']:>8.3f}s "
+                          f"{registro['pico_memoria_mb']:>8.1f} MB {registro['bytes_figuras'] / 1024:>8.1f} KB  {acao}"
+                          + (f"  ERRO: {registro['excecoes'][0]}" if registro['excecoes'] else ''), flush=True)
+        finally:
+            os.chdir(diretorio_original)
+
+    relatorio = {
+        'versao': _versao_codigo(),
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultados': resultados
+    }
+    with open(saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"relatório gravado em {saida}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Compara a busca aproximada (IVF) de faixas semelhantes com a busca exata em catálogos sintéticos grandes
+
+Para cada tamanho, gera vetores padronizados com estrutura de gêneros
+(mistura de gaussianas), constrói o IVF e mede, para cada número de listas
+visitadas (`sondas`), a latência por consulta e o recall@k em relação à
+busca exata por força bruta. Mostra também a latência da KD-tree exata
+até `--max-arvore` linhas.
+
+Uso (a partir da raiz do projeto):
+    python -m ferramentas.bench_semelhanca
+    python -m ferramentas.bench_semelhanca --linhas 1000000 --sondas 4 8 16
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from utils.clusters import atribuir_clusters
+from utils.semelhanca import CARACTERISTICAS_SEMELHANCA, buscar_ivf, construir_arvore, construir_ivf
+
+# Grupos da mistura sintética (aproximadamente um por gênero do dataset)
+NUM_GRUPOS = 114
+# Linhas geradas por vez (limita a memória temporária em float64)
+BLOCO_GERACAO = 1_000_000
+# Linhas comparadas por vez na força bruta (consultas × bloco distâncias em memória)
+BLOCO_EXATO = 131_072
+
+
+def gerar_vetores(linhas, semente=0):
+    """
+    Vetores float32 com a forma da matriz padronizada: grupos de tamanhos desiguais e espalhamento variado
+    """
+    gerador = np.random.default_rng(semente)
+    dimensoes = len(CARACTERISTICAS_SEMELHANCA)
+    centros = gerador.normal(0, 1, (NUM_GRUPOS, dimensoes))
+    escalas = gerador.uniform(0.3, 0.9, (NUM_GRUPOS, dimensoes))
+    pesos = gerador.dirichlet(np.full(NUM_GRUPOS, 2.0))
+
+    vetores = np.empty((linhas, dimensoes), dtype=np.float32)
+    for inicio in range(0, linhas, BLOCO_GERACAO):
+        quantos = min(BLOCO_GERACAO, linhas - inicio)
+        grupos = gerador.choice(NUM_GRUPOS, quantos, p=pesos)
+        vetores[inicio:inicio + quantos] = centros[grupos] + escalas[grupos] * gerador.standard_normal((quantos, dimensoes))
+    return vetores
+
+def vizinhos_exatos(vetores, consultas, k):
+    """
+    K vizinhos por força bruta (em blocos), usados como gabarito do recall
+    """
+    melhores_dist = np.full((len(consultas), k), np.inf, dtype=np.float32)
+    melhores_pos = np.full((len(consultas), k), -1, dtype=np.int64)
+    for inicio in range(0, len(vetores), BLOCO_EXATO):
+        bloco = vetores[inicio:inicio + BLOCO_EXATO]
+        quadrados = (
+            (consultas ** 2).sum(axis=1)[:, None] - 2 * (consultas @ bloco.T) + (bloco ** 2).sum(axis=1)[None, :]
+        )
+        candidatos = np.argpartition(quadrados, k - 1, axis=1)[:, :k]
+        dist = np.concatenate([melhores_dist, np.take_along_axis(quadrados, candidatos, axis=1)], axis=1)
+        pos = np.concatenate([melhores_pos, candidatos + inicio], axis=1)
+        ordem = np.argsort(dist, axis=1)[:, :k]
+        melhores_dist = np.take_along_axis(dist, ordem, axis=1)
+        melhores_pos = np.take_along_axis(pos, ordem, axis=1)
+    return melhores_pos
+
+def recall(encontrados, gabarito):
+    """
+    Fração média dos k vizinhos exatos que a busca aproximada encontrou
+    """
+    return float(np.mean([
+        len(np.intersect1d(linha, esperado)) / gabarito.shape[1] for linha, esperado in zip(encontrados, gabarito)
+    ]))
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+def medir_tamanho(linhas, args):
+    print(f"\n{linhas:,} linhas")
+    vetores = gerar_vetores(linhas, args.semente)
+    gerador = np.random.default_rng(args.semente + 1)
+    consultas = vetores[gerador.choice(linhas, args.consultas, replace=False)]
+
+    ivf, segundos_ivf = cronometrar(lambda: construir_ivf(vetores, semente=args.semente))
+    print(f"  IVF: {len(ivf['centroides']):,} listas construídas em {segundos_ivf:.1f}s")
+    gabarito, segundos_exata = cronometrar(lambda: vizinhos_exatos(vetores, consultas, args.k))
+    resultado = {
+        'linhas': linhas,
+        'listas': len(ivf['centroides']),
+        'construcao_ivf_s': round(segundos_ivf, 2),
+        'forca_bruta_ms_por_consulta': round(segundos_exata * 1000 / args.consultas, 3),
+        'sondas': []
+    }
+    print(f"  força bruta: {resultado['forca_bruta_ms_por_consulta']:.3f} ms/consulta")
+
+    if linhas <= args.max_arvore:
+        arvore, segundos_arvore = cronometrar(lambda: construir_arvore(vetores))
+        _, segundos_consulta = cronometrar(lambda: arvore.query(consultas, k=args.k))
+        resultado['kdtree_construcao_s'] = round(segundos_arvore, 2)
+        resultado['kdtree_ms_por_consulta'] = round(segundos_consulta * 1000 / args.consultas, 3)
+        print(f"  KD-tree: construída em {segundos_arvore:.1f}s, {resultado['kdtree_ms_por_consulta']:.3f} ms/consulta")
+        del arvore
+
+    # Tamanho médio das listas visitadas dá a fração do catálogo lida por consulta
+    rotulos, _ = atribuir_clusters(consultas, ivf['centroides'])
+    print(f"  {'sondas':>8}{'ms/consulta':>14}{f'recall@{args.k}':>12}{'% lido':>10}")
+    for sondas in args.sondas:
+        (_, posicoes), segundos = cronometrar(lambda: buscar_ivf(ivf, consultas, args.k, sondas))
+        linha = {
+            'sondas': sondas,
+            'ms_por_consulta': round(segundos * 1000 / args.consultas, 3),
+            f'recall@{args.k}': round(recall(posicoes, gabarito), 4),
+            'fracao_lida': round(min(1.0, sondas * float(np.diff(ivf['lista_ptr'])[rotulos].mean()) / linhas), 5)
+        }
+        resultado['sondas'].append(linha)
+        print(f"  {sondas:>8}{linha['ms_por_consulta']:>14.3f}{linha[f'recall@{args.k}']:>12.3f}"
+              f"{100 * linha['fracao_lida']:>9.2f}%")
+    return resultado
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--sondas', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument('--consultas', type=int, default=200, help="Consultas por tamanho")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--max-arvore', type=int, default=2_000_000,
+                        help="Maior catálogo em que a KD-tree exata também é medida")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', default=None, help="Grava os resultados em JSON")
+    args = parser.parse_args()
+
+    resultados = [medir_tamanho(linhas, args) for linhas in args.linhas]
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados gravados em {args.saida}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,377 @@
+"""
+Teste de carga: N sessões simultâneas navegando no dashboard servido localmente
+
+Sobe `streamlit run Principal.py` (ou usa um servidor já no ar com `--url`)
+e abre N conexões WebSocket falando o protocolo do navegador. Cada sessão
+alterna entre as páginas e repete sequências realistas de interação:
+arrastar os sliders de popularidade e BPM em alguns passos, escolher um
+gênero, selecionar artistas. Entre interações, espera um tempo de
+"leitura" aleatório.
+
+Mede a latência de cada execução (do envio da interação até o servidor
+avisar que o script terminou), a vazão total e a memória residente do
+servidor ao longo do tempo (Linux, via /proc).
+
+Requer o pacote `websockets` (já instalado junto com versões recentes do Streamlit).
+
+Uso (a partir da raiz do projeto):
+    python -m ferramentas.carga --sessoes 20 --duracao 120
+    python -m ferramentas.carga --sessoes 50 --url http://localhost:8501 --pid 12345 --saida carga.json
+    python -m ferramentas.carga --sessoes 20 --servidor-args --server.runOnSave=false
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.MultiSelect_pb2 import MultiSelect
+from streamlit.proto.Selectbox_pb2 import Selectbox
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from ferramentas.bench_paginas import _versao_codigo
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+TEMPO_LIMITE = 300
+WIDGETS = ('slider', 'selectbox', 'multiselect', 'radio')
+
+# Versões recentes do Streamlit enviam seleções como texto; as antigas, como índices
+SELECAO_POR_TEXTO = 'raw_value' in Selectbox.DESCRIPTOR.fields_by_name
+MULTIPLA_POR_TEXTO = 'raw_values' in MultiSelect.DESCRIPTOR.fields_by_name
+
+
+class Sessao:
+    """
+    Uma sessão do navegador simulada sobre o WebSocket do Streamlit
+    """
+    def __init__(self, url, rng):
+        self.url = url.replace('http', 'ws', 1).rstrip('/') + '/_stcore/stream'
+        self.rng = rng
+        self.conexao = None
+        self.paginas = []
+        self.pagina = ''
+        self.widgets = {}
+        self.estados = {}
+
+    async def conectar(self):
+        self.conexao = await websockets.connect(self.url, subprotocols=['streamlit'], max_size=None)
+
+    async def fechar(self):
+        await self.conexao.close()
+
+    async def executar(self, hash_pagina=None):
+        """
+        Pede uma execução com o estado atual dos widgets e espera o fim do script
+
+        Returns:
+            tuple: (segundos, número de exceções exibidas pela página)
+        """
+        mensagem = BackMsg()
+        pedido = mensagem.rerun_script
+        pedido.query_string = ''
+        pedido.page_script_hash = hash_pagina if hash_pagina is not None else self.pagina
+        for estado in self.estados.values():
+            pedido.widget_states.widgets.append(estado)
+
+        inicio = time.perf_counter()
+        await self.conexao.send(mensagem.SerializeToString())
+
+        excecoes = 0
+        widgets = {}
+        while True:
+            recebida = ForwardMsg.FromString(await asyncio.wait_for(self.conexao.recv(), TEMPO_LIMITE))
+            tipo = recebida.WhichOneof('type')
+            if tipo in ('new_session', 'navigation'):
+                # Versões recentes anunciam as páginas em `navigation`; as antigas, em `new_session`
+                paginas = getattr(recebida, tipo)
+                if paginas.app_pages:
+                    self.paginas = [(pagina.page_script_hash, pagina.page_name) for pagina in paginas.app_pages]
+                    self.pagina = paginas.page_script_hash
+            elif tipo == 'delta' and recebida.delta.WhichOneof('type') == 'new_element':
+                elemento = recebida.delta.new_element
+                tipo_elemento = elemento.WhichOneof('type')
+                if tipo_elemento == 'exception':
+                    excecoes += 1
+                elif tipo_elemento in WIDGETS:
+                    widget = getattr(elemento, tipo_elemento)
+                    widgets[widget.id] = (tipo_elemento, widget)
+            elif tipo == 'script_finished':
+                status = ForwardMsg.ScriptFinishedStatus.Name(recebida.script_finished)
+                if status in ('FINISHED_SUCCESSFULLY', 'FINISHED_WITH_COMPILE_ERROR'):
+                    break
+
+        self.widgets = widgets
+        return time.perf_counter() - inicio, excecoes + (status == 'FINISHED_WITH_COMPILE_ERROR')
+
+    async def navegar(self, hash_pagina):
+        """
+        Troca de página (os widgets da página anterior deixam de existir)
+        """
+        self.estados = {}
+        resultado = await self.executar(hash_pagina)
+        self.pagina = hash_pagina
+        return resultado
+
+    def _definir(self, widget, **valor):
+        estado = WidgetState(id=widget.id)
+        self.estados[widget.id] = estado
+        for campo, conteudo in valor.items():
+            if isinstance(conteudo, list):
+                getattr(estado, campo).data.extend(conteudo)
+            else:
+                setattr(estado, campo, conteudo)
+
+    def _procurar(self, tipos, *palavras):
+        return [
+            widget for tipo, widget in self.widgets.values()
+            if tipo in tipos and (not palavras or any(palavra in widget.label.lower() for palavra in palavras))
+        ]
+
+    def roteiro(self):
+        """
+        Sorteia uma sequência de interações realista para a página atual
+
+        Returns:
+            list: Funções sem argumentos que alteram o estado de um widget (uma execução cada)
+        """
+        sliders_chave = self._procurar(('slider',), 'popularidade', 'bpm')
+        generos = self._procurar(('selectbox', 'radio'), 'gênero')
+        artistas = self._procurar(('selectbox', 'multiselect'), 'artista')
+        opcoes = []
+        if sliders_chave:
+            opcoes.append(lambda: self._arrastar(self.rng.choice(sliders_chave)))
+        if generos:
+            opcoes.append(lambda: [self._escolher(self.rng.choice(generos))])
+        if artistas:
+            opcoes.append(lambda: [self._escolher(self.rng.choice(artistas))])
+        outros = self._procurar(WIDGETS)
+        if outros:
+            opcoes.append(lambda: [self._qualquer(self.rng.choice(outros))])
+        return self.rng.choice(opcoes)() if opcoes else []
+
+    def _arrastar(self, slider):
+        """
+        Arrasta uma das pontas do slider em 2 a 4 passos (uma execução por soltura)
+        """
+        atual = list(self.estados[slider.id].double_array_value.data) if slider.id in self.estados else list(slider.default)
+        passo = slider.step or 1
+        ponta = self.rng.randrange(len(atual))
+        direcao = 1 if ponta == 0 else -1
+        passos = []
+        for _ in range(self.rng.randint(2, 4)):
+            deslocamento = direcao * passo * self.rng.randint(1, max(1, int((slider.max - slider.min) / passo / 10)))
+            atual[ponta] = min(max(atual[ponta] + deslocamento, slider.min), slider.max)
+            if len(atual) == 2 and atual[0] > atual[1]:
+                atual[ponta] = atual[1 - ponta]
+            valores = list(atual)
+            passos.append(lambda valores=valores: self._definir(slider, double_array_value=valores))
+        return passos
+
+    def _escolher(self, widget):
+        if isinstance(widget, MultiSelect):
+            indices = self.rng.sample(range(len(widget.options)), min(len(widget.options), self.rng.randint(1, 3)))
+            if MULTIPLA_POR_TEXTO:
+                return lambda: self._definir(widget, string_array_value=[widget.options[i] for i in indices])
+            return lambda: self._definir(widget, int_array_value=indices)
+        indice = self.rng.randrange(len(widget.options))
+        if SELECAO_POR_TEXTO:
+            return lambda: self._definir(widget, string_value=widget.options[indice])
+        return lambda: self._definir(widget, int_value=indice)
+
+    def _qualquer(self, widget):
+        if widget.DESCRIPTOR.name == 'Slider':
+            return self._arrastar(widget)[0]
+        return self._escolher(widget)
+
+async def _simular(sessao_id, args, registros, fim):
+    """
+    Loop de uma sessão: abre a página inicial, navega e interage até o fim do teste
+    """
+    rng = random.Random(args.semente + sessao_id)
+    sessao = Sessao(args.url, rng)
+    await asyncio.sleep(rng.random() * args.rampa)
+    await sessao.conectar()
+    try:
+        tempo, excecoes = await sessao.executar('')
+        nomes = dict(sessao.paginas)
+        registros.append({'sessao': sessao_id, 'momento': time.time(), 'pagina': nomes.get(sessao.pagina, ''),
+                          'acao': 'carga', 'tempo_s': tempo, 'excecoes': excecoes})
+
+        while time.monotonic() < fim:
+            if rng.random() < args.prob_navegar or not sessao.widgets:
+                hash_pagina = rng.choice(sessao.paginas)[0]
+                tempo, excecoes = await sessao.navegar(hash_pagina)
+                registros.append({'sessao': sessao_id, 'momento': time.time(), 'pagina': nomes.get(hash_pagina, ''),
+                                  'acao': 'navegação', 'tempo_s': tempo, 'excecoes': excecoes})
+            else:
+                for passo in sessao.roteiro():
+                    passo()
+                    tempo, excecoes = await sessao.executar()
+                    registros.append({'sessao': sessao_id, 'momento': time.time(), 'pagina': nomes.get(sessao.pagina, ''),
+                                      'acao': 'interação', 'tempo_s': tempo, 'excecoes': excecoes})
+                    if time.monotonic() >= fim:
+                        break
+                    await asyncio.sleep(rng.uniform(0.2, 0.6))
+            await asyncio.sleep(rng.expovariate(1 / args.pausa) if args.pausa > 0 else 0)
+    finally:
+        await sessao.fechar()
+
+def _memoria_residente(pid):
+    """
+    Memória residente do processo (e dos filhos diretos) em bytes, ou None fora do Linux
+    """
+    total = 0
+    try:
+        pids = [pid]
+        filhos = f"/proc/{pid}/task/{pid}/children"
+        if os.path.exists(filhos):
+            with open(filhos) as arquivo:
+                pids += [int(filho) for filho in arquivo.read().split()]
+        for processo in pids:
+            with open(f"/proc/{processo}/status") as arquivo:
+                for linha in arquivo:
+                    if linha.startswith('VmRSS:'):
+                        total += int(linha.split()[1]) * 1024
+    except (OSError, ValueError):
+        return None
+    return total
+
+async def _amostrar_memoria(pid, intervalo, amostras, fim):
+    inicio = time.monotonic()
+    while time.monotonic() < fim:
+        memoria = _memoria_residente(pid)
+        if memoria is not None:
+            amostras.append({'tempo_s': round(time.monotonic() - inicio, 2), 'rss_mb': round(memoria / 1024**2, 1)})
+        await asyncio.sleep(intervalo)
+
+def _iniciar_servidor(porta, extras):
+    """
+    Sobe o Streamlit em segundo plano e espera o health check responder
+    """
+    comando = [sys.executable, '-m', 'streamlit', 'run', os.path.join(RAIZ, 'Principal.py'),
+               '--server.headless=true', f'--server.port={porta}', '--browser.gatherUsageStats=false', *extras]
+    processo = subprocess.Popen(comando, cwd=os.getcwd(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://localhost:{porta}"
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        try:
+            urllib.request.urlopen(f"{url}/_stcore/health", timeout=1)
+            return processo, url
+        except OSError:
+            if processo.poll() is not None:
+                raise SystemExit("o servidor Streamlit terminou ao iniciar")
+            time.sleep(0.5)
+    processo.terminate()
+    raise SystemExit("o servidor Streamlit não respondeu em 60 s")
+
+def _percentis(tempos):
+    p50, p95, p99 = np.percentile(tempos, [50, 95, 99]) if len(tempos) else (np.nan,) * 3
+    return {'execucoes': len(tempos), 'p50_s': round(float(p50), 4), 'p95_s': round(float(p95), 4),
+            'p99_s': round(float(p99), 4)}
+
+def _resumir(registros, duracao):
+    """
+    Vazão e percentis de latência no total e por página
+    """
+    tempos = [registro['tempo_s'] for registro in registros]
+    resumo = {
+        'total': {**_percentis(tempos), 'vazao_por_s': round(len(tempos) / duracao, 2),
+                  'excecoes': sum(registro['excecoes'] for registro in registros)},
+        'por_pagina': {}
+    }
+    for pagina in sorted({registro['pagina'] for registro in registros}):
+        tempos_pagina = [registro['tempo_s'] for registro in registros if registro['pagina'] == pagina]
+        resumo['por_pagina'][pagina] = _percentis(tempos_pagina)
+    return resumo
+
+async def _executar_teste(args, pid):
+    registros = []
+    memoria = []
+    inicio = time.monotonic()
+    fim = inicio + args.rampa + args.duracao
+    tarefas = [_simular(i, args, registros, fim) for i in range(args.sessoes)]
+    if pid:
+        tarefas.append(_amostrar_memoria(pid, args.intervalo_memoria, memoria, fim))
+    resultados = await asyncio.gather(*tarefas, return_exceptions=True)
+    erros = [repr(resultado) for resultado in resultados if isinstance(resultado, Exception)]
+    return registros, memoria, erros, time.monotonic() - inicio
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessoes', type=int, default=10, help="sessões simultâneas")
+    parser.add_argument('--duracao', type=float, default=60, help="segundos de teste após a rampa")
+    parser.add_argument('--rampa', type=float, default=10, help="segundos para abrir todas as sessões")
+    parser.add_argument('--pausa', type=float, default=2.0, help="tempo médio de leitura entre interações (s)")
+    parser.add_argument('--prob-navegar', type=float, default=0.2, help="chance de trocar de página a cada interação")
+    parser.add_argument('--url', help="servidor já em execução (senão sobe um local)")
+    parser.add_argument('--porta', type=int, default=8599, help="porta do servidor local")
+    parser.add_argument('--pid', type=int, help="PID do servidor externo, para medir a memória")
+    parser.add_argument('--intervalo-memoria', type=float, default=1.0)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', default='carga.json')
+    parser.add_argument('--servidor-args', nargs=argparse.REMAINDER, default=[],
+                        help="opções repassadas ao `streamlit run` (use por último)")
+    args = parser.parse_args()
+
+    if websockets is None:
+        raise SystemExit("instale o pacote `websockets` para rodar o teste de carga")
+
+    processo = None
+    if args.url is None:
+        processo, args.url = _iniciar_servidor(args.porta, args.servidor_args)
+    pid = processo.pid if processo is not None else args.pid
+
+    try:
+        registros, memoria, erros, duracao = asyncio.run(_executar_teste(args, pid))
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    resumo = _resumir(registros, duracao)
+    total = resumo['total']
+    print(f"{args.sessoes} sessões, {duracao:.0f} s: {total['execucoes']} execuções, {total['vazao_por_s']}/s, "
+          f"p50 {total['p50_s']:.3f}s, p95 {total['p95_s']:.3f}s, p99 {total['p99_s']:.3f}s, "
+          f"{total['excecoes']} exceções na página")
+    for pagina, estatisticas in resumo['por_pagina'].items():
+        print(f"  {pagina:<28} {estatisticas['execucoes']:>6} execuções  p50 {estatisticas['p50_s']:.3f}s  "
+              f"p95 {estatisticas['p95_s']:.3f}s  p99 {estatisticas['p99_s']:.3f}s")
+    if memoria:
+        print(f"memória do servidor: inicial {memoria[0]['rss_mb']} MB, pico {max(a['rss_mb'] for a in memoria)} MB, "
+              f"final {memoria[-1]['rss_mb']} MB")
+    for erro in erros:
+        print(f"ERRO de sessão: {erro}")
+
+    relatorio = {
+        'versao': _versao_codigo(),
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': {chave: valor for chave, valor in vars(args).items()},
+        'resumo': resumo,
+        'memoria': memoria,
+        'erros_sessao': erros,
+        'execucoes': registros
+    }
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"relatório gravado em {args.saida}")
+
+if __name__ == '__main__':
+    main()
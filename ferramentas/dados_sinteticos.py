@@ -0,0 +1,163 @@
+"""
+Gera datasets sintéticos com o mesmo esquema de `Dataset/dataset.csv`
+
+As cardinalidades seguem as do dataset original: ~79% de `track_id` únicos
+(a mesma faixa aparece uma vez por gênero, com os mesmos atributos), 114
+gêneros, ~27% de artistas distintos por linha com poucos artistas muito
+prolíficos (lei de potência), ~20% das faixas com artistas convidados
+(`A;B`) e ~40% de álbuns distintos por linha.
+
+Uso (a partir da raiz do projeto):
+    python -m ferramentas.dados_sinteticos 1000000 bench_dados/1000000/Dataset/dataset.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+GENEROS = """acoustic afrobeat alt-rock alternative ambient anime black-metal bluegrass blues brazil breakbeat british
+cantopop chicago-house children chill classical club comedy country dance dancehall death-metal deep-house
+detroit-techno disco disney drum-and-bass dub dubstep edm electro electronic emo folk forro french funk garage german
+gospel goth grindcore groove grunge guitar happy hard-rock hardcore hardstyle heavy-metal hip-hop honky-tonk house idm
+indian indie-pop indie industrial iranian j-dance j-idol j-pop j-rock jazz k-pop kids latin latino malay mandopop metal
+metalcore minimal-techno mpb new-age opera pagode party piano pop-film pop power-pop progressive-house psych-rock
+punk-rock punk r-n-b reggae reggaeton rock-n-roll rock rockabilly romance sad salsa samba sertanejo show-tunes
+singer-songwriter ska sleep songwriter soul spanish study swedish synth-pop tango techno trance trip-hop turkish
+world-music""".split()
+
+PALAVRAS = """love night baby heart time dream fire light world life rain summer girl home dance blue gold wild
+amor noite coração vida sonho fogo luz mundo chuva verão casa dança azul ouro lua mar saudade festa""".split()
+
+# Proporções calibradas para reproduzir as do dataset original (114 mil linhas)
+FRACAO_FAIXAS_UNICAS = 0.79
+FRACAO_ARTISTAS = 0.40  # tamanho do catálogo; ~27% das linhas acabam com artistas distintos
+FRACAO_ALBUNS = 0.55  # idem; ~40% de álbuns distintos
+FRACAO_FEATS = 0.20
+
+LINHAS_POR_BLOCO = 1_000_000
+
+
+def _nomes(prefixo, codigos):
+    """
+    Gera nomes legíveis a partir de códigos inteiros
+    """
+    return np.char.add(prefixo, codigos.astype(str)).astype(object)
+
+def _titulos(rng, num):
+    """
+    Gera títulos de faixas com duas ou três palavras (úteis para testar a busca)
+    """
+    palavras = np.array(PALAVRAS, dtype=object)
+    titulo = palavras[rng.integers(0, len(palavras), num)] + ' ' + palavras[rng.integers(0, len(palavras), num)]
+    terceira = rng.random(num) < 0.5
+    titulo[terceira] = titulo[terceira] + ' ' + palavras[rng.integers(0, len(palavras), terceira.sum())]
+    return titulo
+
+def _gerar_faixas(rng, inicio, num_faixas, pesos_artistas, num_albuns):
+    """
+    Gera os atributos de um bloco de faixas únicas
+    """
+    num_artistas = len(pesos_artistas)
+    artista = rng.choice(num_artistas, num_faixas, p=pesos_artistas)
+    convidado = rng.integers(0, num_artistas, num_faixas)
+    artistas = _nomes('Artista ', artista)
+    feat = rng.random(num_faixas) < FRACAO_FEATS
+    artistas[feat] = artistas[feat] + ';' + _nomes('Artista ', convidado[feat])
+
+    # Popularidade com ~14% de zeros, como no original
+    popularidade = np.clip(rng.normal(40, 18, num_faixas), 0, 100).astype(np.int64)
+    popularidade[rng.random(num_faixas) < 0.14] = 0
+
+    return pd.DataFrame({
+        'track_id': _nomes('T', np.arange(inicio, inicio + num_faixas)),
+        'artists': artistas,
+        'album_name': _nomes('Álbum ', rng.integers(0, num_albuns, num_faixas)),
+        'track_name': _titulos(rng, num_faixas),
+        'popularity': popularidade,
+        'duration_ms': np.clip(rng.lognormal(12.2, 0.35, num_faixas), 30_000, 1_500_000).astype(np.int64),
+        'explicit': rng.random(num_faixas) < 0.085,
+        'danceability': rng.beta(5, 3, num_faixas).round(3),
+        'energy': rng.beta(3, 2, num_faixas).round(3),
+        'key': rng.integers(0, 12, num_faixas),
+        'loudness': np.clip(rng.normal(-8.3, 5, num_faixas), -49, 4).round(3),
+        'mode': (rng.random(num_faixas) < 0.64).astype(np.int64),
+        'speechiness': rng.beta(1, 10, num_faixas).round(4),
+        'acousticness': rng.beta(0.6, 1.2, num_faixas).round(4),
+        'instrumentalness': np.where(rng.random(num_faixas) < 0.7, 0.0, rng.random(num_faixas)).round(4),
+        'liveness': rng.beta(1.5, 6, num_faixas).round(4),
+        'valence': rng.beta(2, 2, num_faixas).round(3),
+        'tempo': np.clip(rng.normal(122, 30, num_faixas), 0, 243).round(3),
+        'time_signature': rng.choice([1, 3, 4, 5], num_faixas, p=[0.01, 0.08, 0.9, 0.01])
+    })
+
+def _expandir_por_generos(rng, faixas, num_linhas):
+    """
+    Repete cada faixa uma vez por gênero até completar `num_linhas` linhas
+
+    Gêneros extras são vizinhos na lista (ex.: `rock` → `rock-n-roll`), como
+    acontece com gêneros relacionados no dataset original.
+    """
+    num_faixas = len(faixas)
+    extras = num_linhas - num_faixas
+    repeticoes = 1 + np.bincount(rng.integers(0, num_faixas, extras), minlength=num_faixas)
+
+    linhas = np.repeat(np.arange(num_faixas), repeticoes)
+    ordem = np.arange(len(linhas)) - np.repeat(np.cumsum(repeticoes) - repeticoes, repeticoes)
+    primeiro = rng.integers(0, len(GENEROS), num_faixas)
+    genero = (primeiro[linhas] + ordem) % len(GENEROS)
+
+    df = faixas.iloc[linhas].reset_index(drop=True)
+    df['track_genre'] = np.array(GENEROS, dtype=object)[genero]
+    return df
+
+def gerar_dataset(num_linhas, caminho, semente=0):
+    """
+    Grava um CSV sintético com `num_linhas` linhas no esquema de `dataset.csv`
+
+    A geração é feita em blocos, então 10 milhões de linhas cabem em memória.
+
+    Args:
+        num_linhas (int): Número de linhas (pares faixa × gênero)
+        caminho (str): Caminho do CSV a gravar
+        semente (int): Semente do gerador aleatório
+    """
+    rng = np.random.default_rng(semente)
+    num_artistas = max(10, int(num_linhas * FRACAO_ARTISTAS))
+    pesos_artistas = 1 / (np.arange(num_artistas) + 20) ** 0.7
+    pesos_artistas /= pesos_artistas.sum()
+    num_albuns = max(10, int(num_linhas * FRACAO_ALBUNS))
+
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    temporario = f"{caminho}.tmp-{os.getpid()}"
+
+    gravadas = 0
+    faixas_geradas = 0
+    with open(temporario, 'w', encoding='utf-8', newline='') as arquivo:
+        while gravadas < num_linhas:
+            linhas_bloco = min(LINHAS_POR_BLOCO, num_linhas - gravadas)
+            faixas_bloco = max(1, int(linhas_bloco * FRACAO_FAIXAS_UNICAS))
+
+            faixas = _gerar_faixas(rng, faixas_geradas, faixas_bloco, pesos_artistas, num_albuns)
+            df = _expandir_por_generos(rng, faixas, linhas_bloco)
+            # O original vem ordenado por gênero e tem uma coluna de índice sem nome
+            df = df.sort_values('track_genre', kind='stable')
+            df.index = pd.RangeIndex(gravadas, gravadas + len(df))
+            df.to_csv(arquivo, header=(gravadas == 0))
+
+            gravadas += linhas_bloco
+            faixas_geradas += faixas_bloco
+
+    os.replace(temporario, caminho)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('linhas', type=int, help="número de linhas (ex.: 114000, 1000000, 10000000)")
+    parser.add_argument('caminho', help="CSV de saída")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    gerar_dataset(args.linhas, args.caminho, args.semente)
+
+if __name__ == '__main__':
+    main()
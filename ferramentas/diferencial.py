@@ -0,0 +1,395 @@
+"""
+Compara os caminhos otimizados com a referência em pandas puro
+
+A referência é uma reimplementação independente do pipeline original de
+`carregar_dados` (CSV inteiro, uma linha por par faixa × gênero, colunas
+derivadas com `apply` linha a linha, texto como strings) agregada com
+`groupby`/`value_counts`/`corr` comuns; ela não usa `processar_dados`. O caminho otimizado é o que as
+páginas usam: armazém colunar, índices de artistas e gêneros, agrupamentos
+sobre códigos inteiros e o cache compartilhado.
+
+Cada verificação roda sobre o dataset do projeto (se existir) e sobre
+datasets sintéticos, cada um em um diretório temporário com armazém e
+cache próprios. Diferenças são listadas célula a célula e o comando termina
+com código 1, para poder ser usado antes de aceitar uma otimização.
+
+Uso (a partir da raiz do projeto):
+    python -m ferramentas.diferencial
+    python -m ferramentas.diferencial --sinteticos 20000 500000 --verificacoes artistas generos
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from ferramentas.bench_paginas import _limpar_caches
+from ferramentas.dados_sinteticos import gerar_dataset
+from utils.agrupamento import agrupar, contagem_valores, num_unicos
+from utils.carrega_dados import (CAMINHO_DATASET, COLUNAS_CODIFICADAS, GENEROS_PRINCIPAIS, TODAS_AS_COLUNAS,
+                                 carregar_faixas, carregar_indice_generos, estatisticas_generos,
+                                 obter_estatisticas_basicas, tabela_artistas, versao_dataset)
+from utils.indices import contagem_por_genero
+
+# Tabelas arredondadas a 3 casas podem diferir em 1 unidade na última casa (ordem das somas)
+TOLERANCIA_ARREDONDADO = 1.001e-3
+MAX_DIFERENCAS = 10
+
+CARACTERISTICAS = ['danceability', 'energy', 'valence', 'acousticness', 'instrumentalness',
+                   'speechiness', 'liveness', 'loudness', 'tempo', 'popularity', 'duration_min']
+
+AGREGACOES = {
+    'track_id': 'count',
+    'popularity': ['mean', 'std', 'max'],
+    'danceability': 'mean',
+    'energy': 'mean',
+    'valence': 'mean',
+    'acousticness': 'mean',
+    'duration_min': 'mean'
+}
+
+# Histogramas exibidos pelas páginas: coluna → número de bins
+HISTOGRAMAS = {'duration_min': 50, 'tempo': 50, 'popularity': 30, 'energy': 30, 'danceability': 30}
+
+
+def _diferencas_valores(esperado, obtido, rotulos, coluna, rtol, atol):
+    """
+    Compara dois arrays alinhados e descreve as posições divergentes
+    """
+    esperado = np.asarray(esperado)
+    obtido = np.asarray(obtido)
+    numerico = esperado.dtype.kind in 'biuf' and obtido.dtype.kind in 'biuf'
+    if numerico:
+        iguais = np.isclose(esperado.astype(float), obtido.astype(float), rtol=rtol, atol=atol, equal_nan=True)
+    else:
+        iguais = (esperado == obtido) | (pd.isna(esperado) & pd.isna(obtido))
+
+    divergentes = np.flatnonzero(~iguais)
+    linhas = []
+    for posicao in divergentes[:MAX_DIFERENCAS]:
+        detalhe = f"  [{rotulos[posicao]!r}, {coluna!r}] esperado={esperado[posicao]!r} obtido={obtido[posicao]!r}"
+        if numerico:
+            detalhe += f" dif={abs(float(esperado[posicao]) - float(obtido[posicao])):.3g}"
+        linhas.append(detalhe)
+    if len(divergentes) > MAX_DIFERENCAS:
+        linhas.append(f"  ... mais {len(divergentes) - MAX_DIFERENCAS} células divergentes em {coluna!r}")
+    return linhas
+
+def comparar(esperado, obtido, rtol=1e-9, atol=1e-9):
+    """
+    Compara dois resultados (DataFrame, Series, dict ou escalar) com tolerância numérica
+
+    DataFrames e Series são alinhados pelos rótulos; a ordem das linhas não
+    importa. Listas de rótulos faltando/sobrando e células divergentes saem
+    em formato legível.
+
+    Returns:
+        list: Linhas descrevendo as diferenças (vazia se os resultados batem)
+    """
+    if isinstance(esperado, dict):
+        diferencas = []
+        for chave in sorted(set(esperado) | set(obtido), key=str):
+            if chave not in obtido or chave not in esperado:
+                diferencas.append(f"  chave {chave!r} só existe em {'esperado' if chave in esperado else 'obtido'}")
+                continue
+            diferencas += [f"  {chave}: {linha.strip()}" for linha in comparar(esperado[chave], obtido[chave], rtol, atol)]
+        return diferencas
+
+    if isinstance(esperado, pd.Series):
+        esperado, obtido = esperado.to_frame('valor'), obtido.to_frame('valor')
+    if not isinstance(esperado, pd.DataFrame):
+        return _diferencas_valores([esperado], [obtido], ['valor'], 'valor', rtol, atol)
+
+    diferencas = []
+    faltando = esperado.index.difference(obtido.index)
+    sobrando = obtido.index.difference(esperado.index)
+    if len(faltando):
+        diferencas.append(f"  {len(faltando)} linhas faltando, ex.: {list(faltando[:5])}")
+    if len(sobrando):
+        diferencas.append(f"  {len(sobrando)} linhas sobrando, ex.: {list(sobrando[:5])}")
+    colunas_faltando = esperado.columns.difference(obtido.columns)
+    if len(colunas_faltando):
+        diferencas.append(f"  colunas faltando: {list(colunas_faltando)}")
+
+    comuns = esperado.index.intersection(obtido.index)
+    for coluna in esperado.columns.intersection(obtido.columns, sort=False):
+        valores_esperados = esperado.loc[comuns, coluna]
+        valores_obtidos = obtido.loc[comuns, coluna]
+        if isinstance(valores_esperados.dtype, pd.CategoricalDtype):
+            valores_esperados = valores_esperados.astype(object)
+        if isinstance(valores_obtidos.dtype, pd.CategoricalDtype):
+            valores_obtidos = valores_obtidos.astype(object)
+        diferencas += _diferencas_valores(valores_esperados.to_numpy(), valores_obtidos.to_numpy(), comuns, coluna, rtol, atol)
+    return diferencas
+
+def _categoria(valor, limites, rotulos):
+    """
+    Primeira faixa fechada à direita que contém o valor (valores ausentes caem na última, como nos if/elif)
+    """
+    for limite, rotulo in zip(limites, rotulos):
+        if valor <= limite:
+            return rotulo
+    return rotulos[-1]
+
+def _genero_principal(genero):
+    for categoria, generos in GENEROS_PRINCIPAIS.items():
+        if genero in generos:
+            return categoria
+    return 'Outros'
+
+def _processar_referencia(df):
+    """
+    Colunas derivadas com a semântica original: uma chamada de Python por linha, texto como strings
+    """
+    df['duration_sec'] = df['duration_ms'] / 1000
+    df['duration_min'] = df['duration_sec'] / 60
+    df['categoria_popularidade'] = df['popularity'].apply(lambda pop: 'Sem dados' if pop == 0 else _categoria(
+        pop, [20, 40, 60, 80],
+        ['Baixa (1-20)', 'Média-baixa (21-40)', 'Média (41-60)', 'Alta (61-80)', 'Muito Alta (81-100)']
+    ))
+    df['categoria_energia'] = df['energy'].apply(
+        _categoria, args=([0.3, 0.6], ['Baixa energia', 'Média energia', 'Alta energia'])
+    )
+    df['categoria_dancabilidade'] = df['danceability'].apply(
+        _categoria, args=([0.3, 0.6], ['Pouco dançável', 'Moderadamente dançável', 'Muito dançável'])
+    )
+    df['categoria_duracao'] = df['duration_min'].apply(_categoria, args=(
+        [2, 3.5, 5, 7],
+        ['Muito curta (≤2min)', 'Curta (2-3.5min)', 'Média (3.5-5min)', 'Longa (5-7min)', 'Muito longa (>7min)']
+    ))
+    df['chave_musical'] = df['key'].map({
+        0: 'C', 1: 'C#/D♭', 2: 'D', 3: 'D#/E♭', 4: 'E', 5: 'F',
+        6: 'F#/G♭', 7: 'G', 8: 'G#/A♭', 9: 'A', 10: 'A#/B♭', 11: 'B'
+    })
+    df['modo_musical'] = df['mode'].map({0: 'Menor', 1: 'Maior'})
+    df['primeiro_artista'] = df['artists'].str.split(';').str[0]
+    df['tem_feat'] = df['artists'].str.contains(';', na=False)
+    df['genero_principal'] = df['track_genre'].apply(_genero_principal)
+    df['categoria_tempo'] = df['tempo'].apply(_categoria, args=(
+        [70, 100, 120, 140],
+        ['Muito Lento (≤70)', 'Lento (71-100)', 'Moderado (101-120)', 'Rápido (121-140)', 'Muito Rápido (>140)']
+    ))
+    return df[TODAS_AS_COLUNAS]
+
+def _carregar_referencia():
+    """
+    Pipeline original de `carregar_dados` sem a ordenação final (mantém a ordem do CSV)
+
+    Returns:
+        tuple: (pares faixa × gênero, faixas únicas), com texto como strings
+    """
+    pares = _processar_referencia(pd.read_csv(CAMINHO_DATASET).drop('Unnamed: 0', axis=1))
+    # Mesma faixa classificada duas vezes no mesmo gênero conta uma vez, como na matriz de pertinência
+    pares = pares.drop_duplicates(['track_id', 'track_genre'])
+    # A tabela canônica guarda a primeira ocorrência de cada faixa no CSV
+    faixas = pares.drop_duplicates('track_id').set_index('track_id', drop=False).rename_axis(None)
+    return pares, faixas
+
+def _otimizado_por_faixa(colunas):
+    """
+    Colunas da tabela canônica indexadas por `track_id`, para alinhar com a referência
+    """
+    df = carregar_faixas(versao_dataset(), ['track_id'] + [coluna for coluna in colunas if coluna != 'track_id'])
+    return df.set_index(df['track_id'].to_numpy())
+
+def verificar_colunas(pares, faixas):
+    """
+    Todas as colunas (base e derivadas) da tabela canônica contra o pipeline original
+    """
+    obtido = _otimizado_por_faixa(TODAS_AS_COLUNAS)
+    return comparar(faixas[TODAS_AS_COLUNAS], obtido[TODAS_AS_COLUNAS])
+
+def verificar_estatisticas_basicas(pares, faixas):
+    esperado = {
+        'total_tracks': len(faixas),
+        'total_artists': faixas['primeiro_artista'].nunique(),
+        'total_albums': faixas['album_name'].nunique(),
+        'total_genres': pares['track_genre'].nunique(),
+        'duracao_media_min': round(faixas['duration_min'].mean(), 2),
+        'popularidade_media': round(faixas['popularity'].mean(), 1),
+        'track_mais_popular': faixas.loc[faixas['popularity'].idxmax(), 'track_name'],
+        'artista_track_mais_popular': faixas.loc[faixas['popularity'].idxmax(), 'primeiro_artista'],
+        'tracks_explicitas': faixas['explicit'].sum(),
+        'percentual_explicitas': round((faixas['explicit'].sum() / len(faixas)) * 100, 1)
+    }
+    contagens = pares['track_genre'].value_counts()
+    esperado['tracks_genero_mais_comum'] = contagens.iloc[0]
+    obtido = obter_estatisticas_basicas(versao_dataset())
+    diferencas = comparar(esperado, {chave: obtido[chave] for chave in esperado})
+    # Empates no gênero mais comum podem sair em qualquer ordem
+    if contagens.get(obtido['genero_mais_comum']) != contagens.iloc[0]:
+        diferencas.append(f"  genero_mais_comum: {obtido['genero_mais_comum']!r} não é um dos mais comuns")
+    return diferencas
+
+def verificar_contagem_generos(pares, faixas):
+    esperado = pares['track_genre'].value_counts()
+    return comparar(esperado, contagem_por_genero(carregar_indice_generos(versao_dataset())))
+
+def verificar_artistas(pares, faixas):
+    """
+    Tabela de artistas (todos os artistas creditados) contra explode + groupby
+    """
+    creditos = faixas[['track_id', 'artists']].assign(artista=faixas['artists'].str.split(';')).explode('artista')
+    creditos['artista'] = creditos['artista'].str.strip()
+    creditos = creditos[creditos['artista'].notna() & (creditos['artista'] != '')]
+
+    medidas = faixas.loc[creditos['track_id']].reset_index(drop=True)
+    medidas['artista'] = creditos['artista'].to_numpy()
+    esperado = medidas.groupby('artista').agg({
+        'track_id': 'count',
+        'popularity': ['mean', 'max'],
+        'danceability': 'mean',
+        'energy': 'mean',
+        'valence': 'mean',
+        'acousticness': 'mean',
+        'duration_min': 'mean'
+    }).round(3)
+    esperado.columns = ['num_faixas', 'pop_media', 'pop_maxima', 'danceability_media',
+                        'energy_media', 'valence_media', 'acousticness_media', 'duracao_media']
+
+    # Gênero mais comum entre todas as classificações das faixas do artista (empate: ordem alfabética)
+    generos = creditos[['track_id', 'artista']].merge(pares[['track_id', 'track_genre']], on='track_id')
+    esperado['genero_principal'] = generos.groupby('artista')['track_genre'].agg(lambda serie: serie.mode().iloc[0])
+
+    obtido = tabela_artistas(versao_dataset()).set_index('artista')
+    return comparar(esperado, obtido, atol=TOLERANCIA_ARREDONDADO)
+
+def verificar_generos(pares, faixas):
+    """
+    Estatísticas por gênero contra groupby sobre os pares faixa × gênero
+    """
+    esperado = pares.groupby('track_genre').agg({
+        'track_id': 'count',
+        'popularity': ['mean', 'std', 'max'],
+        'danceability': 'mean',
+        'energy': 'mean',
+        'valence': 'mean',
+        'acousticness': 'mean',
+        'instrumentalness': 'mean',
+        'liveness': 'mean',
+        'speechiness': 'mean',
+        'tempo': 'mean',
+        'duration_min': 'mean',
+        'loudness': 'mean'
+    }).round(3)
+    esperado.columns = ['num_faixas', 'pop_media', 'pop_std', 'pop_maxima', 'danceability', 'energy', 'valence',
+                        'acousticness', 'instrumentalness', 'liveness', 'speechiness', 'tempo', 'duration_min',
+                        'loudness']
+    obtido = estatisticas_generos(versao_dataset()).set_index('track_genre')
+    return comparar(esperado, obtido, atol=TOLERANCIA_ARREDONDADO)
+
+def verificar_correlacoes(pares, faixas):
+    esperado = faixas[CARACTERISTICAS].corr()
+    obtido = carregar_faixas(versao_dataset(), CARACTERISTICAS)[CARACTERISTICAS].corr()
+    return comparar(esperado, obtido, rtol=1e-7, atol=1e-9)
+
+def verificar_agrupamentos(pares, faixas):
+    """
+    value_counts, nunique e agg por cada coluna categórica contra pandas com strings
+    """
+    obtido = _otimizado_por_faixa(COLUNAS_CODIFICADAS + list(AGREGACOES))
+    diferencas = []
+    for coluna in COLUNAS_CODIFICADAS:
+        casos = [
+            ('value_counts', faixas[coluna].value_counts(), contagem_valores(obtido[coluna])),
+            ('nunique', faixas[coluna].nunique(), num_unicos(obtido[coluna])),
+            ('agg', faixas.groupby(coluna).agg(AGREGACOES), agrupar(obtido, coluna, AGREGACOES))
+        ]
+        for nome, esperado, resultado in casos:
+            diferencas += [f"  {coluna}.{nome}: {linha.strip()}" for linha in comparar(esperado, resultado)]
+    return diferencas
+
+def verificar_histogramas(pares, faixas):
+    """
+    Contagens dos histogramas das páginas, com os mesmos bins nos dois caminhos
+    """
+    obtido = carregar_faixas(versao_dataset(), list(HISTOGRAMAS))
+    diferencas = []
+    for coluna, bins in HISTOGRAMAS.items():
+        limites = np.histogram_bin_edges(faixas[coluna].dropna(), bins=bins)
+        esperado = pd.Series(np.histogram(faixas[coluna].dropna(), bins=limites)[0])
+        resultado = pd.Series(np.histogram(obtido[coluna].dropna(), bins=limites)[0])
+        diferencas += [f"  {coluna}: {linha.strip()}" for linha in comparar(esperado, resultado)]
+    return diferencas
+
+VERIFICACOES = {
+    'colunas': verificar_colunas,
+    'estatisticas_basicas': verificar_estatisticas_basicas,
+    'contagem_generos': verificar_contagem_generos,
+    'artistas': verificar_artistas,
+    'generos': verificar_generos,
+    'correlacoes': verificar_correlacoes,
+    'agrupamentos': verificar_agrupamentos,
+    'histogramas': verificar_histogramas
+}
+
+def _preparar(diretorio, origem=None, linhas=None):
+    """
+    Monta `<diretorio>/Dataset/dataset.csv` a partir de um CSV existente ou de dados sintéticos
+    """
+    destino = os.path.join(diretorio, 'Dataset', 'dataset.csv')
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    if origem is not None:
+        shutil.copyfile(origem, destino)
+    else:
+        gerar_dataset(linhas, destino)
+
+def _executar(rotulo, verificacoes):
+    """
+    Roda as verificações no diretório atual e imprime o resultado de cada uma
+
+    Returns:
+        int: Número de verificações que falharam
+    """
+    _limpar_caches()
+    pares, faixas = _carregar_referencia()
+    print(f"== {rotulo}: {len(pares):,} pares faixa × gênero, {len(faixas):,} faixas", flush=True)
+    # Pré-condição da deduplicação: a mesma faixa tem os mesmos atributos em todos os gêneros
+    variaveis = pares.drop(columns=['track_genre', 'genero_principal']).groupby('track_id').nunique(dropna=False).max()
+    variaveis = variaveis[variaveis > 1]
+    if len(variaveis):
+        print(f"  aviso: atributos que variam entre linhas da mesma faixa: {list(variaveis.index)}; "
+              "a tabela canônica guarda a primeira ocorrência", flush=True)
+    falhas = 0
+    for nome in verificacoes:
+        diferencas = VERIFICACOES[nome](pares, faixas)
+        print(f"  {'ok    ' if not diferencas else 'FALHOU'} {nome}", flush=True)
+        for linha in diferencas:
+            print(f"    {linha}")
+        falhas += bool(diferencas)
+    return falhas
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default=os.path.join(RAIZ, 'Dataset', 'dataset.csv'),
+                        help="CSV real a verificar (ignorado se não existir)")
+    parser.add_argument('--sinteticos', type=int, nargs='*', default=[20_000, 200_000],
+                        help="tamanhos dos datasets sintéticos")
+    parser.add_argument('--verificacoes', nargs='+', choices=list(VERIFICACOES), default=list(VERIFICACOES))
+    args = parser.parse_args()
+
+    casos = [(f"dataset {args.dataset}", {'origem': args.dataset})] if os.path.exists(args.dataset) else []
+    casos += [(f"sintético {linhas:,} linhas", {'linhas': linhas}) for linhas in args.sinteticos]
+
+    diretorio_original = os.getcwd()
+    falhas = 0
+    for rotulo, origem in casos:
+        with tempfile.TemporaryDirectory(prefix='diferencial-') as diretorio:
+            _preparar(diretorio, **origem)
+            os.chdir(diretorio)
+            try:
+                falhas += _executar(rotulo, args.verificacoes)
+            finally:
+                os.chdir(diretorio_original)
+
+    print(f"{falhas} verificações falharam" if falhas else "todas as verificações passaram")
+    sys.exit(1 if falhas else 0)
+
+if __name__ == '__main__':
+    main()
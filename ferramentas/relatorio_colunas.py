@@ -0,0 +1,44 @@
+"""
+Lista, para cada página, as colunas declaradas em `COLUNAS_PAGINA` e os bytes carregados
+
+Uso (a partir da raiz do projeto):
+    python -m ferramentas.relatorio_colunas
+"""
+import ast
+import glob
+import os
+
+from utils.carrega_dados import TODAS_AS_COLUNAS, relatorio_colunas, versao_dataset
+
+PAGINAS = ['Principal.py'] + sorted(glob.glob(os.path.join('pages', '*.py')))
+
+
+def ler_manifesto_pagina(caminho):
+    """
+    Extrai a lista `COLUNAS_PAGINA` de uma página sem executá-la
+    """
+    with open(caminho, encoding='utf-8') as arquivo:
+        arvore = ast.parse(arquivo.read())
+    for no in arvore.body:
+        if isinstance(no, ast.Assign) and any(getattr(alvo, 'id', None) == 'COLUNAS_PAGINA' for alvo in no.targets):
+            return ast.literal_eval(no.value)
+    return None
+
+def main():
+    versao = versao_dataset()
+    total = relatorio_colunas(versao, TODAS_AS_COLUNAS)['bytes'].sum()
+    print(f"{'página':<36}{'colunas':>8}{'MB':>10}{'% do total':>12}")
+
+    for pagina in PAGINAS:
+        colunas = ler_manifesto_pagina(pagina)
+        if colunas is None:
+            print(f"{os.path.basename(pagina):<36}{'sem manifesto':>30}")
+            continue
+        relatorio = relatorio_colunas(versao, colunas)
+        carregado = relatorio['bytes'].sum()
+        print(f"{os.path.basename(pagina):<36}{len(relatorio):>8}{carregado / 1024**2:>10.2f}{carregado / total:>11.0%}")
+
+    print(f"{'(todas as colunas)':<36}{len(TODAS_AS_COLUNAS):>8}{total / 1024**2:>10.2f}{1:>11.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -4,19 +4,39 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
-from utils.carrega_dados import carregar_dados
+from utils.agrupamento import agrupar, contagem_valores
+from utils.carrega_dados import (carregar_faixas, carregar_indice_generos, carregar_indice_generos_principais,
+                                 versao_dataset)
+from utils.desempenho import iniciar_medicao, medir
+from utils.indices import expandir_por_genero, faixas_do_genero, generos_das_faixas
+from utils.memoria_sessao import contabilizar, derivado_sessao
+from utils.painel import exibir_grafico, exibir_painel_desempenho, exibir_relatorio_colunas
+
+# Colunas usadas por esta página: só elas são lidas do armazém e calculadas
+COLUNAS_PAGINA = [
+    'track_id', 'track_name', 'primeiro_artista', 'popularity',
+    'duration_min', 'tempo', 'time_signature', 'energy', 'danceability', 'valence', 'acousticness',
+    'loudness', 'categoria_popularidade', 'categoria_duracao', 'categoria_tempo', 'chave_musical',
+    'modo_musical'
+]
 
 st.set_page_config(
     page_title="Análise Temporal - Spotify Analytics",
     page_icon="⏱️",
     layout="wide"
 )
+iniciar_medicao('Análise Temporal')
 
 st.title("⏱️ Análise Temporal da Música")
 st.markdown("### Exploração de duração, tempo (BPM) e características temporais")
 
-# Carrega os dados
-df = carregar_dados()
+# Carrega os dados (faixas únicas + matriz faixa × gênero)
+with medir('carregar dados', 'dados'):
+    # Versão do CSV: chave dos caches do armazém (muda quando o dataset muda)
+    versao = versao_dataset()
+    df = carregar_faixas(versao, COLUNAS_PAGINA)
+    indice_generos = carregar_indice_generos(versao)
+exibir_relatorio_colunas(versao, COLUNAS_PAGINA)
 
 # Overview das características temporais
 duracao_media = df['duration_min'].mean()
@@ -64,20 +84,31 @@ time_sig_selecionada = st.sidebar.multiselect(
 )
 
 # Filtro por gênero
-generos_tempo = ['Todos'] + sorted(df['track_genre'].unique())
+generos_tempo = ['Todos'] + indice_generos['generos'].tolist()
 genero_temporal = st.sidebar.selectbox("Filtrar por gênero:", generos_tempo)
 
 # Aplicar filtros
-df_filtrado = df[
-    (df['duration_min'] >= duracao_range[0]) & 
-    (df['duration_min'] <= duracao_range[1]) &
-    (df['tempo'] >= bpm_range[0]) & 
-    (df['tempo'] <= bpm_range[1]) &
-    (df['time_signature'].isin(time_sig_selecionada))
-]
-
-if genero_temporal != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['track_genre'] == genero_temporal]
+def filtrar():
+    df_base = df
+
+    if genero_temporal != 'Todos':
+        df_base = df_base.iloc[faixas_do_genero(indice_generos, genero_temporal)]
+
+    return df_base[
+        (df_base['duration_min'] >= duracao_range[0]) & 
+        (df_base['duration_min'] <= duracao_range[1]) &
+        (df_base['tempo'] >= bpm_range[0]) & 
+        (df_base['tempo'] <= bpm_range[1]) &
+        (df_base['time_signature'].isin(time_sig_selecionada))
+    ]
+
+with medir('filtros', 'filtro'):
+    # Guardado na sessão: trocar os eixos dos gráficos não refiltra
+    df_filtrado = derivado_sessao(
+        'analise_temporal_filtrado',
+        (versao, genero_temporal, tuple(duracao_range), tuple(bpm_range), tuple(time_sig_selecionada)),
+        filtrar
+    )
 
 # Métricas após filtros
 st.subheader("📊 Métricas das Faixas Filtradas")
@@ -110,6 +141,7 @@ with col5:
 
 if len(df_filtrado) == 0:
     st.warning("⚠️ Nenhuma faixa encontrada com os filtros aplicados. Ajuste os critérios de filtro.")
+    exibir_painel_desempenho()
     st.stop()
 
 # GRÁFICOS DE ANÁLISE TEMPORAL
@@ -133,7 +165,7 @@ with col1:
                          line_dash="dash", line_color="red",
                          annotation_text=f"Média: {df_filtrado['duration_min'].mean():.1f} min")
     fig_duracao.update_layout(height=400)
-    st.plotly_chart(fig_duracao, use_container_width=True)
+    exibir_grafico(fig_duracao, use_container_width=True)
 
 with col2:
     # Box plot de duração por categoria
@@ -146,7 +178,7 @@ with col2:
         color='categoria_duracao'
     )
     fig_box_duracao.update_layout(height=400, xaxis={'tickangle': 45})
-    st.plotly_chart(fig_box_duracao, use_container_width=True)
+    exibir_grafico(fig_box_duracao, use_container_width=True)
 
 # Gráfico 2: Análise de BPM
 st.subheader("🥁 Análise de Tempo (BPM)")
@@ -167,7 +199,7 @@ with col1:
                      line_dash="dash", line_color="red",
                      annotation_text=f"Média: {df_filtrado['tempo'].mean():.0f} BPM")
     fig_bpm.update_layout(height=400)
-    st.plotly_chart(fig_bpm, use_container_width=True)
+    exibir_grafico(fig_bpm, use_container_width=True)
 
 with col2:
     # BPM por categoria
@@ -180,7 +212,7 @@ with col2:
         color='categoria_tempo'
     )
     fig_bpm_categoria.update_layout(height=400, xaxis={'tickangle': 45})
-    st.plotly_chart(fig_bpm_categoria, use_container_width=True)
+    exibir_grafico(fig_bpm_categoria, use_container_width=True)
 
 # GRÁFICO INTERATIVO: Duração vs BPM
 st.subheader("🔄 Relação entre Duração e BPM")
@@ -201,6 +233,11 @@ cor_selecionada = st.selectbox(
 
 # Amostra para melhor performance
 df_sample = df_filtrado.sample(n=min(3000, len(df_filtrado)), random_state=42)
+if cor_selecionada in ('track_genre', 'genero_principal'):
+    # Pela matriz de pertinência: a faixa aparece na cor de cada um dos seus gêneros
+    indice_cor = indice_generos if cor_selecionada == 'track_genre' else carregar_indice_generos_principais(versao)
+    df_sample = expandir_por_genero(df_sample, indice_cor, coluna=cor_selecionada)
+df_sample = contabilizar('df_sample', df_sample)
 
 fig_duracao_bpm = px.scatter(
     df_sample,
@@ -219,23 +256,24 @@ fig_duracao_bpm = px.scatter(
     opacity=0.7
 )
 fig_duracao_bpm.update_layout(height=500)
-st.plotly_chart(fig_duracao_bpm, use_container_width=True)
+exibir_grafico(fig_duracao_bpm, use_container_width=True)
 
 # Análise por Assinatura Temporal
 st.subheader("🎼 Análise por Assinatura Temporal")
 
 # Estatísticas por time signature
-stats_time_sig = df_filtrado.groupby('time_signature').agg({
-    'track_id': 'count',
-    'popularity': 'mean',
-    'duration_min': 'mean',
-    'tempo': 'mean',
-    'energy': 'mean',
-    'danceability': 'mean'
-}).round(2)
-
-stats_time_sig.columns = ['num_faixas', 'pop_media', 'duracao_media', 'bpm_medio', 'energia_media', 'dance_media']
-stats_time_sig = stats_time_sig.reset_index()
+with medir('estatísticas por assinatura temporal', 'agregacao'):
+    stats_time_sig = df_filtrado.groupby('time_signature').agg({
+        'track_id': 'count',
+        'popularity': 'mean',
+        'duration_min': 'mean',
+        'tempo': 'mean',
+        'energy': 'mean',
+        'danceability': 'mean'
+    }).round(2)
+
+    stats_time_sig.columns = ['num_faixas', 'pop_media', 'duracao_media', 'bpm_medio', 'energia_media', 'dance_media']
+    stats_time_sig = stats_time_sig.reset_index()
 
 col1, col2 = st.columns(2)
 
@@ -248,7 +286,7 @@ with col1:
         title="Distribuição por Assinatura Temporal"
     )
     fig_time_sig.update_traces(textposition='inside', textinfo='percent+label')
-    st.plotly_chart(fig_time_sig, use_container_width=True)
+    exibir_grafico(fig_time_sig, use_container_width=True)
 
 with col2:
     # Características por time signature
@@ -260,24 +298,30 @@ with col2:
         labels={'value': 'Valor Médio', 'time_signature': 'Assinatura Temporal'},
         barmode='group'
     )
-    st.plotly_chart(fig_time_char, use_container_width=True)
+    exibir_grafico(fig_time_char, use_container_width=True)
 
 # Análise por Gênero e Características Temporais
 st.subheader("🎸 Características Temporais por Gênero")
 
 # Top 15 gêneros para análise
-top_generos_tempo = df_filtrado['track_genre'].value_counts().head(15).index.tolist()
-df_top_generos = df_filtrado[df_filtrado['track_genre'].isin(top_generos_tempo)]
+# Cada faixa entra em todos os gêneros em que está classificada
+with medir('estatísticas por gênero', 'agregacao'):
+    df_generos_filtrado = expandir_por_genero(df_filtrado, indice_generos, ['duration_min', 'tempo', 'popularity', 'energy'])
+    if genero_temporal != 'Todos':
+        df_generos_filtrado = df_generos_filtrado[df_generos_filtrado['track_genre'] == genero_temporal]
 
-# Características temporais médias por gênero
-stats_genero_tempo = df_top_generos.groupby('track_genre').agg({
-    'duration_min': 'mean',
-    'tempo': 'mean',
-    'popularity': 'mean',
-    'energy': 'mean'
-}).round(2)
+    top_generos_tempo = contagem_valores(df_generos_filtrado['track_genre']).head(15).index.tolist()
+    df_top_generos = df_generos_filtrado[df_generos_filtrado['track_genre'].isin(top_generos_tempo)]
 
-stats_genero_tempo = stats_genero_tempo.reset_index()
+    # Características temporais médias por gênero
+    stats_genero_tempo = agrupar(df_top_generos, 'track_genre', {
+        'duration_min': 'mean',
+        'tempo': 'mean',
+        'popularity': 'mean',
+        'energy': 'mean'
+    }).round(2)
+
+    stats_genero_tempo = stats_genero_tempo.reset_index()
 
 # Widget para escolher métrica
 metrica_genero = st.selectbox(
@@ -302,7 +346,7 @@ fig_genero_tempo = px.bar(
 )
 fig_genero_tempo.update_traces(texttemplate='%{text:.1f}', textposition='outside')
 fig_genero_tempo.update_layout(height=500, xaxis={'tickangle': 45})
-st.plotly_chart(fig_genero_tempo, use_container_width=True)
+exibir_grafico(fig_genero_tempo, use_container_width=True)
 
 # Análise de Correlações Temporais
 st.subheader("🔗 Correlações com Características Temporais")
@@ -311,7 +355,8 @@ st.subheader("🔗 Correlações com Características Temporais")
 caracteristicas_correlacao = ['duration_min', 'tempo', 'popularity', 'energy', 'danceability', 
                              'valence', 'acousticness', 'loudness']
 
-correlacao_temporal = df_filtrado[caracteristicas_correlacao].corr()
+with medir('matriz de correlação', 'agregacao'):
+    correlacao_temporal = df_filtrado[caracteristicas_correlacao].corr()
 
 fig_corr_tempo = px.imshow(
     correlacao_temporal,
@@ -321,26 +366,28 @@ fig_corr_tempo = px.imshow(
     color_continuous_scale='RdBu_r'
 )
 fig_corr_tempo.update_layout(height=600)
-st.plotly_chart(fig_corr_tempo, use_container_width=True)
+exibir_grafico(fig_corr_tempo, use_container_width=True)
 
 # Análise Avançada: Clusters Temporais
 st.subheader("🎯 Clusters de Características Temporais")
 
 # Criamos bins para análise de clusters
-df_filtrado_cluster = df_filtrado.copy()
-df_filtrado_cluster['duracao_categoria'] = pd.cut(df_filtrado_cluster['duration_min'], 
-                                                 bins=5, labels=['Muito Curta', 'Curta', 'Média', 'Longa', 'Muito Longa'])
-df_filtrado_cluster['bpm_categoria'] = pd.cut(df_filtrado_cluster['tempo'], 
-                                             bins=5, labels=['Muito Lento', 'Lento', 'Médio', 'Rápido', 'Muito Rápido'])
-
-# Heatmap de clusters
-cluster_stats = df_filtrado_cluster.groupby(['duracao_categoria', 'bpm_categoria']).agg({
-    'track_id': 'count',
-    'popularity': 'mean'
-}).round(1)
-
-cluster_counts = cluster_stats['track_id'].unstack(fill_value=0)
-cluster_popularity = cluster_stats['popularity'].unstack(fill_value=0)
+with medir('clusters duração × BPM', 'agregacao'):
+    # Só as colunas do agrupamento: não copia o DataFrame filtrado inteiro
+    df_filtrado_cluster = df_filtrado[['track_id', 'popularity', 'duration_min', 'tempo']].copy()
+    df_filtrado_cluster['duracao_categoria'] = pd.cut(df_filtrado_cluster['duration_min'], 
+                                                     bins=5, labels=['Muito Curta', 'Curta', 'Média', 'Longa', 'Muito Longa'])
+    df_filtrado_cluster['bpm_categoria'] = pd.cut(df_filtrado_cluster['tempo'], 
+                                                 bins=5, labels=['Muito Lento', 'Lento', 'Médio', 'Rápido', 'Muito Rápido'])
+
+    # Heatmap de clusters
+    cluster_stats = df_filtrado_cluster.groupby(['duracao_categoria', 'bpm_categoria']).agg({
+        'track_id': 'count',
+        'popularity': 'mean'
+    }).round(1)
+
+    cluster_counts = cluster_stats['track_id'].unstack(fill_value=0)
+    cluster_popularity = cluster_stats['popularity'].unstack(fill_value=0)
 
 col1, col2 = st.columns(2)
 
@@ -355,7 +402,7 @@ with col1:
         labels={'color': 'Número de Faixas'},
         color_continuous_scale='Blues'
     )
-    st.plotly_chart(fig_cluster_count, use_container_width=True)
+    exibir_grafico(fig_cluster_count, use_container_width=True)
 
 with col2:
     fig_cluster_pop = px.imshow(
@@ -368,7 +415,7 @@ with col2:
         labels={'color': 'Popularidade Média'},
         color_continuous_scale='Reds'
     )
-    st.plotly_chart(fig_cluster_pop, use_container_width=True)
+    exibir_grafico(fig_cluster_pop, use_container_width=True)
 
 # Análise de Extremos Temporais
 st.subheader("⚡ Análise de Extremos Temporais")
@@ -377,17 +424,20 @@ col1, col2, col3 = st.columns(3)
 
 with col1:
     st.markdown("#### 🐌 Faixas Mais Lentas (BPM)")
-    mais_lentas = df_filtrado.nsmallest(5, 'tempo')[['track_name', 'primeiro_artista', 'track_genre', 'tempo']]
+    mais_lentas = df_filtrado.nsmallest(5, 'tempo')[['track_name', 'primeiro_artista', 'tempo']]
+    mais_lentas.insert(2, 'generos', generos_das_faixas(indice_generos, mais_lentas.index))
     st.dataframe(mais_lentas, hide_index=True, use_container_width=True)
 
 with col2:
     st.markdown("#### ⚡ Faixas Mais Rápidas (BPM)")
-    mais_rapidas = df_filtrado.nlargest(5, 'tempo')[['track_name', 'primeiro_artista', 'track_genre', 'tempo']]
+    mais_rapidas = df_filtrado.nlargest(5, 'tempo')[['track_name', 'primeiro_artista', 'tempo']]
+    mais_rapidas.insert(2, 'generos', generos_das_faixas(indice_generos, mais_rapidas.index))
     st.dataframe(mais_rapidas, hide_index=True, use_container_width=True)
 
 with col3:
     st.markdown("#### 📏 Faixas Mais Longas")
-    mais_longas = df_filtrado.nlargest(5, 'duration_min')[['track_name', 'primeiro_artista', 'track_genre', 'duration_min']]
+    mais_longas = df_filtrado.nlargest(5, 'duration_min')[['track_name', 'primeiro_artista', 'duration_min']]
+    mais_longas.insert(2, 'generos', generos_das_faixas(indice_generos, mais_longas.index))
     st.dataframe(mais_longas, hide_index=True, 
                 column_config={'duration_min': st.column_config.NumberColumn('Duração (min)', format="%.1f")},
                 use_container_width=True)
@@ -433,4 +483,6 @@ with st.sidebar:
             st.info("ℹ️ BPM e energia têm correlação moderada")
     
     st.markdown("---")
-    st.info("💡 Use os filtros para explorar diferentes faixas de tempo e duração!")
\ No newline at end of file
+    st.info("💡 Use os filtros para explorar diferentes faixas de tempo e duração!")
+
+exibir_painel_desempenho()
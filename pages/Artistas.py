@@ -4,38 +4,45 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
-from utils.carrega_dados import carregar_dados
+from utils.bootstrap import REPLICAS_BOOTSTRAP, barras_erro, limites_grupo
+from utils.carrega_dados import (carregar_artistas_semelhantes, carregar_faixas, carregar_grafo_colaboracoes,
+                                 carregar_indice_artistas, carregar_indice_busca, carregar_indice_generos,
+                                 carregar_intervalos_artistas, tabela_artistas, versao_dataset)
+from utils.colaboracoes import colaboradores, rede_ego
+from utils.desempenho import iniciar_medicao, medir
+from utils.indices import codigo_artista, faixas_do_artista, generos_das_faixas
+from utils.painel import exibir_grafico, exibir_painel_desempenho, exibir_relatorio_colunas, selecionar_com_busca
+
+# Colunas usadas por esta página: só elas são lidas do armazém e calculadas
+COLUNAS_PAGINA = [
+    'track_id', 'track_name', 'album_name', 'popularity', 'duration_min', 'tempo',
+    'danceability', 'energy', 'valence', 'acousticness', 'chave_musical', 'modo_musical'
+]
 
 st.set_page_config(
     page_title="Análise de Artistas - Spotify Analytics",
     page_icon="🎤",
     layout="wide"
 )
+iniciar_medicao('Artistas')
 
 st.title("🎤 Análise de Artistas")
 st.markdown("### Exploração detalhada dos artistas mais influentes no Spotify")
 
 # Carrega os dados
-df = carregar_dados()
-
-# Prepare data about artists
-df_artistas = df.groupby('primeiro_artista').agg({
-    'track_id': 'count',  # número de faixas
-    'popularity': ['mean', 'max'],
-    'danceability': 'mean',
-    'energy': 'mean',
-    'valence': 'mean',
-    'acousticness': 'mean',
-    'duration_min': 'mean',
-    'track_genre': lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else 'N/A'  # gênero mais comum
-}).round(3)
-
-# Flatten column names
-df_artistas.columns = ['num_faixas', 'pop_media', 'pop_maxima', 'danceability_media', 
-                    'energy_media', 'valence_media', 'acousticness_media', 
-                    'duracao_media', 'genero_principal']
-
-df_artistas = df_artistas.reset_index()
+with medir('carregar dados', 'dados'):
+    # Versão do CSV: chave dos caches do armazém (muda quando o dataset muda)
+    versao = versao_dataset()
+    df = carregar_faixas(versao, COLUNAS_PAGINA)
+    indice_artistas = carregar_indice_artistas(versao)
+    indice_generos = carregar_indice_generos(versao)
+exibir_relatorio_colunas(versao, COLUNAS_PAGINA)
+
+# Estatísticas por artista (calculadas uma vez e compartilhadas entre processos)
+with medir('tabela de artistas', 'agregacao'):
+    df_artistas = tabela_artistas(versao)
+    # Intervalos de 95% das médias (bootstrap), por código de artista
+    intervalos_artistas = carregar_intervalos_artistas(versao)
 
 # Sidebar filters
 st.sidebar.header("🎛️ Filtros de Artistas")
@@ -66,14 +73,15 @@ genero_filtro = st.sidebar.selectbox(
 )
 
 # Apply filters
-df_artistas_filtrado = df_artistas[df_artistas['num_faixas'] >= min_tracks]
-df_artistas_filtrado = df_artistas_filtrado[df_artistas_filtrado['pop_media'] >= pop_min]
+with medir('filtros', 'filtro'):
+    df_artistas_filtrado = df_artistas[df_artistas['num_faixas'] >= min_tracks]
+    df_artistas_filtrado = df_artistas_filtrado[df_artistas_filtrado['pop_media'] >= pop_min]
 
-if genero_filtro != 'Todos':
-    df_artistas_filtrado = df_artistas_filtrado[df_artistas_filtrado['genero_principal'] == genero_filtro]
+    if genero_filtro != 'Todos':
+        df_artistas_filtrado = df_artistas_filtrado[df_artistas_filtrado['genero_principal'] == genero_filtro]
 
-# Sort by popularity
-df_artistas_filtrado = df_artistas_filtrado.sort_values('pop_media', ascending=False)
+    # Sort by popularity
+    df_artistas_filtrado = df_artistas_filtrado.sort_values('pop_media', ascending=False)
 
 # Overview metrics
 st.subheader("📈 Métricas dos Artistas Filtrados")
@@ -94,20 +102,21 @@ with col3:
         st.metric("Faixas por Artista", "N/A")
 with col4:
     if len(df_artistas_filtrado) > 0:
-        artista_top = df_artistas_filtrado.iloc[0]['primeiro_artista']
+        artista_top = df_artistas_filtrado.iloc[0]['artista']
         st.metric("Artista + Popular", artista_top if len(artista_top) < 15 else artista_top[:12] + "...")
     else:
         st.metric("Artista + Popular", "N/A")
 with col5:
     if len(df_artistas_filtrado) > 0:
         max_tracks = df_artistas_filtrado['num_faixas'].max()
-        artista_produtivo = df_artistas_filtrado[df_artistas_filtrado['num_faixas'] == max_tracks].iloc[0]['primeiro_artista']
+        artista_produtivo = df_artistas_filtrado[df_artistas_filtrado['num_faixas'] == max_tracks].iloc[0]['artista']
         st.metric("+ Produtivo", artista_produtivo if len(artista_produtivo) < 15 else artista_produtivo[:12] + "...")
     else:
         st.metric("+ Produtivo", "N/A")
 
 if len(df_artistas_filtrado) == 0:
     st.warning("⚠️ Nenhum artista encontrado com os filtros aplicados. Ajuste os critérios de filtro.")
+    exibir_painel_desempenho()
     st.stop()
 
 # TOP ARTISTS CHARTS
@@ -122,17 +131,25 @@ with col1:
     fig_popular = px.bar(
         top_popular,
         x='pop_media',
-        y='primeiro_artista',
+        y='artista',
         orientation='h',
         title="Artistas com Maior Popularidade Média",
-        labels={'pop_media': 'Popularidade Média', 'primeiro_artista': 'Artista'},
+        labels={'pop_media': 'Popularidade Média', 'artista': 'Artista'},
         color='pop_media',
         color_continuous_scale='Greens',
         text='pop_media'
     )
-    fig_popular.update_traces(texttemplate='%{text:.1f}', textposition='outside')
+    fig_popular.update_traces(
+        texttemplate='%{text:.1f}',
+        textposition='outside',
+        error_x=barras_erro(intervalos_artistas, top_popular.index, 'popularity', top_popular['pop_media'])
+    )
     fig_popular.update_layout(height=500, yaxis={'categoryorder': 'total ascending'})
-    st.plotly_chart(fig_popular, use_container_width=True)
+    exibir_grafico(fig_popular, use_container_width=True)
+    st.caption(
+        f"Barras de erro: intervalo de confiança de 95% da média (bootstrap com {REPLICAS_BOOTSTRAP:,} reamostragens); "
+        "artistas com uma única faixa não têm intervalo."
+    )
 
 # Chart 2: Top Artists by Number of Tracks
 with col2:
@@ -143,17 +160,17 @@ with col2:
     fig_produtivos = px.bar(
         top_produtivos,
         x='num_faixas',
-        y='primeiro_artista',
+        y='artista',
         orientation='h',
         title="Artistas Mais Produtivos (Mais Faixas)",
-        labels={'num_faixas': 'Número de Faixas', 'primeiro_artista': 'Artista'},
+        labels={'num_faixas': 'Número de Faixas', 'artista': 'Artista'},
         color='num_faixas',
         color_continuous_scale='Blues',
         text='num_faixas'
     )
     fig_produtivos.update_traces(texttemplate='%{text}', textposition='outside')
     fig_produtivos.update_layout(height=500, yaxis={'categoryorder': 'total ascending'})
-    st.plotly_chart(fig_produtivos, use_container_width=True)
+    exibir_grafico(fig_produtivos, use_container_width=True)
 
 # INTERACTIVE SCATTER: Popularity vs Number of Tracks
 st.subheader("📊 Popularidade vs Produtividade dos Artistas")
@@ -167,7 +184,7 @@ fig_scatter = px.scatter(
     y='pop_media',
     size='pop_maxima',
     color='genero_principal',
-    hover_data=['primeiro_artista', 'danceability_media', 'energy_media'],
+    hover_data=['artista', 'danceability_media', 'energy_media'],
     title="Relação entre Número de Faixas e Popularidade Média",
     labels={
         'num_faixas': 'Número de Faixas',
@@ -177,24 +194,25 @@ fig_scatter = px.scatter(
     }
 )
 fig_scatter.update_layout(height=500)
-st.plotly_chart(fig_scatter, use_container_width=True)
+exibir_grafico(fig_scatter, use_container_width=True)
 
 # ARTIST PROFILE ANALYSIS
 st.subheader("👤 Análise de Perfil Musical dos Artistas")
 
 # Interactive widget to select specific artist
-artistas_disponiveis = sorted(df_artistas_filtrado['primeiro_artista'].unique().tolist())
+# Busca no servidor: só os artistas encontrados (que passam nos filtros) vão para o navegador
+indice_busca = carregar_indice_busca(versao, 'artistas')
+artistas_disponiveis = np.zeros(len(indice_busca['nomes']), dtype=bool)
+artistas_disponiveis[df_artistas_filtrado.index] = True
 
-if len(artistas_disponiveis) > 0:
-    artista_selecionado = st.selectbox(
-        "Selecione um artista para análise detalhada:",
-        artistas_disponiveis,
-        index=0
-    )
-    
+artista_selecionado = selecionar_com_busca(
+    "Selecione um artista para análise detalhada:", indice_busca, "artista_detalhado", artistas_disponiveis
+)
+
+if artista_selecionado is not None:
     # Get artist data
-    dados_artista = df_artistas_filtrado[df_artistas_filtrado['primeiro_artista'] == artista_selecionado].iloc[0]
-    faixas_artista = df[df['primeiro_artista'] == artista_selecionado]
+    dados_artista = df_artistas_filtrado.loc[codigo_artista(indice_artistas, artista_selecionado)]
+    faixas_artista = df.iloc[faixas_do_artista(indice_artistas, artista_selecionado)]
     
     # Artist metrics
     col1, col2, col3 = st.columns(3)
@@ -235,17 +253,33 @@ if len(artistas_disponiveis) > 0:
     with col1:
         caracteristicas_radar = ['danceability_media', 'energy_media', 'valence_media', 'acousticness_media']
         valores_artista = [dados_artista[carac] for carac in caracteristicas_radar]
+        eixos = [carac.replace('_media', '').replace('_', ' ').title() for carac in caracteristicas_radar]
         
         fig_radar = go.Figure()
         
         fig_radar.add_trace(go.Scatterpolar(
             r=valores_artista,
-            theta=[carac.replace('_media', '').replace('_', ' ').title() for carac in caracteristicas_radar],
+            theta=eixos,
             fill='toself',
             name=artista_selecionado,
             line_color='#1DB954'
         ))
         
+        # Contorno dos limites do intervalo de 95% (sem intervalo para artistas com uma faixa)
+        limites = limites_grupo(
+            intervalos_artistas, dados_artista.name, [carac.replace('_media', '') for carac in caracteristicas_radar]
+        )
+        if not np.isnan(limites[0]).any():
+            for nome, valores in zip(('IC 95% inferior', 'IC 95% superior'), limites):
+                fig_radar.add_trace(go.Scatterpolar(
+                    r=np.r_[valores, valores[:1]],
+                    theta=eixos + eixos[:1],
+                    mode='lines',
+                    name=nome,
+                    legendgroup='intervalo',
+                    line=dict(color='#1DB954', dash='dot', width=1)
+                ))
+        
         fig_radar.update_layout(
             polar=dict(radialaxis=dict(visible=True, range=[0, 1])),
             showlegend=True,
@@ -253,7 +287,7 @@ if len(artistas_disponiveis) > 0:
             height=400
         )
         
-        st.plotly_chart(fig_radar, use_container_width=True)
+        exibir_grafico(fig_radar, use_container_width=True)
     
     with col2:
         # Track popularity distribution for selected artist
@@ -266,21 +300,23 @@ if len(artistas_disponiveis) > 0:
             color_discrete_sequence=['#FF6B35']
         )
         fig_pop_dist.update_layout(height=400)
-        st.plotly_chart(fig_pop_dist, use_container_width=True)
+        exibir_grafico(fig_pop_dist, use_container_width=True)
     
     # Top tracks of the selected artist
     st.subheader(f"🎵 Top 10 Faixas de {artista_selecionado}")
     
     top_tracks = faixas_artista.nlargest(10, 'popularity')[
-        ['track_name', 'album_name', 'track_genre', 'popularity', 'duration_min', 'energy', 'danceability']
+        ['track_name', 'album_name', 'popularity', 'duration_min', 'energy', 'danceability']
     ]
+    # Todos os gêneros da faixa, não só o primeiro do CSV
+    top_tracks.insert(2, 'generos', generos_das_faixas(indice_generos, top_tracks.index))
     
     st.dataframe(
         top_tracks,
         column_config={
             'track_name': 'Faixa',
             'album_name': 'Álbum',
-            'track_genre': 'Gênero',
+            'generos': 'Gêneros',
             'popularity': 'Popularidade',
             'duration_min': st.column_config.NumberColumn('Duração (min)', format="%.1f"),
             'energy': st.column_config.NumberColumn('Energia', format="%.3f"),
@@ -289,32 +325,127 @@ if len(artistas_disponiveis) > 0:
         hide_index=True,
         use_container_width=True
     )
+    
+    # Similar artists (precomputed from the mean audio-feature profile of each artist)
+    st.subheader(f"🎭 Artistas Semelhantes a {artista_selecionado}")
+    
+    with medir('artistas semelhantes', 'agregacao'):
+        artistas_semelhantes = carregar_artistas_semelhantes(versao)
+        codigo_selecionado = codigo_artista(indice_artistas, artista_selecionado)
+        codigos_semelhantes = artistas_semelhantes['vizinhos'][codigo_selecionado][:10]
+        df_semelhantes = df_artistas.loc[
+            codigos_semelhantes, ['artista', 'genero_principal', 'num_faixas', 'pop_media']
+        ].assign(similaridade=artistas_semelhantes['similaridades'][codigo_selecionado][:10])
+    
+    st.dataframe(
+        df_semelhantes,
+        column_config={
+            'artista': 'Artista',
+            'genero_principal': 'Gênero Principal',
+            'num_faixas': 'Faixas',
+            'pop_media': st.column_config.NumberColumn('Popularidade Média', format="%.1f"),
+            'similaridade': st.column_config.ProgressColumn('Similaridade', min_value=-1.0, max_value=1.0, format="%.3f")
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption("Cosseno entre os perfis médios de features de áudio padronizadas (todas as faixas do artista, sem os filtros)")
 
-# COMPARISON BETWEEN ARTISTS
-st.subheader("🥊 Comparação entre Artistas")
+    # Collaboration network (artists credited together on the same track)
+    st.subheader(f"🤝 Rede de Colaborações de {artista_selecionado}")
 
-if len(artistas_disponiveis) >= 2:
-    col1, col2 = st.columns(2)
-    
+    with medir('rede de colaborações', 'agregacao'):
+        grafo = carregar_grafo_colaboracoes(versao)
+        nos, origens, destinos, pesos_arestas = rede_ego(grafo, codigo_selecionado)
+        posicao_pagerank = int((grafo['pagerank'] > grafo['pagerank'][codigo_selecionado]).sum()) + 1
+
+    col1, col2, col3 = st.columns(3)
     with col1:
-        artista1 = st.selectbox("Primeiro artista:", artistas_disponiveis, key="comp1")
-    
+        st.metric("Colaboradores", f"{int(grafo['grau'][codigo_selecionado]):,}")
     with col2:
-        artistas_comparacao = [a for a in artistas_disponiveis if a != artista1]
-        artista2 = st.selectbox("Segundo artista:", artistas_comparacao, key="comp2")
-    
+        st.metric("Faixas em Colaboração", f"{int(grafo['grau_ponderado'][codigo_selecionado]):,}")
+    with col3:
+        st.metric("Centralidade (PageRank)", f"#{posicao_pagerank:,}",
+                  help=f"Posição entre {len(grafo['pagerank']):,} artistas")
+
+    if len(nos) > 1:
+        # Layout radial: o artista no centro e os colaboradores em círculo, do mais frequente em diante
+        angulos = 2 * np.pi * np.arange(len(nos) - 1) / (len(nos) - 1)
+        x = np.r_[0.0, np.cos(angulos)]
+        y = np.r_[0.0, np.sin(angulos)]
+        faixas_juntos = np.r_[grafo['grau_ponderado'][codigo_selecionado], colaboradores(grafo, codigo_selecionado)[1][:len(nos) - 1]]
+        nomes_nos = indice_artistas['nomes'][nos]
+
+        fig_rede = go.Figure()
+        fig_rede.add_trace(go.Scatter(
+            x=np.column_stack([x[origens], x[destinos], np.full(len(origens), np.nan)]).ravel(),
+            y=np.column_stack([y[origens], y[destinos], np.full(len(origens), np.nan)]).ravel(),
+            mode='lines',
+            line=dict(color='rgba(150, 150, 150, 0.4)', width=1),
+            hoverinfo='skip',
+            showlegend=False
+        ))
+        fig_rede.add_trace(go.Scatter(
+            x=x,
+            y=y,
+            mode='markers+text',
+            text=nomes_nos,
+            textposition='top center',
+            marker=dict(
+                size=10 + 30 * np.sqrt(faixas_juntos / faixas_juntos.max()),
+                color=grafo['pagerank'][nos] * len(grafo['pagerank']),
+                colorscale='Viridis',
+                showscale=True,
+                colorbar=dict(title='PageRank<br>(× média)')
+            ),
+            customdata=np.column_stack([faixas_juntos, grafo['grau'][nos]]),
+            hovertemplate="<b>%{text}</b><br>Faixas juntos: %{customdata[0]:.0f}<br>Colaboradores: %{customdata[1]}<extra></extra>",
+            showlegend=False
+        ))
+        fig_rede.update_layout(
+            title=f"Colaboradores mais frequentes de {artista_selecionado}",
+            height=550,
+            xaxis=dict(visible=False),
+            yaxis=dict(visible=False, scaleanchor='x')
+        )
+        exibir_grafico(fig_rede, use_container_width=True)
+        st.caption(
+            "Tamanho = faixas em comum com o artista central; cor = centralidade na rede inteira; "
+            "linhas = colaborações entre os artistas exibidos"
+        )
+    else:
+        st.info(f"{artista_selecionado} não tem faixas em colaboração no dataset.")
+
+# COMPARISON BETWEEN ARTISTS
+st.subheader("🥊 Comparação entre Artistas")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    artista1 = selecionar_com_busca("Primeiro artista:", indice_busca, "comp1", artistas_disponiveis)
+
+with col2:
+    artistas_comparacao = artistas_disponiveis.copy()
+    if artista1 is not None:
+        artistas_comparacao[codigo_artista(indice_artistas, artista1)] = False
+    artista2 = selecionar_com_busca("Segundo artista:", indice_busca, "comp2", artistas_comparacao)
+
+if artista1 is not None and artista2 is not None:
     # Get data for both artists
-    dados_artista1 = df_artistas_filtrado[df_artistas_filtrado['primeiro_artista'] == artista1].iloc[0]
-    dados_artista2 = df_artistas_filtrado[df_artistas_filtrado['primeiro_artista'] == artista2].iloc[0]
+    dados_artista1 = df_artistas_filtrado.loc[codigo_artista(indice_artistas, artista1)]
+    dados_artista2 = df_artistas_filtrado.loc[codigo_artista(indice_artistas, artista2)]
     
     # Comparison chart
     caracteristicas_comp = ['danceability_media', 'energy_media', 'valence_media', 'acousticness_media']
+    colunas_intervalo = [carac.replace('_media', '') for carac in caracteristicas_comp]
     
     fig_comp = go.Figure()
     
     fig_comp.add_trace(go.Scatterpolar(
         r=[dados_artista1[carac] for carac in caracteristicas_comp],
         theta=[carac.replace('_media', '').replace('_', ' ').title() for carac in caracteristicas_comp],
+        customdata=np.column_stack(limites_grupo(intervalos_artistas, dados_artista1.name, colunas_intervalo)),
+        hovertemplate="%{theta}: %{r:.3f}<br>IC 95%: [%{customdata[0]:.3f}, %{customdata[1]:.3f}]",
         fill='toself',
         name=artista1,
         line_color='#1DB954',
@@ -324,6 +455,8 @@ if len(artistas_disponiveis) >= 2:
     fig_comp.add_trace(go.Scatterpolar(
         r=[dados_artista2[carac] for carac in caracteristicas_comp],
         theta=[carac.replace('_media', '').replace('_', ' ').title() for carac in caracteristicas_comp],
+        customdata=np.column_stack(limites_grupo(intervalos_artistas, dados_artista2.name, colunas_intervalo)),
+        hovertemplate="%{theta}: %{r:.3f}<br>IC 95%: [%{customdata[0]:.3f}, %{customdata[1]:.3f}]",
         fill='toself',
         name=artista2,
         line_color='#FF6B35',
@@ -337,7 +470,7 @@ if len(artistas_disponiveis) >= 2:
         height=500
     )
     
-    st.plotly_chart(fig_comp, use_container_width=True)
+    exibir_grafico(fig_comp, use_container_width=True)
     
     # Comparison table
     st.subheader("📊 Tabela Comparativa")
@@ -377,9 +510,10 @@ generos_analise = df_artistas_filtrado['genero_principal'].value_counts().head(8
 
 if len(generos_analise) > 1:
     # Average characteristics by genre
-    stats_genero = df_artistas_filtrado[df_artistas_filtrado['genero_principal'].isin(generos_analise)].groupby('genero_principal')[
-        ['pop_media', 'num_faixas', 'danceability_media', 'energy_media', 'valence_media']
-    ].mean().round(3)
+    with medir('estatísticas por gênero', 'agregacao'):
+        stats_genero = df_artistas_filtrado[df_artistas_filtrado['genero_principal'].isin(generos_analise)].groupby('genero_principal')[
+            ['pop_media', 'num_faixas', 'danceability_media', 'energy_media', 'valence_media']
+        ].mean().round(3)
     
     fig_genero_stats = px.bar(
         stats_genero.reset_index(),
@@ -390,7 +524,7 @@ if len(generos_analise) > 1:
         barmode='group'
     )
     fig_genero_stats.update_layout(height=500, xaxis={'tickangle': 45})
-    st.plotly_chart(fig_genero_stats, use_container_width=True)
+    exibir_grafico(fig_genero_stats, use_container_width=True)
 
 # Sidebar with insights
 with st.sidebar:
@@ -402,7 +536,7 @@ with st.sidebar:
         artista_produtivo = df_artistas_filtrado.loc[df_artistas_filtrado['num_faixas'].idxmax()]
         st.metric(
             "Mais Produtivo",
-            artista_produtivo['primeiro_artista'][:20] + ("..." if len(artista_produtivo['primeiro_artista']) > 20 else ""),
+            artista_produtivo['artista'][:20] + ("..." if len(artista_produtivo['artista']) > 20 else ""),
             f"{artista_produtivo['num_faixas']} faixas"
         )
 
@@ -410,7 +544,7 @@ with st.sidebar:
         artista_popular = df_artistas_filtrado.loc[df_artistas_filtrado['pop_media'].idxmax()]
         st.metric(
             "Mais Popular",
-            artista_popular['primeiro_artista'][:20] + ("..." if len(artista_popular['primeiro_artista']) > 20 else ""),
+            artista_popular['artista'][:20] + ("..." if len(artista_popular['artista']) > 20 else ""),
             f"{artista_popular['pop_media']:.1f}/100"
         )
 
@@ -426,4 +560,6 @@ with st.sidebar:
             st.info("ℹ️ Pouca correlação entre número de faixas e popularidade")
 
     st.markdown("---")
-    st.info("💡 Use os filtros acima para focar em artistas específicos por produtividade, gênero ou popularidade!")
\ No newline at end of file
+    st.info("💡 Use os filtros acima para focar em artistas específicos por produtividade, gênero ou popularidade!")
+
+exibir_painel_desempenho()
@@ -0,0 +1,142 @@
+import time
+import streamlit as st
+from utils.busca import buscar_faixas
+from utils.carrega_dados import carregar_faixas, carregar_indice_semelhanca, carregar_indice_textual, versao_dataset
+from utils.desempenho import iniciar_medicao, medir
+from utils.memoria_sessao import derivado_sessao
+from utils.painel import exibir_painel_desempenho, exibir_relatorio_colunas
+from utils.semelhanca import SONDAS_PADRAO, combinar_vizinhos, faixas_semelhantes
+
+# Colunas usadas por esta página: só elas são lidas do armazém e calculadas
+COLUNAS_PAGINA = ['track_name', 'artists', 'album_name', 'track_genre', 'popularity', 'duration_min']
+
+st.set_page_config(
+    page_title="Busca de Faixas - Spotify Analytics",
+    page_icon="🔍",
+    layout="wide"
+)
+iniciar_medicao('Busca de Faixas')
+
+st.title("🔍 Busca de Faixas")
+st.markdown("### Encontre músicas pelo nome da faixa, do artista ou do álbum")
+
+# Carrega os dados (faixas únicas + índice invertido de termos)
+with medir('carregar dados', 'dados'):
+    # Versão do CSV: chave dos caches do armazém (muda quando o dataset muda)
+    versao = versao_dataset()
+    df = carregar_faixas(versao, COLUNAS_PAGINA)
+    indice_textual = carregar_indice_textual(versao)
+exibir_relatorio_colunas(versao, COLUNAS_PAGINA)
+
+# Sidebar
+st.sidebar.header("⚙️ Resultados")
+por_pagina = st.sidebar.selectbox("Faixas por página:", [10, 25, 50, 100], index=1)
+
+consulta = st.text_input(
+    "Buscar:",
+    placeholder="Ex.: nome da música, artista ou álbum (acentos e maiúsculas são ignorados)"
+)
+
+if not consulta.strip():
+    st.info("💡 Digite um ou mais termos. Todos precisam aparecer na faixa; o último pode ser só o começo de uma palavra.")
+    exibir_painel_desempenho()
+    st.stop()
+
+# A ordem completa fica na sessão: trocar de página não refaz a busca
+with medir('busca', 'filtro'):
+    inicio_busca = time.perf_counter()
+    resultados = derivado_sessao('busca_resultados', (versao, consulta), lambda: buscar_faixas(indice_textual, consulta))
+    tempo_busca_ms = (time.perf_counter() - inicio_busca) * 1000
+
+if len(resultados) == 0:
+    st.warning(f"Nenhuma faixa encontrada para \"{consulta}\".")
+    exibir_painel_desempenho()
+    st.stop()
+
+# Nova consulta volta para a primeira página
+total_paginas = (len(resultados) - 1) // por_pagina + 1
+if st.session_state.get('busca_consulta') != consulta:
+    st.session_state['busca_consulta'] = consulta
+    st.session_state['busca_pagina'] = 1
+st.session_state['busca_pagina'] = min(st.session_state.get('busca_pagina', 1), total_paginas)
+
+col1, col2 = st.columns([3, 1])
+with col2:
+    pagina = st.number_input("Página:", min_value=1, max_value=total_paginas, step=1, key='busca_pagina')
+with col1:
+    st.metric("Faixas encontradas", f"{len(resultados):,}")
+    st.caption(f"Busca em {tempo_busca_ms:.1f} ms | página {pagina} de {total_paginas}")
+
+# Só as linhas da página atual são montadas e enviadas ao navegador
+inicio = (pagina - 1) * por_pagina
+pagina_df = df.iloc[resultados[inicio:inicio + por_pagina]]
+
+st.dataframe(
+    pagina_df,
+    column_config={
+        'track_name': 'Faixa',
+        'artists': 'Artistas',
+        'album_name': 'Álbum',
+        'track_genre': 'Gênero',
+        'popularity': 'Popularidade',
+        'duration_min': st.column_config.NumberColumn('Duração (min)', format="%.1f")
+    },
+    hide_index=True,
+    use_container_width=True
+)
+
+# SIMILAR TRACKS
+st.subheader("🎯 Faixas Semelhantes")
+st.caption("Vizinhos mais próximos pelas features de áudio padronizadas (danceability, energy, valence, tempo...)")
+
+codigos_pagina = resultados[inicio:inicio + por_pagina].tolist()
+col1, col2 = st.columns([3, 1])
+with col1:
+    sementes = st.multiselect(
+        "Faixas de referência (desta página):",
+        codigos_pagina,
+        default=codigos_pagina[:1],
+        format_func=lambda codigo: f"{df['track_name'].iloc[codigo]} — {df['artists'].iloc[codigo]}"
+    )
+with col2:
+    num_semelhantes = st.slider("Quantidade:", 5, 50, 10, 5)
+
+with medir('índice de semelhança', 'dados'):
+    indice_semelhanca = carregar_indice_semelhanca(versao)
+sondas = SONDAS_PADRAO
+if 'ivf' in indice_semelhanca:
+    # Catálogo grande: busca aproximada, com o ajuste entre precisão e velocidade
+    sondas = st.select_slider(
+        "Precisão da busca aproximada (grupos visitados):",
+        options=[1, 2, 4, 8, 16, 32, 64],
+        value=SONDAS_PADRAO,
+        help="Mais grupos encontram mais vizinhos exatos, mas a busca demora mais"
+    )
+
+if sementes:
+    # Uma única consulta ao índice para todas as sementes
+    with medir('faixas semelhantes', 'agregacao'):
+        posicoes, distancias = faixas_semelhantes(indice_semelhanca, sementes, num_semelhantes, sondas)
+        posicoes, distancias, origem = combinar_vizinhos(posicoes, distancias, sementes, num_semelhantes)
+
+    df_semelhantes = df.iloc[posicoes][['track_name', 'artists', 'track_genre', 'popularity']].assign(
+        semelhante_a=df['track_name'].iloc[sementes].to_numpy()[origem],
+        distancia=distancias
+    )
+    st.dataframe(
+        df_semelhantes,
+        column_config={
+            'track_name': 'Faixa',
+            'artists': 'Artistas',
+            'track_genre': 'Gênero',
+            'popularity': 'Popularidade',
+            'semelhante_a': 'Semelhante a',
+            'distancia': st.column_config.NumberColumn('Distância', format="%.3f")
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+else:
+    st.info("Selecione ao menos uma faixa de referência.")
+
+exibir_painel_desempenho()
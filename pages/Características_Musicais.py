@@ -4,19 +4,39 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
-from utils.carrega_dados import carregar_dados
+from utils.agrupamento import contagem_valores
+from utils.carrega_dados import (carregar_faixas, carregar_indice_generos, carregar_indice_generos_principais,
+                                 clusters_faixas, versao_dataset)
+from utils.desempenho import iniciar_medicao, medir
+from utils.indices import expandir_por_genero, faixas_do_genero, generos_das_faixas
+from utils.memoria_sessao import contabilizar, derivado_sessao
+from utils.painel import exibir_grafico, exibir_painel_desempenho, exibir_relatorio_colunas
+
+# Colunas usadas por esta página: só elas são lidas do armazém e calculadas
+COLUNAS_PAGINA = [
+    'track_name', 'primeiro_artista', 'popularity',
+    'duration_min', 'danceability', 'energy', 'valence', 'acousticness', 'instrumentalness',
+    'liveness', 'speechiness', 'loudness', 'tempo', 'categoria_popularidade', 'modo_musical'
+]
 
 st.set_page_config(
     page_title="Características Musicais - Spotify Analytics",
     page_icon="🎼",
     layout="wide"
 )
+iniciar_medicao('Características Musicais')
 
 st.title("🎼 Análise de Características Musicais")
 st.markdown("### Exploração detalhada das features de áudio do Spotify")
 
-# Carrega os dados
-df = carregar_dados()
+# Carrega os dados (faixas únicas + matriz faixa × gênero)
+with medir('carregar dados', 'dados'):
+    # Versão do CSV: chave dos caches do armazém (muda quando o dataset muda)
+    versao = versao_dataset()
+    df = carregar_faixas(versao, COLUNAS_PAGINA)
+    indice_generos = carregar_indice_generos(versao)
+    indice_principais = carregar_indice_generos_principais(versao)
+exibir_relatorio_colunas(versao, COLUNAS_PAGINA)
 
 # Explicação das características
 with st.expander("ℹ️ O que significam as características musicais?"):
@@ -44,7 +64,7 @@ st.sidebar.header("🎛️ Filtros Interativos")
 # Filtros principais
 genero_selecionado = st.sidebar.selectbox(
     "🎸 Gênero Musical:",
-    ['Todos'] + sorted(df['track_genre'].unique().tolist())
+    ['Todos'] + indice_generos['generos'].tolist()
 )
 
 # Filtro de popularidade
@@ -72,21 +92,55 @@ valence_range = st.sidebar.slider(
 )
 
 # Aplicar filtros
-df_filtrado = df.copy()
-
-if genero_selecionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['track_genre'] == genero_selecionado]
-
-df_filtrado = df_filtrado[
-    (df_filtrado['popularity'] >= pop_range[0]) & 
-    (df_filtrado['popularity'] <= pop_range[1]) &
-    (df_filtrado['energy'] >= energy_range[0]) & 
-    (df_filtrado['energy'] <= energy_range[1]) &
-    (df_filtrado['danceability'] >= danceability_range[0]) & 
-    (df_filtrado['danceability'] <= danceability_range[1]) &
-    (df_filtrado['valence'] >= valence_range[0]) & 
-    (df_filtrado['valence'] <= valence_range[1])
-]
+def filtrar():
+    df_filtrado = df
+
+    if genero_selecionado != 'Todos':
+        df_filtrado = df_filtrado.iloc[faixas_do_genero(indice_generos, genero_selecionado)]
+
+    return df_filtrado[
+        (df_filtrado['popularity'] >= pop_range[0]) & 
+        (df_filtrado['popularity'] <= pop_range[1]) &
+        (df_filtrado['energy'] >= energy_range[0]) & 
+        (df_filtrado['energy'] <= energy_range[1]) &
+        (df_filtrado['danceability'] >= danceability_range[0]) & 
+        (df_filtrado['danceability'] <= danceability_range[1]) &
+        (df_filtrado['valence'] >= valence_range[0]) & 
+        (df_filtrado['valence'] <= valence_range[1])
+    ]
+
+chave_filtros = (versao, genero_selecionado, tuple(pop_range), tuple(energy_range), tuple(danceability_range), tuple(valence_range))
+with medir('filtros', 'filtro'):
+    # Guardado na sessão: trocar os eixos dos gráficos não refiltra
+    df_filtrado = derivado_sessao('caracteristicas_filtrado', chave_filtros, filtrar)
+
+# Clusters de faixas: k-means sobre as features padronizadas das faixas que passam nos filtros
+st.sidebar.markdown("### 🎯 Clusters")
+num_clusters = st.sidebar.slider("Número de clusters (k):", 2, 12, 5)
+
+clusters = None
+if len(df_filtrado) >= num_clusters:
+    with medir('k-means', 'agregacao'):
+        clusters = clusters_faixas(versao, num_clusters, chave_filtros, df_filtrado.index.to_numpy())
+
+    # O cluster de cada faixa vira mais uma dimensão de filtro
+    clusters_selecionados = st.sidebar.multiselect(
+        "Mostrar clusters:",
+        list(range(1, num_clusters + 1)),
+        default=list(range(1, num_clusters + 1)),
+        format_func=lambda cluster: f"Cluster {cluster}"
+    )
+    # Nenhum cluster marcado equivale a todos: esvaziar a seleção não zera as faixas
+    if not clusters_selecionados:
+        st.sidebar.caption("Nenhum cluster selecionado: mostrando todos.")
+    df_filtrado_base = df_filtrado
+    if 0 < len(clusters_selecionados) < num_clusters:
+        with medir('filtro de clusters', 'filtro'):
+            df_filtrado = df_filtrado[np.isin(clusters['rotulos'], clusters_selecionados)]
+
+# Uma linha por (faixa, gênero principal): faixas com gêneros de vários grupos contam em cada um
+with medir('expansão por gênero principal', 'agregacao'):
+    df_principal = expandir_por_genero(df_filtrado, indice_principais, coluna='genero_principal')
 
 # Métricas resumo
 st.subheader("📊 Resumo dos Dados Filtrados")
@@ -115,6 +169,9 @@ with col2:
 
 # Amostra para melhor performance
 df_sample = df_filtrado.sample(n=min(3000, len(df_filtrado)), random_state=42) if len(df_filtrado) > 3000 else df_filtrado
+# Todos os gêneros de cada faixa, não só o primeiro
+df_sample = df_sample.assign(generos=generos_das_faixas(indice_generos, df_sample.index))
+contabilizar('df_sample', df_sample)
 
 fig_scatter = px.scatter(
     df_sample,
@@ -122,23 +179,24 @@ fig_scatter = px.scatter(
     y=y_axis,
     color='popularity',
     size='duration_min',
-    hover_data=['track_name', 'primeiro_artista', 'track_genre'],
+    hover_data=['track_name', 'primeiro_artista', 'generos'],
     title=f"Relação entre {x_axis.title()} e {y_axis.title()}",
     labels={
         x_axis: x_axis.replace('_', ' ').title(),
         y_axis: y_axis.replace('_', ' ').title(),
-        'popularity': 'Popularidade'
+        'popularity': 'Popularidade',
+        'generos': 'Gêneros'
     },
     color_continuous_scale='Viridis'
 )
 fig_scatter.update_layout(height=500)
-st.plotly_chart(fig_scatter, use_container_width=True)
+exibir_grafico(fig_scatter, use_container_width=True)
 
 # GRÁFICO INTERATIVO 2: Radar Chart Comparativo
 st.subheader("📡 Comparação Radar de Gêneros Musicais")
 
 # Widget para seleção de gêneros
-generos_disponiveis = sorted(df_filtrado['genero_principal'].unique())
+generos_disponiveis = sorted(df_principal['genero_principal'].unique())
 generos_comparar = st.multiselect(
     "Selecione até 4 gêneros para comparação:",
     generos_disponiveis,
@@ -154,7 +212,7 @@ if generos_comparar:
     cores = ['#1DB954', '#FF6B35', '#4ECDC4', '#45B7D1']
     
     for i, genero in enumerate(generos_comparar[:4]):
-        dados_genero = df_filtrado[df_filtrado['genero_principal'] == genero]
+        dados_genero = df_principal[df_principal['genero_principal'] == genero]
         if len(dados_genero) > 0:
             valores_medios = [dados_genero[carac].mean() for carac in caracteristicas_radar]
             
@@ -178,7 +236,7 @@ if generos_comparar:
         height=600
     )
     
-    st.plotly_chart(fig_radar, use_container_width=True)
+    exibir_grafico(fig_radar, use_container_width=True)
 
 # GRÁFICO 3: Histogramas das características
 st.subheader("📈 Distribuição das Características Musicais")
@@ -200,7 +258,7 @@ with col1:
         color_discrete_sequence=['#1DB954']
     )
     fig_hist1.update_layout(height=400)
-    st.plotly_chart(fig_hist1, use_container_width=True)
+    exibir_grafico(fig_hist1, use_container_width=True)
 
 with col2:
     caracteristica_hist2 = st.selectbox("Segunda característica:", caracteristicas_hist, index=1)
@@ -214,7 +272,7 @@ with col2:
         color_discrete_sequence=['#FF6B35']
     )
     fig_hist2.update_layout(height=400)
-    st.plotly_chart(fig_hist2, use_container_width=True)
+    exibir_grafico(fig_hist2, use_container_width=True)
 
 # GRÁFICO INTERATIVO 4: Box Plot por Gênero
 st.subheader("📦 Box Plot - Variação por Gênero Musical")
@@ -227,8 +285,14 @@ caracteristica_box = st.selectbox(
 )
 
 # Pegamos apenas os top 10 gêneros para melhor visualização
-top_generos = df_filtrado['track_genre'].value_counts().head(10).index.tolist()
-df_top_generos = df_filtrado[df_filtrado['track_genre'].isin(top_generos)]
+# Cada faixa entra em todos os gêneros em que está classificada
+with medir('top gêneros (box plot)', 'agregacao'):
+    df_generos_filtrado = expandir_por_genero(df_filtrado, indice_generos, [caracteristica_box])
+    if genero_selecionado != 'Todos':
+        df_generos_filtrado = df_generos_filtrado[df_generos_filtrado['track_genre'] == genero_selecionado]
+
+    top_generos = contagem_valores(df_generos_filtrado['track_genre']).head(10).index.tolist()
+    df_top_generos = df_generos_filtrado[df_generos_filtrado['track_genre'].isin(top_generos)]
 
 fig_box = px.box(
     df_top_generos,
@@ -242,7 +306,7 @@ fig_box = px.box(
 )
 fig_box.update_layout(height=500)
 fig_box.update_layout(xaxis={'tickangle': 45})
-st.plotly_chart(fig_box, use_container_width=True)
+exibir_grafico(fig_box, use_container_width=True)
 
 # ANÁLISE AVANÇADA: Mapa de calor de correlações
 st.subheader("🌡️ Mapa de Calor - Correlações entre Características")
@@ -250,7 +314,8 @@ st.subheader("🌡️ Mapa de Calor - Correlações entre Características")
 caracteristicas_corr = ['popularity', 'danceability', 'energy', 'loudness', 'speechiness',
                        'acousticness', 'instrumentalness', 'liveness', 'valence', 'tempo']
 
-correlacao_matrix = df_filtrado[caracteristicas_corr].corr()
+with medir('matriz de correlação', 'agregacao'):
+    correlacao_matrix = df_filtrado[caracteristicas_corr].corr()
 
 fig_heatmap = px.imshow(
     correlacao_matrix,
@@ -260,7 +325,7 @@ fig_heatmap = px.imshow(
     color_continuous_scale='RdBu_r'
 )
 fig_heatmap.update_layout(height=600)
-st.plotly_chart(fig_heatmap, use_container_width=True)
+exibir_grafico(fig_heatmap, use_container_width=True)
 
 # GRÁFICO INTERATIVO 5: Violin Plot
 st.subheader("🎻 Violin Plot - Densidade de Distribuição")
@@ -283,7 +348,8 @@ with col2:
     )
 
 fig_violin = px.violin(
-    df_filtrado,
+    # Por gênero principal, cada faixa entra no violino de cada grupo dos seus gêneros
+    df_principal if agrupamento_violin == 'genero_principal' else df_filtrado,
     x=agrupamento_violin,
     y=caracteristica_violin,
     title=f"Densidade de {caracteristica_violin.replace('_', ' ').title()} por {agrupamento_violin.replace('_', ' ').title()}",
@@ -294,37 +360,95 @@ fig_violin = px.violin(
 )
 fig_violin.update_layout(height=500)
 fig_violin.update_layout(xaxis={'tickangle': 45})
-st.plotly_chart(fig_violin, use_container_width=True)
+exibir_grafico(fig_violin, use_container_width=True)
 
-# Análise de clusters usando características principais
+# Análise de clusters: k-means em mini-lotes sobre todas as features de áudio padronizadas
 st.subheader("🎯 Análise de Clusters Musicais")
 
-if len(df_filtrado) > 0:
-    # Calculamos estatísticas por gênero principal
-    stats_por_genero = df_filtrado.groupby('genero_principal')[
-        ['danceability', 'energy', 'valence', 'acousticness']
-    ].mean().reset_index()
-    
-    # Criamos um gráfico 3D
-    fig_3d = px.scatter_3d(
-        stats_por_genero,
-        x='danceability',
-        y='energy',
-        z='valence',
-        color='acousticness',
-        size=[1]*len(stats_por_genero),
-        hover_data=['genero_principal'],
-        title="Clusters 3D de Gêneros por Características Musicais",
-        labels={
-            'danceability': 'Danceabilidade',
-            'energy': 'Energia',
-            'valence': 'Valência',
-            'acousticness': 'Acousticness'
-        },
-        color_continuous_scale='Viridis'
+if clusters is not None:
+    st.caption(
+        f"k-means com k = {num_clusters} sobre as faixas que passam nos filtros (antes do filtro de clusters); "
+        "centroides nas unidades originais das features"
     )
-    fig_3d.update_layout(height=600)
-    st.plotly_chart(fig_3d, use_container_width=True)
+    
+    df_centroides = clusters['centroides'].assign(faixas=clusters['tamanhos']).reset_index()
+    df_centroides['percentual'] = 100 * df_centroides['faixas'] / df_centroides['faixas'].sum()
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.dataframe(
+            df_centroides,
+            column_config={
+                'cluster': 'Cluster',
+                'faixas': 'Faixas',
+                'percentual': st.column_config.NumberColumn('% das faixas', format="%.1f%%"),
+                'tempo': st.column_config.NumberColumn('Tempo (BPM)', format="%.1f"),
+                'loudness': st.column_config.NumberColumn('Loudness (dB)', format="%.1f"),
+                **{
+                    carac: st.column_config.NumberColumn(carac.title(), format="%.3f")
+                    for carac in ['danceability', 'energy', 'valence', 'acousticness', 'instrumentalness',
+                                  'speechiness', 'liveness']
+                }
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+    
+    with col2:
+        fig_tamanhos = px.bar(
+            df_centroides,
+            x='cluster',
+            y='faixas',
+            title="Faixas por Cluster",
+            labels={'cluster': 'Cluster', 'faixas': 'Número de Faixas'},
+            color=df_centroides['cluster'].astype(str),
+            color_discrete_sequence=px.colors.qualitative.Plotly
+        )
+        fig_tamanhos.update_layout(showlegend=False, height=400)
+        exibir_grafico(fig_tamanhos, use_container_width=True)
+    
+    # Amostra das faixas (com o filtro de clusters) e os centroides no espaço 3D
+    if len(df_filtrado) > 0:
+        rotulos_filtrados = pd.Series(clusters['rotulos'], index=df_filtrado_base.index)[df_filtrado.index]
+        df_amostra_clusters = df_filtrado[['track_name', 'danceability', 'energy', 'valence']].assign(
+            cluster=rotulos_filtrados.astype(str)
+        )
+        if len(df_amostra_clusters) > 3000:
+            df_amostra_clusters = df_amostra_clusters.sample(3000, random_state=42)
+        
+        fig_3d = px.scatter_3d(
+            df_amostra_clusters,
+            x='danceability',
+            y='energy',
+            z='valence',
+            color='cluster',
+            hover_data=['track_name'],
+            opacity=0.5,
+            title="Clusters de Faixas por Características Musicais (amostra)",
+            labels={
+                'danceability': 'Danceabilidade',
+                'energy': 'Energia',
+                'valence': 'Valência',
+                'cluster': 'Cluster'
+            },
+            category_orders={'cluster': [str(c) for c in range(1, num_clusters + 1)]},
+            color_discrete_sequence=px.colors.qualitative.Plotly
+        )
+        fig_3d.update_traces(marker=dict(size=3))
+        fig_3d.add_trace(go.Scatter3d(
+            x=df_centroides['danceability'],
+            y=df_centroides['energy'],
+            z=df_centroides['valence'],
+            mode='markers+text',
+            text=[f"C{c}" for c in df_centroides['cluster']],
+            marker=dict(size=8, color='black', symbol='diamond'),
+            name='Centroides'
+        ))
+        fig_3d.update_layout(height=600)
+        exibir_grafico(fig_3d, use_container_width=True)
+else:
+    st.warning("Faixas insuficientes para agrupar com os filtros atuais")
 
 # Sidebar com insights
 with st.sidebar:
@@ -346,13 +470,13 @@ with st.sidebar:
         )
         
         # Gênero mais representativo
-        if len(df_filtrado['genero_principal'].unique()) > 0:
-            genero_top = df_filtrado['genero_principal'].value_counts().index[0]
+        if len(df_principal) > 0:
+            genero_top = contagem_valores(df_principal['genero_principal']).index[0]
             st.metric("Gênero Principal", genero_top)
         
         # Correlação mais forte
         corr_matrix = df_filtrado[caracteristicas].corr()
-        np.fill_diagonal(corr_matrix.values, 0)  # Remove diagonal
+        corr_matrix = corr_matrix.mask(np.eye(len(corr_matrix), dtype=bool), 0)  # Remove diagonal
         max_corr = corr_matrix.abs().max().max()
         
         if max_corr > 0:
@@ -361,4 +485,6 @@ with st.sidebar:
         st.warning("Ajuste os filtros para ver dados")
     
     st.markdown("---")
-    st.info("💡 Explore diferentes combinações de filtros para descobrir padrões únicos nas características musicais!")
\ No newline at end of file
+    st.info("💡 Explore diferentes combinações de filtros para descobrir padrões únicos nas características musicais!")
+
+exibir_painel_desempenho()
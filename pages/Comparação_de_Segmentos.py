@@ -0,0 +1,142 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from utils.carrega_dados import carregar_indice_generos, carregar_momentos_segmentos, versao_dataset
+from utils.desempenho import iniciar_medicao, medir
+from utils.painel import exibir_grafico, exibir_painel_desempenho
+from utils.segmentos import DIMENSOES_SEGMENTO, comparar_segmentos, somar_segmento
+
+st.set_page_config(
+    page_title="Comparação de Segmentos - Spotify Analytics",
+    page_icon="⚖️",
+    layout="wide"
+)
+iniciar_medicao('Comparação de Segmentos')
+
+st.title("⚖️ Comparação de Segmentos")
+st.markdown("### Dois conjuntos de filtros lado a lado, em todas as features de áudio")
+
+# Estatísticas por célula de segmento: a página não lê as faixas
+with medir('carregar dados', 'dados'):
+    # Versão do CSV: chave dos caches do armazém (muda quando o dataset muda)
+    versao = versao_dataset()
+    momentos = carregar_momentos_segmentos(versao)
+    indice_generos = carregar_indice_generos(versao)
+
+def definir_segmento(titulo, prefixo, padrao):
+    """
+    Widgets de um segmento; retorna (gênero, seleção por dimensão)
+    """
+    st.markdown(f"#### {titulo}")
+    genero = st.selectbox(
+        "🎸 Gênero Musical:", ['Todos'] + indice_generos['generos'].tolist(), key=f"{prefixo}_genero"
+    )
+    selecao = {}
+    for dimensao, rotulo in DIMENSOES_SEGMENTO.items():
+        selecao[dimensao] = st.multiselect(
+            f"{rotulo}:",
+            momentos[dimensao].tolist(),
+            default=padrao.get(dimensao, []),
+            format_func=lambda valor: (
+                ('Sim' if valor else 'Não') if isinstance(valor, bool) else 'Sem valor' if pd.isna(valor) else str(valor)
+            ),
+            key=f"{prefixo}_{dimensao}",
+            placeholder="Todos"
+        )
+    return None if genero == 'Todos' else indice_generos['generos'].get_loc(genero), selecao
+
+col1, col2 = st.columns(2)
+with col1:
+    genero_a, selecao_a = definir_segmento("🅰️ Segmento A", 'segmento_a', {'explicit': [True]})
+with col2:
+    genero_b, selecao_b = definir_segmento("🅱️ Segmento B", 'segmento_b', {'explicit': [False]})
+
+# Cada segmento é a soma das células que ele seleciona: não há passada pelas faixas
+with medir('soma das células', 'agregacao'):
+    segmento_a = somar_segmento(momentos, selecao_a, genero_a)
+    segmento_b = somar_segmento(momentos, selecao_b, genero_b)
+    comparacao = comparar_segmentos(momentos, segmento_a, segmento_b)
+
+col1, col2 = st.columns(2)
+with col1:
+    st.metric("Faixas no Segmento A", f"{segmento_a[0]:,}")
+with col2:
+    st.metric("Faixas no Segmento B", f"{segmento_b[0]:,}")
+
+if segmento_a[0] < 2 or segmento_b[0] < 2:
+    st.warning("⚠️ Cada segmento precisa de pelo menos 2 faixas. Ajuste os filtros.")
+    exibir_painel_desempenho()
+    st.stop()
+
+# STATISTICS TABLE
+st.subheader("📋 Estatísticas por Característica")
+st.dataframe(
+    comparacao.assign(sobreposicao=100 * comparacao['sobreposicao']),
+    column_config={
+        'caracteristica': 'Característica',
+        'media_a': st.column_config.NumberColumn('Média A', format="%.3f"),
+        'media_b': st.column_config.NumberColumn('Média B', format="%.3f"),
+        'desvio_a': st.column_config.NumberColumn('Desvio A', format="%.3f"),
+        'desvio_b': st.column_config.NumberColumn('Desvio B', format="%.3f"),
+        'diferenca': st.column_config.NumberColumn('Diferença (B - A)', format="%+.3f"),
+        'cohen_d': st.column_config.NumberColumn('d de Cohen', format="%+.2f"),
+        'sobreposicao': st.column_config.ProgressColumn('Sobreposição', min_value=0.0, max_value=100.0, format="%.0f%%")
+    },
+    hide_index=True,
+    use_container_width=True
+)
+st.caption(
+    "d de Cohen: diferença das médias em desvios-padrão combinados (|d| ≈ 0,2 pequeno, 0,5 médio, 0,8 grande). "
+    "Sobreposição: fração comum dos histogramas normalizados (100% = distribuições iguais)."
+)
+
+col1, col2 = st.columns(2)
+
+with col1:
+    # Effect sizes, largest first
+    df_efeitos = comparacao.assign(magnitude=comparacao['cohen_d'].abs()).sort_values('magnitude')
+    fig_efeitos = px.bar(
+        df_efeitos,
+        x='cohen_d',
+        y='caracteristica',
+        orientation='h',
+        title="Tamanho do Efeito (B em relação a A)",
+        labels={'cohen_d': 'd de Cohen', 'caracteristica': 'Característica'},
+        color='cohen_d',
+        color_continuous_scale='RdBu',
+        color_continuous_midpoint=0
+    )
+    for limite in (-0.8, -0.5, -0.2, 0.2, 0.5, 0.8):
+        fig_efeitos.add_vline(x=limite, line_dash='dot', line_color='lightgray')
+    fig_efeitos.update_layout(height=450)
+    exibir_grafico(fig_efeitos, use_container_width=True)
+
+with col2:
+    # Distribution overlap of one feature, from the cached histograms
+    caracteristica = st.selectbox("Distribuição de:", comparacao['caracteristica'].tolist())
+    j = comparacao.index[comparacao['caracteristica'] == caracteristica][0]
+    bordas = np.asarray(momentos['bordas'])[j]
+    centros = (bordas[:-1] + bordas[1:]) / 2
+
+    fig_distribuicao = go.Figure()
+    for nome, (_, _, histogramas), cor in (('A', segmento_a, '#1DB954'), ('B', segmento_b, '#FF6B35')):
+        fig_distribuicao.add_trace(go.Bar(
+            x=centros,
+            y=histogramas[j] / histogramas[j].sum(),
+            name=f"Segmento {nome}",
+            marker_color=cor,
+            opacity=0.6
+        ))
+    fig_distribuicao.update_layout(
+        barmode='overlay',
+        bargap=0,
+        title=f"{caracteristica}: sobreposição de {comparacao['sobreposicao'].iloc[j]:.0%}",
+        xaxis_title=caracteristica,
+        yaxis_title="Fração das Faixas",
+        height=400
+    )
+    exibir_grafico(fig_distribuicao, use_container_width=True)
+
+exibir_painel_desempenho()
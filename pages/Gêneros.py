@@ -4,24 +4,48 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
-from utils.carrega_dados import carregar_dados
+import scipy.sparse as sp
+from scipy.cluster.hierarchy import dendrogram, fcluster
+from utils.agrupamento import contagem_valores
+from utils.carrega_dados import (carregar_coocorrencia_generos, carregar_distancias_generos, carregar_faixas,
+                                 carregar_indice_busca, carregar_indice_generos, carregar_intervalos_generos,
+                                 classificar_genero_principal, estatisticas_generos, versao_dataset)
+from utils.bootstrap import REPLICAS_BOOTSTRAP, barras_erro, limites_grupo
+from utils.coocorrencia import faixas_em_varios_generos, jaccard_generos, matriz_coocorrencia
+from utils.desempenho import iniciar_medicao, medir
+from utils.indices import contagem_por_genero, faixas_do_genero, mascara_faixas_com_generos
+from utils.painel import exibir_grafico, exibir_painel_desempenho, exibir_relatorio_colunas, selecionar_com_busca
+
+# Colunas usadas por esta página: só elas são lidas do armazém e calculadas
+COLUNAS_PAGINA = [
+    'track_id', 'track_name', 'primeiro_artista', 'album_name', 'popularity', 'duration_min',
+    'danceability', 'energy', 'valence', 'acousticness', 'instrumentalness', 'liveness',
+    'speechiness', 'tempo', 'loudness'
+]
 
 st.set_page_config(
     page_title="Análise de Gêneros - Spotify Analytics",
     page_icon="🎸",
     layout="wide"
 )
+iniciar_medicao('Gêneros')
 
 st.title("🎸 Análise de Gêneros Musicais")
 st.markdown("### Exploração detalhada dos 114 gêneros musicais do Spotify")
 
-# Carrega os dados
-df = carregar_dados()
+# Carrega os dados (faixas únicas + matriz faixa × gênero)
+with medir('carregar dados', 'dados'):
+    # Versão do CSV: chave dos caches do armazém (muda quando o dataset muda)
+    versao = versao_dataset()
+    df = carregar_faixas(versao, COLUNAS_PAGINA)
+    indice_generos = carregar_indice_generos(versao)
+exibir_relatorio_colunas(versao, COLUNAS_PAGINA)
 
 # Overview dos gêneros
-total_generos = df['track_genre'].nunique()
-genero_mais_comum = df['track_genre'].value_counts().index[0]
-tracks_genero_mais_comum = df['track_genre'].value_counts().iloc[0]
+contagem_generos = contagem_por_genero(indice_generos)
+total_generos = len(contagem_generos)
+genero_mais_comum = contagem_generos.index[0]
+tracks_genero_mais_comum = contagem_generos.iloc[0]
 
 st.info(f"""
 🎵 **Dataset Musical**: {total_generos} gêneros únicos | 
@@ -57,36 +81,20 @@ st.sidebar.subheader("🎵 Filtros de Características")
 energy_filter = st.sidebar.slider("Energia mínima:", 0.0, 1.0, 0.0, 0.1)
 danceability_filter = st.sidebar.slider("Danceabilidade mínima:", 0.0, 1.0, 0.0, 0.1)
 
-# Calcular estatísticas por gênero
-stats_generos = df.groupby('track_genre').agg({
-    'track_id': 'count',  # número de faixas
-    'popularity': ['mean', 'std', 'max'],
-    'danceability': 'mean',
-    'energy': 'mean',
-    'valence': 'mean',
-    'acousticness': 'mean',
-    'instrumentalness': 'mean',
-    'liveness': 'mean',
-    'speechiness': 'mean',
-    'tempo': 'mean',
-    'duration_min': 'mean',
-    'loudness': 'mean'
-}).round(3)
-
-# Flatten column names
-stats_generos.columns = ['num_faixas', 'pop_media', 'pop_std', 'pop_maxima', 'danceability', 'energy', 
-                        'valence', 'acousticness', 'instrumentalness', 'liveness', 'speechiness', 
-                        'tempo', 'duration_min', 'loudness']
-
-stats_generos = stats_generos.reset_index()
+# Estatísticas por gênero (calculadas uma vez e compartilhadas entre processos)
+with medir('estatísticas por gênero', 'agregacao'):
+    stats_generos = estatisticas_generos(versao)
+    # Intervalos de 95% das médias (bootstrap), por código de gênero
+    intervalos_generos = carregar_intervalos_generos(versao)
 
 # Aplicar filtros
-stats_filtrados = stats_generos[
-    (stats_generos['num_faixas'] >= min_tracks_genero) &
-    (stats_generos['pop_media'] >= pop_media_min) &
-    (stats_generos['energy'] >= energy_filter) &
-    (stats_generos['danceability'] >= danceability_filter)
-]
+with medir('filtros', 'filtro'):
+    stats_filtrados = stats_generos[
+        (stats_generos['num_faixas'] >= min_tracks_genero) &
+        (stats_generos['pop_media'] >= pop_media_min) &
+        (stats_generos['energy'] >= energy_filter) &
+        (stats_generos['danceability'] >= danceability_filter)
+    ]
 
 # Métricas após filtros
 st.subheader("📈 Estatísticas dos Gêneros Filtrados")
@@ -112,13 +120,14 @@ with col4:
         st.metric("Danceabilidade Média", "N/A")
 with col5:
     if len(stats_filtrados) > 0:
-        faixas_totais = stats_filtrados['num_faixas'].sum()
+        faixas_totais = mascara_faixas_com_generos(indice_generos, stats_filtrados['track_genre'], len(df)).sum()
         st.metric("Total de Faixas", f"{faixas_totais:,}")
     else:
         st.metric("Total de Faixas", "0")
 
 if len(stats_filtrados) == 0:
     st.warning("⚠️ Nenhum gênero encontrado com os filtros aplicados. Ajuste os critérios de filtro.")
+    exibir_painel_desempenho()
     st.stop()
 
 # CHARTS SECTION
@@ -140,7 +149,7 @@ fig_top_generos = px.bar(
 )
 fig_top_generos.update_traces(texttemplate='%{text}', textposition='outside')
 fig_top_generos.update_layout(height=500, xaxis={'tickangle': 45})
-st.plotly_chart(fig_top_generos, use_container_width=True)
+exibir_grafico(fig_top_generos, use_container_width=True)
 
 # Chart 2: Popularity vs Energy (Bubble Chart)
 st.subheader("⭐ Popularidade vs Energia dos Gêneros")
@@ -162,7 +171,7 @@ fig_bubble = px.scatter(
     color_continuous_scale='Viridis'
 )
 fig_bubble.update_layout(height=500)
-st.plotly_chart(fig_bubble, use_container_width=True)
+exibir_grafico(fig_bubble, use_container_width=True)
 
 # INTERACTIVE ANALYSIS: Genre Comparison
 st.subheader("🔍 Comparação Detalhada de Gêneros")
@@ -194,10 +203,15 @@ if len(generos_disponiveis) > 0:
             for i, genero in enumerate(generos_selecionados):
                 dados_genero = stats_filtrados[stats_filtrados['track_genre'] == genero].iloc[0]
                 valores = [dados_genero[carac] for carac in caracteristicas_radar]
+                inferior, superior = limites_grupo(
+                    intervalos_generos, indice_generos['generos'].get_loc(genero), caracteristicas_radar
+                )
                 
                 fig_radar.add_trace(go.Scatterpolar(
                     r=valores,
                     theta=[carac.replace('_', ' ').title() for carac in caracteristicas_radar],
+                    customdata=np.column_stack([inferior, superior]),
+                    hovertemplate="%{theta}: %{r:.3f}<br>IC 95%: [%{customdata[0]:.3f}, %{customdata[1]:.3f}]",
                     fill='toself',
                     name=f"{genero} (n={dados_genero['num_faixas']})",
                     line_color=cores[i % len(cores)],
@@ -210,7 +224,7 @@ if len(generos_disponiveis) > 0:
                 title="Características Musicais por Gênero",
                 height=500
             )
-            st.plotly_chart(fig_radar, use_container_width=True)
+            exibir_grafico(fig_radar, use_container_width=True)
         
         with col2:
             st.subheader("📊 Métricas Comparativas")
@@ -242,8 +256,17 @@ if len(generos_disponiveis) > 0:
                 text=metrica_selecionada
             )
             fig_comp_bar.update_traces(texttemplate='%{text:.1f}', textposition='outside')
+            # Médias ganham o intervalo de 95%; a contagem de faixas não tem incerteza
+            if metrica_selecionada != 'num_faixas':
+                fig_comp_bar.update_traces(error_y=barras_erro(
+                    intervalos_generos,
+                    indice_generos['generos'].get_indexer(dados_comparacao['track_genre']),
+                    'popularity' if metrica_selecionada == 'pop_media' else metrica_selecionada,
+                    dados_comparacao[metrica_selecionada]
+                ))
             fig_comp_bar.update_layout(height=500, xaxis={'tickangle': 45})
-            st.plotly_chart(fig_comp_bar, use_container_width=True)
+            exibir_grafico(fig_comp_bar, use_container_width=True)
+            st.caption(f"Barras de erro: intervalo de confiança de 95% da média (bootstrap com {REPLICAS_BOOTSTRAP:,} reamostragens).")
         
         # Detailed comparison table
         st.subheader("📋 Tabela Comparativa Detalhada")
@@ -293,24 +316,26 @@ categorias_generos = {
 }
 
 # Calculate stats by category
-stats_categorias = []
-for categoria, generos_cat in categorias_generos.items():
-    generos_presentes = [g for g in generos_cat if g in df['track_genre'].unique()]
-    if generos_presentes:
-        dados_categoria = df[df['track_genre'].isin(generos_presentes)]
-        if len(dados_categoria) > 0:
-            stats_cat = {
-                'categoria': categoria,
-                'num_generos': len(generos_presentes),
-                'num_faixas': len(dados_categoria),
-                'pop_media': dados_categoria['popularity'].mean(),
-                'danceability': dados_categoria['danceability'].mean(),
-                'energy': dados_categoria['energy'].mean(),
-                'valence': dados_categoria['valence'].mean(),
-                'acousticness': dados_categoria['acousticness'].mean(),
-                'tempo': dados_categoria['tempo'].mean()
-            }
-            stats_categorias.append(stats_cat)
+with medir('estatísticas por categoria', 'agregacao'):
+    stats_categorias = []
+    for categoria, generos_cat in categorias_generos.items():
+        generos_presentes = [g for g in generos_cat if g in indice_generos['generos']]
+        if generos_presentes:
+            # Faixas em vários gêneros da mesma categoria contam uma única vez
+            dados_categoria = df[mascara_faixas_com_generos(indice_generos, generos_presentes, len(df))]
+            if len(dados_categoria) > 0:
+                stats_cat = {
+                    'categoria': categoria,
+                    'num_generos': len(generos_presentes),
+                    'num_faixas': len(dados_categoria),
+                    'pop_media': dados_categoria['popularity'].mean(),
+                    'danceability': dados_categoria['danceability'].mean(),
+                    'energy': dados_categoria['energy'].mean(),
+                    'valence': dados_categoria['valence'].mean(),
+                    'acousticness': dados_categoria['acousticness'].mean(),
+                    'tempo': dados_categoria['tempo'].mean()
+                }
+                stats_categorias.append(stats_cat)
 
 if stats_categorias:
     df_categorias = pd.DataFrame(stats_categorias)
@@ -326,7 +351,7 @@ if stats_categorias:
             title="Distribuição de Faixas por Categoria Musical"
         )
         fig_cat_tracks.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_cat_tracks, use_container_width=True)
+        exibir_grafico(fig_cat_tracks, use_container_width=True)
     
     with col2:
         fig_cat_pop = px.bar(
@@ -341,21 +366,195 @@ if stats_categorias:
             text='pop_media'
         )
         fig_cat_pop.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-        st.plotly_chart(fig_cat_pop, use_container_width=True)
+        exibir_grafico(fig_cat_pop, use_container_width=True)
+
+# DATA-DRIVEN GENRE CLUSTERING
+st.subheader("🧬 Agrupamento Hierárquico de Gêneros")
+st.markdown(
+    "Grupos formados pelos próprios dados: cada gênero é descrito pela média e pela dispersão das "
+    "features de áudio das suas faixas, sem depender das categorias escritas à mão."
+)
+
+# Distâncias e ligações são calculadas uma vez por versão do dataset
+with medir('distâncias entre gêneros', 'agregacao'):
+    distancias = carregar_distancias_generos(versao)
+
+# Com n gêneros há n - 1 fusões: no máximo n - 1 grupos têm um corte entre duas fusões
+num_generos_agrupados = len(distancias['generos'])
+if num_generos_agrupados < 3:
+    st.info("O agrupamento hierárquico precisa de pelo menos 3 gêneros.")
+else:
+    max_grupos = min(20, num_generos_agrupados - 1)
+    if max_grupos > 2:
+        num_grupos = st.slider("Número de grupos:", 2, max_grupos, min(10, max_grupos), key="num_grupos_generos")
+    else:
+        num_grupos = 2
+
+    with medir('dendrograma', 'agregacao'):
+        ligacoes = distancias['ligacoes']
+        generos_ordenados = distancias['generos'][distancias['ordem']]
+        # Corte entre a (n-1)-ésima e a n-ésima fusão mais altas: exatamente `num_grupos` grupos
+        corte = (ligacoes[-num_grupos, 2] + ligacoes[-(num_grupos - 1), 2]) / 2
+        grupos = fcluster(ligacoes, num_grupos, criterion='maxclust')
+        arvore = dendrogram(
+            ligacoes, labels=distancias['generos'].tolist(), color_threshold=corte,
+            above_threshold_color='#999999', no_plot=True
+        )
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Um traço por cor, com os segmentos separados por None
+        cores = px.colors.qualitative.Plotly
+        segmentos = {}
+        for ys, xs, cor in zip(arvore['icoord'], arvore['dcoord'], arvore['color_list']):
+            x, y = segmentos.setdefault(cor, ([], []))
+            x.extend(xs + [None])
+            y.extend(ys + [None])
+
+        fig_dendrograma = go.Figure()
+        for cor, (x, y) in segmentos.items():
+            fig_dendrograma.add_trace(go.Scatter(
+                x=x, y=y, mode='lines', hoverinfo='skip', showlegend=False,
+                line=dict(width=1, color=cores[int(cor[1:]) % len(cores)] if cor.startswith('C') else cor)
+            ))
+        fig_dendrograma.add_vline(x=corte, line_dash='dash', line_color='gray')
+        fig_dendrograma.update_layout(
+            title="Dendrograma dos Gêneros (Ward)",
+            xaxis_title="Distância",
+            yaxis=dict(tickvals=5 + 10 * np.arange(len(arvore['ivl'])), ticktext=arvore['ivl'], tickfont=dict(size=8)),
+            height=1000
+        )
+        exibir_grafico(fig_dendrograma, use_container_width=True)
+
+    with col2:
+        fig_distancias = px.imshow(
+            distancias['distancias'][np.ix_(distancias['ordem'], distancias['ordem'])],
+            x=generos_ordenados,
+            y=generos_ordenados,
+            color_continuous_scale='Viridis',
+            title="Distância entre Gêneros (ordem do dendrograma)",
+            labels={'color': 'Distância'}
+        )
+        fig_distancias.update_layout(height=1000)
+        fig_distancias.update_xaxes(tickfont=dict(size=7))
+        fig_distancias.update_yaxes(tickfont=dict(size=7))
+        exibir_grafico(fig_distancias, use_container_width=True)
+
+    # Composição dos grupos, comparada às categorias de `GENEROS_PRINCIPAIS`
+    df_grupos = pd.DataFrame({'genero': generos_ordenados, 'grupo': grupos[distancias['ordem']]})
+    df_grupos['categoria'] = df_grupos['genero'].map(classificar_genero_principal)
+    resumo_grupos = df_grupos.groupby('grupo', sort=False).agg(
+        num_generos=('genero', 'size'),
+        generos=('genero', ', '.join),
+        categorias=('categoria', lambda categorias: ', '.join(f"{c} ({n})" for c, n in categorias.value_counts().items()))
+    ).reset_index()
+
+    st.dataframe(
+        resumo_grupos,
+        column_config={
+            'grupo': 'Grupo',
+            'num_generos': 'Gêneros',
+            'generos': 'Gêneros do grupo',
+            'categorias': 'Categorias manuais presentes'
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+
+# GENRE OVERLAP: the same track classified in several genres
+st.subheader("🔗 Sobreposição entre Gêneros")
+st.markdown(
+    "No dataset a mesma faixa (`track_id`) pode aparecer em vários gêneros. A sobreposição de Jaccard "
+    "é a fração das faixas dos dois gêneros que está nos dois ao mesmo tempo."
+)
+
+# Coocorrência gravada com o dataset e atualizada só com as linhas novas quando o CSV cresce
+with medir('coocorrência de gêneros', 'agregacao'):
+    coocorrencia = carregar_coocorrencia_generos(versao)
+    jaccard = jaccard_generos(coocorrencia)
+    contagens = matriz_coocorrencia(coocorrencia)
+
+col1, col2 = st.columns(2)
+with col1:
+    st.metric("Faixas em Mais de um Gênero", f"{faixas_em_varios_generos(coocorrencia):,}")
+with col2:
+    st.metric("Pares de Gêneros com Faixas em Comum", f"{jaccard.nnz // 2:,}")
+
+# Só os gêneros que passam nos filtros, os mais sobrepostos primeiro
+codigos_filtrados = coocorrencia['generos'].get_indexer(stats_filtrados['track_genre'])
+codigos_filtrados = codigos_filtrados[codigos_filtrados >= 0]
+sobreposicao_total = np.asarray(contagens.sum(axis=1)).ravel() - contagens.diagonal()
+num_sobrepostos = st.slider("Gêneros no mapa de calor:", 5, 50, 25, 5, key="num_generos_sobreposicao")
+mais_sobrepostos = codigos_filtrados[np.argsort(-sobreposicao_total[codigos_filtrados], kind='stable')][:num_sobrepostos]
+mais_sobrepostos = mais_sobrepostos[sobreposicao_total[mais_sobrepostos] > 0]
+
+if len(mais_sobrepostos) >= 2:
+    # Mesma ordem do dendrograma acima: gêneros parecidos ficam vizinhos
+    posicao_dendrograma = pd.Series(np.argsort(distancias['ordem']), index=distancias['generos'])
+    nomes_sobrepostos = coocorrencia['generos'][mais_sobrepostos]
+    ordem = np.argsort(posicao_dendrograma.reindex(nomes_sobrepostos).fillna(len(posicao_dendrograma)).to_numpy(), kind='stable')
+    mais_sobrepostos, nomes_sobrepostos = mais_sobrepostos[ordem], nomes_sobrepostos[ordem]
+    
+    col1, col2 = st.columns([3, 2])
+    
+    with col1:
+        fig_jaccard = px.imshow(
+            jaccard[mais_sobrepostos][:, mais_sobrepostos].toarray(),
+            x=nomes_sobrepostos,
+            y=nomes_sobrepostos,
+            color_continuous_scale='Reds',
+            title="Sobreposição de Jaccard entre Gêneros",
+            labels={'color': 'Jaccard'}
+        )
+        fig_jaccard.update_layout(height=700)
+        fig_jaccard.update_xaxes(tickfont=dict(size=8))
+        fig_jaccard.update_yaxes(tickfont=dict(size=8))
+        exibir_grafico(fig_jaccard, use_container_width=True)
+    
+    with col2:
+        # Pares mais sobrepostos entre os gêneros filtrados (cada par uma vez)
+        pares = sp.triu(jaccard[codigos_filtrados][:, codigos_filtrados], k=1).tocoo()
+        mais_fortes = np.argsort(-pares.data, kind='stable')[:20]
+        linhas, colunas = codigos_filtrados[pares.row[mais_fortes]], codigos_filtrados[pares.col[mais_fortes]]
+        df_pares = pd.DataFrame({
+            'genero_a': coocorrencia['generos'][linhas],
+            'genero_b': coocorrencia['generos'][colunas],
+            'em_comum': np.asarray(contagens[linhas, colunas]).ravel(),
+            'jaccard': pares.data[mais_fortes]
+        })
+        st.markdown("**Pares de gêneros mais sobrepostos:**")
+        st.dataframe(
+            df_pares,
+            column_config={
+                'genero_a': 'Gênero',
+                'genero_b': 'Gênero',
+                'em_comum': 'Faixas em Comum',
+                'jaccard': st.column_config.ProgressColumn(
+                    'Jaccard', min_value=0.0, max_value=float(max(df_pares['jaccard'].max(), 1e-9)), format="%.3f"
+                )
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+else:
+    st.info("Nenhuma faixa dos gêneros filtrados está classificada em mais de um gênero.")
 
 # DETAILED GENRE EXPLORER
 st.subheader("🔎 Explorador Detalhado de Gêneros")
 
 # Single genre deep dive
-genero_detalhado = st.selectbox(
+# Os códigos do índice de busca são as posições em `estatisticas_generos(versao)`
+genero_detalhado = selecionar_com_busca(
     "Selecione um gênero para análise detalhada:",
-    sorted(stats_filtrados['track_genre'].tolist()),
-    key="genero_detalhado"
+    carregar_indice_busca(versao, 'generos'),
+    "genero_detalhado",
+    stats_generos['track_genre'].isin(stats_filtrados['track_genre']).to_numpy()
 )
 
 if genero_detalhado:
     dados_genero_detalhado = stats_filtrados[stats_filtrados['track_genre'] == genero_detalhado].iloc[0]
-    faixas_genero = df[df['track_genre'] == genero_detalhado]
+    faixas_genero = df.iloc[faixas_do_genero(indice_generos, genero_detalhado)]
     
     # Genre overview
     col1, col2, col3, col4 = st.columns(4)
@@ -382,11 +581,11 @@ if genero_detalhado:
             labels={'popularity': 'Popularidade', 'count': 'Número de Faixas'},
             color_discrete_sequence=['#1DB954']
         )
-        st.plotly_chart(fig_pop_genero, use_container_width=True)
+        exibir_grafico(fig_pop_genero, use_container_width=True)
     
     with col2:
         # Top artists in genre
-        top_artistas_genero = faixas_genero['primeiro_artista'].value_counts().head(10)
+        top_artistas_genero = contagem_valores(faixas_genero['primeiro_artista']).head(10)
         
         fig_artistas_genero = px.bar(
             x=top_artistas_genero.values,
@@ -398,7 +597,7 @@ if genero_detalhado:
             color_continuous_scale='Oranges'
         )
         fig_artistas_genero.update_layout(yaxis={'categoryorder':'total ascending'})
-        st.plotly_chart(fig_artistas_genero, use_container_width=True)
+        exibir_grafico(fig_artistas_genero, use_container_width=True)
     
     # Top tracks of the genre
     st.subheader(f"🎵 Top 10 Faixas Mais Populares - {genero_detalhado}")
@@ -467,4 +666,6 @@ with st.sidebar:
         st.write(f"**Gêneros analisados**: {len(stats_filtrados)}")
         st.write(f"**Mais produtivo**: {stats_filtrados.loc[stats_filtrados['num_faixas'].idxmax(), 'track_genre']}")
         st.write(f"**Média de energia**: {stats_filtrados['energy'].mean():.3f}")
-        st.write(f"**Média de valência**: {stats_filtrados['valence'].mean():.3f}")
\ No newline at end of file
+        st.write(f"**Média de valência**: {stats_filtrados['valence'].mean():.3f}")
+
+exibir_painel_desempenho()
@@ -0,0 +1,189 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.express as px
+from utils.carrega_dados import (carregar_faixas, carregar_indice_generos, carregar_indice_generos_principais,
+                                 carregar_projecao, clusters_faixas, versao_dataset)
+from utils.desempenho import iniciar_medicao, medir
+from utils.indices import contagem_por_genero, generos_das_faixas
+from utils.memoria_sessao import derivado_sessao
+from utils.painel import exibir_grafico, exibir_painel_desempenho, exibir_relatorio_colunas
+from utils.projecao import celulas, limites_das_celulas, resumir_celulas
+from utils.semelhanca import CARACTERISTICAS_SEMELHANCA
+
+# Colunas usadas por esta página: só elas são lidas do armazém e calculadas
+COLUNAS_PAGINA = ['track_name', 'primeiro_artista', 'popularity']
+
+st.set_page_config(
+    page_title="Mapa do Catálogo - Spotify Analytics",
+    page_icon="🗺️",
+    layout="wide"
+)
+iniciar_medicao('Mapa do Catálogo')
+
+st.title("🗺️ Mapa do Catálogo")
+st.markdown("### Todas as faixas em um só plano, pelas features de áudio")
+
+# Carrega os dados (faixas únicas + projeção 2D calculada uma vez por versão do dataset)
+with medir('carregar dados', 'dados'):
+    # Versão do CSV: chave dos caches do armazém (muda quando o dataset muda)
+    versao = versao_dataset()
+    df = carregar_faixas(versao, COLUNAS_PAGINA)
+    projecao = carregar_projecao(versao)
+    indice_generos = carregar_indice_generos(versao)
+    indice_principais = carregar_indice_generos_principais(versao)
+exibir_relatorio_colunas(versao, COLUNAS_PAGINA)
+
+# Sidebar
+st.sidebar.header("🎨 Mapa")
+colorir_por = st.sidebar.radio("Colorir por:", ["Gênero principal", "Cluster"])
+num_celulas = st.sidebar.slider("Resolução (células por eixo):", 20, 120, 60, 10)
+num_clusters = None
+if colorir_por == "Cluster":
+    num_clusters = st.sidebar.slider("Número de clusters (k):", 2, 12, 5)
+
+# Região visível: o mapa completo ou a área ampliada pelo usuário
+limites_completos = tuple(float(valor) for valor in projecao['limites'])
+regiao = st.session_state.setdefault('mapa_regiao', limites_completos)
+# Muda a cada zoom: a seleção do gráfico anterior não vale para a nova grade
+nivel = st.session_state.setdefault('mapa_nivel', 0)
+
+if colorir_por == "Cluster":
+    with medir('clusters', 'agregacao'):
+        clusters = clusters_faixas(versao, num_clusters, ('mapa',), df.index.to_numpy())
+    codigos_categoria = clusters['rotulos'].astype(np.int64) - 1
+    ptr_categorias = None
+    nomes_categorias = [f"Cluster {cluster}" for cluster in range(1, num_clusters + 1)]
+else:
+    # Pela matriz de pertinência: a faixa conta em cada gênero principal dos seus gêneros
+    codigos_categoria = np.asarray(indice_principais['faixa_generos'], dtype=np.int64)
+    ptr_categorias = indice_principais['faixa_ptr']
+    nomes_categorias = indice_principais['generos'].tolist()
+
+def resumir():
+    codigos_celula = celulas(projecao['coordenadas'], regiao, num_celulas)
+    resumo = resumir_celulas(
+        codigos_celula, regiao, num_celulas, codigos_categoria, len(nomes_categorias), df['popularity'].to_numpy(),
+        ptr_categorias=ptr_categorias
+    )
+    return codigos_celula, resumo
+
+# O resumo por célula fica na sessão: selecionar células não refaz a agregação
+with medir('resumo das células', 'agregacao'):
+    codigos_celula, resumo = derivado_sessao(
+        'mapa_celulas', (versao, regiao, num_celulas, colorir_por, num_clusters), resumir
+    )
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Faixas na região", f"{int(resumo['pontos'].sum()):,}")
+with col2:
+    st.metric("Células ocupadas", f"{len(resumo):,}")
+with col3:
+    st.metric("Variância explicada (2 componentes)", f"{projecao['variancia'].sum():.1%}")
+
+# Hover: categoria dominante e as faixas mais populares de cada célula
+nomes_faixas = df['track_name'].to_numpy()
+artistas = df['primeiro_artista'].to_numpy()
+df_mapa = resumo.assign(
+    categoria=np.array(nomes_categorias, dtype=object)[resumo['categoria'].to_numpy()],
+    tamanho=np.log1p(resumo['pontos']),
+    exemplos=[
+        '<br>'.join(f"{nomes_faixas[posicao]} — {artistas[posicao]}" for posicao in posicoes)
+        for posicoes in resumo['exemplos']
+    ]
+)
+
+fig = px.scatter(
+    df_mapa,
+    x='x',
+    y='y',
+    color='categoria',
+    size='tamanho',
+    size_max=14,
+    custom_data=['celula'],
+    hover_data={
+        'x': False, 'y': False, 'tamanho': False, 'celula': False,
+        'pontos': ':,', 'participacao': ':.0%', 'exemplos': True
+    },
+    category_orders={'categoria': nomes_categorias},
+    labels={
+        'categoria': colorir_por, 'pontos': 'Faixas', 'participacao': 'Participação', 'exemplos': 'Exemplos',
+        'x': 'Componente 1', 'y': 'Componente 2'
+    },
+    title="Densidade de faixas por célula (cor = categoria dominante)"
+)
+fig.update_traces(marker=dict(symbol='square', line=dict(width=0)))
+fig.update_layout(height=650, dragmode='select')
+evento = exibir_grafico(
+    fig,
+    use_container_width=True,
+    on_select='rerun',
+    selection_mode=('points', 'box', 'lasso'),
+    key=f"mapa_catalogo_{nivel}"
+)
+
+st.caption(
+    "Cada quadrado é uma célula da grade; o tamanho cresce com o número de faixas. "
+    "Selecione células (clique, caixa ou laço) para ver as faixas delas e ampliar a região."
+)
+
+if regiao != limites_completos and st.button("↩️ Voltar ao mapa completo"):
+    st.session_state['mapa_regiao'] = limites_completos
+    st.session_state['mapa_nivel'] = nivel + 1
+    st.rerun()
+
+# DRILL-DOWN: faixas das células selecionadas
+selecionadas = sorted({ponto['customdata'][0] for ponto in evento.selection.points}) if evento else []
+if selecionadas:
+    st.subheader(f"🔎 Células selecionadas ({len(selecionadas)})")
+    with medir('faixas selecionadas', 'filtro'):
+        posicoes = np.flatnonzero(np.isin(codigos_celula, selecionadas))
+        df_selecao = df.iloc[posicoes]
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        mais_populares = df_selecao.nlargest(100, 'popularity')[COLUNAS_PAGINA]
+        # Todos os gêneros de cada faixa, não só o primeiro do CSV
+        mais_populares.insert(2, 'generos', generos_das_faixas(indice_generos, mais_populares.index))
+        mais_populares.insert(3, 'generos_principais', generos_das_faixas(indice_principais, mais_populares.index))
+        st.dataframe(
+            mais_populares,
+            column_config={
+                'track_name': 'Faixa',
+                'primeiro_artista': 'Artista',
+                'generos': 'Gêneros',
+                'generos_principais': 'Gêneros Principais',
+                'popularity': 'Popularidade'
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        st.caption(f"As 100 mais populares de {len(df_selecao):,} faixas selecionadas")
+    with col2:
+        st.markdown("**Gêneros mais comuns:**")
+        # Pela matriz de pertinência: faixas em vários gêneros contam em cada um
+        st.dataframe(
+            contagem_por_genero(indice_generos, posicoes).head(10).rename('faixas'),
+            use_container_width=True
+        )
+
+    if st.button("🔍 Ampliar região selecionada"):
+        st.session_state['mapa_regiao'] = limites_das_celulas(selecionadas, regiao, num_celulas)
+        st.session_state['mapa_nivel'] = nivel + 1
+        st.rerun()
+
+# Interpretação dos eixos: peso de cada feature nos componentes
+st.subheader("🧭 O que os eixos representam")
+df_componentes = pd.DataFrame(
+    projecao['componentes'],
+    index=CARACTERISTICAS_SEMELHANCA,
+    columns=[
+        f"Componente {i + 1} ({variancia:.1%})" for i, variancia in enumerate(projecao['variancia'])
+    ]
+)
+st.dataframe(df_componentes.style.format("{:+.2f}").background_gradient(cmap='RdBu', vmin=-1, vmax=1),
+             use_container_width=True)
+st.caption("PCA sobre as features padronizadas; cargas positivas aumentam a coordenada no eixo.")
+
+exibir_painel_desempenho()
@@ -4,25 +4,51 @@ import plotly.express as px
 import plotly.graph_objects as go
 import matplotlib.pyplot as plt
 import seaborn as sns
-from utils.carrega_dados import carregar_dados
+from utils.agrupamento import contagem_valores, num_unicos
+from utils.carrega_dados import (carregar_faixas, carregar_indice_generos, carregar_indice_generos_principais,
+                                 versao_dataset)
+from utils.desempenho import iniciar_medicao, medir
+from utils.indices import contagem_por_genero, expandir_por_genero, faixas_do_genero
+from utils.memoria_sessao import contabilizar, derivado_sessao
+from utils.painel import exibir_grafico, exibir_painel_desempenho, exibir_relatorio_colunas
+
+# Colunas usadas por esta página: só elas são lidas do armazém e calculadas
+COLUNAS_PAGINA = [
+    'track_name', 'primeiro_artista', 'popularity', 'explicit', 'duration_min',
+    'danceability', 'energy', 'valence', 'acousticness', 'instrumentalness', 'liveness',
+    'speechiness', 'loudness', 'tempo'
+]
+# Colunas levadas para a expansão por gênero principal (dispersão e radar)
+COLUNAS_POR_GENERO = [
+    'duration_min', 'popularity', 'danceability', 'energy', 'speechiness', 'acousticness',
+    'instrumentalness', 'liveness', 'valence'
+]
 
 st.set_page_config(
     page_title="Visão Geral - Spotify Analytics",
     page_icon="📊",
     layout="wide"
 )
+iniciar_medicao('Visão Geral')
 
 st.title("📊 Visão Geral dos Dados Musicais")
 st.markdown("### Análise exploratória das principais características do dataset")
 
-# Carrega os dados
-df = carregar_dados()
+# Carrega os dados (faixas únicas + matriz faixa × gênero)
+with medir('carregar dados', 'dados'):
+    # Versão do CSV: chave dos caches do armazém (muda quando o dataset muda)
+    versao = versao_dataset()
+    df = carregar_faixas(versao, COLUNAS_PAGINA)
+    indice_generos = carregar_indice_generos(versao)
+    # Faixa × gênero principal: filtro, pizza, cores e radar contam a faixa em cada grupo dos seus gêneros
+    indice_principais = carregar_indice_generos_principais(versao)
+exibir_relatorio_colunas(versao, COLUNAS_PAGINA)
 
 # Sidebar com filtros
 st.sidebar.header("🔧 Filtros de Análise")
 
 # Filtro por gênero principal
-generos_disponiveis = ['Todos'] + sorted(df['genero_principal'].unique().tolist())
+generos_disponiveis = ['Todos'] + indice_principais['generos'].tolist()
 genero_selecionado = st.sidebar.selectbox(
     "Selecione o Gênero Principal:",
     generos_disponiveis
@@ -44,20 +70,36 @@ filtro_explicito = st.sidebar.radio(
 )
 
 # Aplicar filtros
-df_filtrado = df.copy()
+def filtrar():
+    df_filtrado = df
 
-if genero_selecionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['genero_principal'] == genero_selecionado]
+    if genero_selecionado != 'Todos':
+        # Inclui faixas com qualquer classificação pertencente ao gênero principal
+        df_filtrado = df_filtrado.iloc[faixas_do_genero(indice_principais, genero_selecionado)]
 
-df_filtrado = df_filtrado[
-    (df_filtrado['popularity'] >= popularidade_min) & 
-    (df_filtrado['popularity'] <= popularidade_max)
-]
+    df_filtrado = df_filtrado[
+        (df_filtrado['popularity'] >= popularidade_min) & 
+        (df_filtrado['popularity'] <= popularidade_max)
+    ]
 
-if filtro_explicito == "Apenas Explícitas":
-    df_filtrado = df_filtrado[df_filtrado['explicit'] == True]
-elif filtro_explicito == "Apenas Não Explícitas":
-    df_filtrado = df_filtrado[df_filtrado['explicit'] == False]
+    if filtro_explicito == "Apenas Explícitas":
+        df_filtrado = df_filtrado[df_filtrado['explicit'] == True]
+    elif filtro_explicito == "Apenas Não Explícitas":
+        df_filtrado = df_filtrado[df_filtrado['explicit'] == False]
+    return df_filtrado
+
+with medir('filtros', 'filtro'):
+    # Guardado na sessão: mudar só a comparação de gêneros não refiltra
+    df_filtrado = derivado_sessao(
+        'visao_geral_filtrado', (versao, genero_selecionado, popularidade_min, popularidade_max, filtro_explicito), filtrar
+    )
+
+# Uma linha por (faixa, gênero principal), como no filtro
+with medir('expansão por gênero principal', 'agregacao'):
+    df_principal = expandir_por_genero(
+        df_filtrado.assign(faixa=df_filtrado.index), indice_principais, ['faixa'] + COLUNAS_POR_GENERO,
+        coluna='genero_principal'
+    )
 
 # Métricas após filtros
 st.subheader("📈 Métricas dos Dados Filtrados")
@@ -67,7 +109,7 @@ col1, col2, col3, col4, col5 = st.columns(5)
 with col1:
     st.metric("Faixas Filtradas", f"{len(df_filtrado):,}")
 with col2:
-    st.metric("Artistas Únicos", f"{df_filtrado['primeiro_artista'].nunique():,}")
+    st.metric("Artistas Únicos", f"{num_unicos(df_filtrado['primeiro_artista']):,}")
 with col3:
     st.metric("Popularidade Média", f"{df_filtrado['popularity'].mean():.1f}")
 with col4:
@@ -82,7 +124,8 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("🎸 Top 10 Gêneros Musicais")
     
-    top_genres = df_filtrado['track_genre'].value_counts().head(10)
+    with medir('top gêneros', 'agregacao'):
+        top_genres = contagem_por_genero(indice_generos, df_filtrado.index).head(10)
     
     fig_genres = px.bar(
         x=top_genres.values,
@@ -94,7 +137,7 @@ with col1:
         color_continuous_scale='Viridis'
     )
     fig_genres.update_layout(height=400, showlegend=False, yaxis={'categoryorder': 'total ascending'})
-    st.plotly_chart(fig_genres, use_container_width=True)
+    exibir_grafico(fig_genres, use_container_width=True)
 
 # Gráfico 2: Distribuição de Popularidade
 with col2:
@@ -109,14 +152,15 @@ with col2:
         color_discrete_sequence=['#1DB954']
     )
     fig_pop.update_layout(height=400)
-    st.plotly_chart(fig_pop, use_container_width=True)
+    exibir_grafico(fig_pop, use_container_width=True)
 
 # Gráfico 3: Gêneros Principais (Pizza)
 st.subheader("🎼 Distribuição por Gêneros Principais")
 col1, col2 = st.columns(2)
 
 with col1:
-    generos_principais = df_filtrado['genero_principal'].value_counts()
+    with medir('gêneros principais', 'agregacao'):
+        generos_principais = contagem_valores(df_principal['genero_principal'])
     
     fig_pizza = px.pie(
         values=generos_principais.values,
@@ -125,14 +169,15 @@ with col1:
     )
     fig_pizza.update_traces(textposition='inside', textinfo='percent+label')
     fig_pizza.update_layout(height=400)
-    st.plotly_chart(fig_pizza, use_container_width=True)
+    exibir_grafico(fig_pizza, use_container_width=True)
 
 # Gráfico 4: Duração vs Popularidade (Scatter)
 with col2:
     st.subheader("⏱️ Duração vs Popularidade")
     
-    # Amostra para melhor visualização
-    df_sample = df_filtrado.sample(n=min(2000, len(df_filtrado)), random_state=42)
+    # Amostra de faixas para melhor visualização; cada uma aparece na cor de cada gênero principal dela
+    amostra = df_filtrado.sample(n=min(2000, len(df_filtrado)), random_state=42).index
+    df_sample = contabilizar('df_sample', df_principal[df_principal['faixa'].isin(amostra)])
     
     fig_scatter = px.scatter(
         df_sample,
@@ -144,7 +189,7 @@ with col2:
         opacity=0.6
     )
     fig_scatter.update_layout(height=400)
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    exibir_grafico(fig_scatter, use_container_width=True)
 
 # Gráfico 5: Características Musicais Médias (Radar Chart) - INTERATIVO
 st.subheader("🎵 Características Musicais Médias por Gênero Principal")
@@ -152,8 +197,8 @@ st.subheader("🎵 Características Musicais Médias por Gênero Principal")
 # Widget para seleção de gênero para o radar
 generos_radar = st.multiselect(
     "Selecione até 3 gêneros para comparação:",
-    options=sorted(df_filtrado['genero_principal'].unique()),
-    default=sorted(df_filtrado['genero_principal'].unique())[:3] if len(df_filtrado['genero_principal'].unique()) >= 3 else sorted(df_filtrado['genero_principal'].unique()),
+    options=sorted(df_principal['genero_principal'].unique()),
+    default=sorted(df_principal['genero_principal'].unique())[:3],
     max_selections=3
 )
 
@@ -166,7 +211,7 @@ if generos_radar:
     cores = ['#1DB954', '#FF6B35', '#4ECDC4']
     
     for i, genero in enumerate(generos_radar):
-        dados_genero = df_filtrado[df_filtrado['genero_principal'] == genero]
+        dados_genero = df_principal[df_principal['genero_principal'] == genero]
         valores_medios = [dados_genero[carac].mean() for carac in caracteristicas]
         
         fig_radar.add_trace(go.Scatterpolar(
@@ -188,7 +233,7 @@ if generos_radar:
         height=500
     )
     
-    st.plotly_chart(fig_radar, use_container_width=True)
+    exibir_grafico(fig_radar, use_container_width=True)
 
 # Gráfico 6: Matriz de Correlação (Heatmap)
 st.subheader("🔗 Matriz de Correlação das Características Musicais")
@@ -197,7 +242,8 @@ st.subheader("🔗 Matriz de Correlação das Características Musicais")
 caracteristicas_numericas = ['popularity', 'duration_min', 'danceability', 'energy', 'loudness', 
                            'speechiness', 'acousticness', 'instrumentalness', 'liveness', 'valence', 'tempo']
 
-correlacao = df_filtrado[caracteristicas_numericas].corr()
+with medir('matriz de correlação', 'agregacao'):
+    correlacao = df_filtrado[caracteristicas_numericas].corr()
 
 fig_corr = px.imshow(
     correlacao,
@@ -207,12 +253,13 @@ fig_corr = px.imshow(
     color_continuous_scale='RdBu_r'
 )
 fig_corr.update_layout(height=600)
-st.plotly_chart(fig_corr, use_container_width=True)
+exibir_grafico(fig_corr, use_container_width=True)
 
 # Análise adicional - Top Artistas
 st.subheader("🎤 Top 15 Artistas por Número de Faixas")
 
-top_artistas = df_filtrado['primeiro_artista'].value_counts().head(15)
+with medir('top artistas', 'agregacao'):
+    top_artistas = contagem_valores(df_filtrado['primeiro_artista']).head(15)
 
 fig_artistas = px.bar(
     x=top_artistas.index,
@@ -223,7 +270,7 @@ fig_artistas = px.bar(
     color_continuous_scale='Blues'
 )
 fig_artistas.update_layout(height=400, showlegend=False, xaxis={'tickangle': 45})
-st.plotly_chart(fig_artistas, use_container_width=True)
+exibir_grafico(fig_artistas, use_container_width=True)
 
 # Sidebar com estatísticas adicionais
 with st.sidebar:
@@ -232,7 +279,7 @@ with st.sidebar:
     
     if len(df_filtrado) > 0:
         st.metric("Faixas Analisadas", f"{len(df_filtrado):,}")
-        st.metric("Gênero + Popular", df_filtrado['track_genre'].value_counts().index[0])
+        st.metric("Gênero + Popular", contagem_por_genero(indice_generos, df_filtrado.index).index[0])
         st.metric("Energia Média", f"{df_filtrado['energy'].mean():.2f}")
         st.metric("Danceabilidade Média", f"{df_filtrado['danceability'].mean():.2f}")
         
@@ -246,4 +293,6 @@ with st.sidebar:
         st.warning("Nenhuma faixa encontrada com os filtros aplicados.")
         
     st.markdown("---")
-    st.info("💡 Dica: Ajuste os filtros acima para explorar diferentes segmentos dos dados!")
\ No newline at end of file
+    st.info("💡 Dica: Ajuste os filtros acima para explorar diferentes segmentos dos dados!")
+
+exibir_painel_desempenho()
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+
+def codigos_e_rotulos(serie, num_grupos=None):
+    """
+    Extrai os códigos inteiros e o dicionário de rótulos de uma coluna
+
+    Colunas categóricas usam os próprios códigos; colunas inteiras já são
+    tratadas como códigos (ex.: `artista_cod`). Valores ausentes viram -1.
+
+    Args:
+        serie (pd.Series): Coluna categórica ou de códigos inteiros
+        num_grupos (int, opcional): Número de grupos possíveis (inferido se None)
+
+    Returns:
+        tuple: (códigos como np.ndarray, rótulos como pd.Index)
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), serie.cat.categories
+
+    codigos = serie.to_numpy()
+    if num_grupos is None:
+        num_grupos = int(codigos.max()) + 1 if len(codigos) > 0 else 0
+    return codigos, pd.RangeIndex(num_grupos, name=serie.name)
+
+def contagem_valores(serie):
+    """
+    Equivalente a `value_counts()` calculado com `np.bincount` sobre os códigos
+
+    Args:
+        serie (pd.Series): Coluna categórica ou de códigos inteiros
+
+    Returns:
+        pd.Series: Contagem por valor, em ordem decrescente, sem valores ausentes
+    """
+    codigos, rotulos = codigos_e_rotulos(serie)
+    contagens = np.bincount(codigos[codigos >= 0], minlength=len(rotulos))
+    resultado = pd.Series(contagens, index=rotulos, name='count')
+    return resultado[resultado > 0].sort_values(ascending=False, kind='stable')
+
+def num_unicos(serie):
+    """
+    Equivalente a `nunique()` calculado sobre os códigos
+    """
+    codigos, rotulos = codigos_e_rotulos(serie)
+    return int(np.count_nonzero(np.bincount(codigos[codigos >= 0], minlength=len(rotulos))))
+
+def _reduzir(codigos, valores, contagens, funcao, num_grupos):
+    """
+    Aplica uma redução por grupo sobre arrays já filtrados (sem ausentes)
+    """
+    if funcao == 'count':
+        return contagens.astype(np.int64)
+
+    soma = np.bincount(codigos, weights=valores, minlength=num_grupos)
+    if funcao == 'sum':
+        return soma
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = soma / contagens
+        if funcao == 'mean':
+            return media
+        if funcao == 'std':
+            # Duas passadas: mais estável que a fórmula soma dos quadrados
+            desvios = np.bincount(codigos, weights=(valores - media[codigos]) ** 2, minlength=num_grupos)
+            return np.sqrt(desvios / (contagens - 1))
+
+    if funcao in ('max', 'min'):
+        # ufunc.at acumula sem ordenar (rápido no NumPy >= 1.25)
+        reducao = np.maximum if funcao == 'max' else np.minimum
+        resultado = np.full(num_grupos, -np.inf if funcao == 'max' else np.inf)
+        reducao.at(resultado, codigos, valores)
+        resultado[contagens == 0] = np.nan
+        return resultado
+
+    raise ValueError(f"Agregação não suportada: {funcao}")
+
+def agrupar(df, chave, agregacoes, num_grupos=None):
+    """
+    Agrupa por uma coluna codificada e agrega com reduções vetorizadas (`np.bincount`)
+
+    Substitui `df.groupby(chave).agg(agregacoes)` sem fazer hash de strings.
+    Retorna apenas os grupos observados, ordenados pelo código, com as mesmas
+    colunas (simples ou MultiIndex) que o pandas produziria.
+
+    Args:
+        df (pd.DataFrame): Dados a agrupar
+        chave (str): Coluna categórica ou de códigos inteiros
+        agregacoes (dict): Coluna → função ou lista de funções
+            ('count', 'sum', 'mean', 'std', 'max', 'min')
+        num_grupos (int, opcional): Número de códigos possíveis para colunas inteiras
+
+    Returns:
+        pd.DataFrame: Estatísticas por grupo, indexadas pelo rótulo do grupo
+    """
+    codigos, rotulos = codigos_e_rotulos(df[chave], num_grupos)
+    num_grupos = len(rotulos)
+    validos = codigos >= 0
+    observados = np.bincount(codigos[validos], minlength=num_grupos) > 0
+
+    colunas = {}
+    for coluna, funcoes in agregacoes.items():
+        if isinstance(funcoes, str):
+            funcoes = [funcoes]
+
+        if funcoes == ['count']:
+            # Contagem não precisa converter os valores (colunas de texto)
+            valores = None
+            presentes = validos & df[coluna].notna().to_numpy()
+        else:
+            valores = df[coluna].to_numpy(dtype=np.float64)
+            presentes = validos & ~np.isnan(valores)
+        codigos_col = codigos[presentes]
+        contagens = np.bincount(codigos_col, minlength=num_grupos)
+
+        for funcao in funcoes:
+            valores_col = None if funcao == 'count' else valores[presentes]
+            colunas[(coluna, funcao)] = _reduzir(codigos_col, valores_col, contagens, funcao, num_grupos)[observados]
+
+    resultado = pd.DataFrame(colunas, index=pd.Index(rotulos[observados], name=chave))
+
+    # Como no pandas: colunas simples quando cada coluna tem uma única função em string
+    if all(isinstance(funcoes, str) for funcoes in agregacoes.values()):
+        resultado.columns = resultado.columns.get_level_values(0)
+    return resultado
@@ -0,0 +1,269 @@
+import contextlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DIRETORIO_ARMAZEM = './Dataset/colunar'
+
+
+def versao_arquivo(caminho):
+    """
+    Identifica a versão de um arquivo pelo tamanho e data de modificação
+    """
+    info = os.stat(caminho)
+    return f"{info.st_size}-{int(info.st_mtime)}"
+
+def _dtype_codigos(num_categorias):
+    """
+    Menor tipo inteiro capaz de guardar os códigos (o mesmo que o pandas usa)
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if num_categorias < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+def _gravar_json(caminho, dados):
+    """
+    Grava um JSON de forma atômica (arquivo temporário + rename)
+    """
+    temporario = f"{caminho}.tmp-{os.getpid()}"
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+def _ler_json(caminho):
+    """
+    Lê um JSON, ou retorna None se o arquivo não existir
+    """
+    try:
+        with open(caminho, encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        return None
+
+def _gravar_npy(caminho, valores):
+    """
+    Grava um array `.npy` de forma atômica (arquivo temporário + rename)
+    """
+    temporario = f"{caminho}.tmp-{os.getpid()}.npy"
+    np.save(temporario, np.ascontiguousarray(valores))
+    os.replace(temporario, caminho)
+
+def _publicar_diretorio(temporario, diretorio):
+    """
+    Renomeia um diretório recém-gravado para o destino final
+
+    Se outro processo publicou o mesmo diretório antes, o dele é mantido e o
+    nosso é descartado: o conteúdo é equivalente.
+    """
+    os.makedirs(os.path.dirname(diretorio), exist_ok=True)
+    try:
+        os.rename(temporario, diretorio)
+    except OSError:
+        shutil.rmtree(temporario, ignore_errors=True)
+
+def gravar_coluna(diretorio, coluna, serie):
+    """
+    Grava uma coluna no armazém: `.npy` para números, códigos + dicionário para texto
+
+    O arquivo de metadados `<coluna>.json` é gravado por último; enquanto ele não
+    existe, a coluna é considerada ausente. Assim vários processos podem
+    acrescentar colunas ao mesmo armazém sem trava.
+
+    Args:
+        diretorio (str): Diretório do armazém
+        coluna (str): Nome da coluna
+        serie (pd.Series): Valores, na ordem das linhas do armazém
+    """
+    if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+        valores = serie.to_numpy()
+        _gravar_npy(os.path.join(diretorio, f"{coluna}.npy"), valores)
+        info = {'tipo': 'numerico', 'bytes': int(valores.nbytes)}
+    else:
+        codigos, dicionario = pd.factorize(serie, sort=True)
+        codigos = codigos.astype(_dtype_codigos(len(dicionario)))
+        _gravar_npy(os.path.join(diretorio, f"{coluna}.codigos.npy"), codigos)
+        _gravar_json(os.path.join(diretorio, f"{coluna}.dicionario.json"), dicionario.tolist())
+        bytes_dicionario = int(sum(len(valor.encode('utf-8')) for valor in dicionario))
+        info = {'tipo': 'texto', 'bytes': int(codigos.nbytes) + bytes_dicionario}
+
+    _gravar_json(os.path.join(diretorio, f"{coluna}.json"), info)
+
+def gravar_armazem(df, diretorio, versao):
+    """
+    Grava um DataFrame no formato colunar: um arquivo `.npy` por coluna
+
+    A gravação acontece em um diretório temporário renomeado ao final, para
+    que leitores nunca vejam um armazém pela metade.
+
+    Args:
+        df (pd.DataFrame): Dados a gravar
+        diretorio (str): Diretório final do armazém
+        versao (str): Versão do dataset de origem
+    """
+    temporario = f"{diretorio}.tmp-{os.getpid()}"
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(temporario)
+
+    for coluna in df.columns:
+        gravar_coluna(temporario, coluna, df[coluna])
+
+    _gravar_json(os.path.join(temporario, 'manifesto.json'), {'versao': versao, 'num_linhas': len(df)})
+    _publicar_diretorio(temporario, diretorio)
+
+def ler_manifesto(diretorio):
+    """
+    Lê o manifesto de um armazém, ou retorna None se ele não existir
+    """
+    return _ler_json(os.path.join(diretorio, 'manifesto.json'))
+
+def colunas_disponiveis(diretorio, colunas):
+    """
+    Retorna quais das colunas pedidas já estão gravadas no armazém
+    """
+    return [coluna for coluna in colunas if os.path.exists(os.path.join(diretorio, f"{coluna}.json"))]
+
+def ler_colunas(diretorio, colunas, categoricas=()):
+    """
+    Lê apenas as colunas pedidas do armazém (projeção)
+
+    Colunas numéricas e os códigos das colunas categóricas são abertos com
+    memory-map somente leitura e não são copiados: processos diferentes que
+    leem o mesmo armazém compartilham essas páginas de memória. Colunas de
+    texto fora de `categoricas` são decodificadas (cópia privada).
+
+    Args:
+        diretorio (str): Diretório do armazém
+        colunas (list): Colunas a ler
+        categoricas (iterable): Colunas de texto a manter codificadas
+
+    Returns:
+        pd.DataFrame: DataFrame com as colunas pedidas, na ordem pedida
+    """
+    dados = {}
+
+    for coluna in colunas:
+        info = _ler_json(os.path.join(diretorio, f"{coluna}.json"))
+        if info['tipo'] == 'numerico':
+            dados[coluna] = np.load(os.path.join(diretorio, f"{coluna}.npy"), mmap_mode='r')
+            continue
+
+        codigos = np.load(os.path.join(diretorio, f"{coluna}.codigos.npy"), mmap_mode='r')
+        dicionario = _ler_json(os.path.join(diretorio, f"{coluna}.dicionario.json"))
+
+        if coluna in categoricas:
+            dados[coluna] = pd.Categorical.from_codes(codigos, categories=dicionario)
+        else:
+            # O código -1 (ausente) cai no último elemento, que é None
+            dados[coluna] = np.array(dicionario + [None], dtype=object)[codigos]
+
+    return pd.DataFrame(dados, columns=list(colunas), copy=False)
+
+def bytes_colunas(diretorio, colunas):
+    """
+    Retorna o tamanho gravado de cada coluna do armazém
+    """
+    return {coluna: _ler_json(os.path.join(diretorio, f"{coluna}.json"))['bytes'] for coluna in colunas}
+
+def gravar_indice(diretorio, indice):
+    """
+    Grava um índice (dict de arrays NumPy e `pd.Index`) para leitura com memory-map
+
+    Args:
+        diretorio (str): Diretório final do índice
+        indice (dict): Índice no formato de `utils.indices`
+    """
+    temporario = f"{diretorio}.tmp-{os.getpid()}"
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(temporario)
+
+    tipos = {}
+    for nome, valor in indice.items():
+        if isinstance(valor, pd.Index):
+            _gravar_json(os.path.join(temporario, f"{nome}.json"), {'nome': valor.name, 'valores': valor.tolist()})
+            tipos[nome] = 'index'
+        else:
+            _gravar_npy(os.path.join(temporario, f"{nome}.npy"), valor)
+            tipos[nome] = 'array'
+
+    _gravar_json(os.path.join(temporario, 'manifesto.json'), tipos)
+    _publicar_diretorio(temporario, diretorio)
+
+def ler_indice(diretorio):
+    """
+    Lê um índice gravado com `gravar_indice`, ou retorna None se ele não existir
+
+    Os arrays são abertos com memory-map somente leitura.
+    """
+    tipos = _ler_json(os.path.join(diretorio, 'manifesto.json'))
+    if tipos is None:
+        return None
+
+    indice = {}
+    for nome, tipo in tipos.items():
+        if tipo == 'index':
+            dados = _ler_json(os.path.join(diretorio, f"{nome}.json"))
+            indice[nome] = pd.Index(dados['valores'], name=dados['nome'])
+        else:
+            indice[nome] = np.load(os.path.join(diretorio, f"{nome}.npy"), mmap_mode='r')
+    return indice
+
+@contextlib.contextmanager
+def trava_versoes(raiz, exclusiva=False):
+    """
+    Trava entre processos das versões guardadas em `raiz` (arquivo `<raiz>/_trava`)
+
+    Quem lê ou grava arquivos dentro de uma versão segura a trava compartilhada
+    (vários processos ao mesmo tempo); `remover_versoes_antigas` segura a
+    exclusiva, então nunca apaga uma versão no meio de uma gravação. Não
+    aninhe as duas no mesmo processo: a exclusiva esperaria a compartilhada.
+
+    Args:
+        raiz (str): Diretório que contém as versões
+        exclusiva (bool): Trava exclusiva (remoção) em vez da compartilhada
+    """
+    os.makedirs(raiz, exist_ok=True)
+    with open(os.path.join(raiz, '_trava'), 'a+b') as arquivo:
+        if fcntl is not None:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+        else:
+            # msvcrt não tem trava compartilhada: no Windows todas são exclusivas
+            while True:
+                try:
+                    arquivo.seek(0)
+                    msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+            else:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+def remover_versoes_antigas(raiz, versao_atual):
+    """
+    Remove versões antigas do armazém (processos que ainda as mapeiam não são afetados no Linux)
+
+    Espera as gravações em andamento em qualquer versão (`trava_versoes`).
+    Nomes que começam com '_' não são versões e são mantidos.
+    """
+    if not os.path.isdir(raiz):
+        return
+    with trava_versoes(raiz, exclusiva=True):
+        for nome in os.listdir(raiz):
+            if nome != versao_atual and '.tmp-' not in nome and not nome.startswith('_'):
+                shutil.rmtree(os.path.join(raiz, nome), ignore_errors=True)
@@ -0,0 +1,122 @@
+import numpy as np
+
+# Reamostragens por grupo
+REPLICAS_BOOTSTRAP = 1000
+# Valores (réplicas × amostras × features) reamostrados de cada vez (4M float32 = 16 MB)
+ELEMENTOS_BLOCO = 1 << 22
+
+
+def _compactar(ptr, valores, grupos):
+    """
+    CSR só com os grupos pedidos, com os valores deles contíguos
+    """
+    inicios = ptr[grupos]
+    tamanhos = ptr[grupos + 1] - inicios
+    novo_ptr = np.zeros(len(grupos) + 1, dtype=np.int64)
+    np.cumsum(tamanhos, out=novo_ptr[1:])
+    posicoes = np.repeat(inicios - novo_ptr[:-1], tamanhos) + np.arange(novo_ptr[-1])
+    return novo_ptr, valores[posicoes]
+
+def intervalos_bootstrap(ptr, valores, replicas=REPLICAS_BOOTSTRAP, confianca=0.95, semente=0):
+    """
+    Intervalos de confiança bootstrap (percentis) da média de cada grupo, vetorizados
+
+    Os grupos são processados em blocos contíguos: para cada bloco, todas as
+    réplicas de todos os grupos são sorteadas em uma única matriz de índices
+    (cada amostra sorteia dentro do próprio grupo) e as médias saem de um
+    `np.add.reduceat`. Não há laço por grupo; a memória fica limitada por
+    `ELEMENTOS_BLOCO`.
+
+    Não há pool de processos por escolha de projeto: sem o laço por grupo
+    não sobra trabalho Python para dividir, e o resultado é calculado uma
+    vez por versão do dataset e gravado no armazém.
+
+    Args:
+        ptr (np.ndarray): CSR grupo → intervalo em `valores` (tamanho grupos + 1)
+        valores (np.ndarray): Amostras × features, agrupadas conforme `ptr`
+        replicas (int): Reamostragens por grupo
+        confianca (float): Nível do intervalo (ex.: 0,95 → percentis 2,5 e 97,5)
+        semente (int): Semente do gerador, para resultados reprodutíveis
+
+    Returns:
+        tuple: (inferior, superior), arrays grupos × features (float32);
+            NaN para grupos com menos de 2 amostras
+    """
+    ptr = np.asarray(ptr, dtype=np.int64)
+    valores = np.asarray(valores, dtype=np.float32)
+    if valores.ndim == 1:
+        valores = valores[:, None]
+    num_grupos, num_features = len(ptr) - 1, valores.shape[1]
+    inferior = np.full((num_grupos, num_features), np.nan, dtype=np.float32)
+    superior = np.full((num_grupos, num_features), np.nan, dtype=np.float32)
+
+    # Com uma amostra só, toda réplica repete o valor: o intervalo não tem sentido
+    grupos = np.flatnonzero(np.diff(ptr) >= 2)
+    if len(grupos) == 0:
+        return inferior, superior
+    ptr_validos, valores = _compactar(ptr, valores, grupos)
+    tamanhos = np.diff(ptr_validos)
+
+    gerador = np.random.default_rng(semente)
+    percentis = [(1 - confianca) / 2, (1 + confianca) / 2]
+    amostras_por_bloco = max(1, ELEMENTOS_BLOCO // (replicas * num_features))
+
+    inicio = 0
+    while inicio < len(grupos):
+        # Bloco de grupos com até `amostras_por_bloco` amostras (pelo menos um grupo)
+        fim = max(inicio + 1, int(np.searchsorted(ptr_validos, ptr_validos[inicio] + amostras_por_bloco, side='right')) - 1)
+        base, total = ptr_validos[inicio], ptr_validos[fim] - ptr_validos[inicio]
+        tamanhos_bloco = tamanhos[inicio:fim]
+        inicios_relativos = ptr_validos[inicio:fim] - base
+        inicio_por_amostra = np.repeat(inicios_relativos, tamanhos_bloco)
+        tamanho_por_amostra = np.repeat(tamanhos_bloco, tamanhos_bloco)
+
+        medias = np.empty((replicas, fim - inicio, num_features), dtype=np.float32)
+        # Grupos muito grandes não cabem com todas as réplicas: divide as réplicas
+        replicas_por_vez = max(1, ELEMENTOS_BLOCO // (total * num_features))
+        for primeira in range(0, replicas, replicas_por_vez):
+            quantas = min(replicas_por_vez, replicas - primeira)
+            sorteio = base + inicio_por_amostra + (
+                gerador.random((quantas, total)) * tamanho_por_amostra
+            ).astype(np.int64)
+            # Uma linha inteira (todas as features) por sorteio; soma por grupo ao longo das amostras
+            somas = np.add.reduceat(valores[sorteio], inicios_relativos, axis=1, dtype=np.float64)
+            medias[primeira:primeira + quantas] = somas / tamanhos_bloco[:, None]
+
+        limites = np.quantile(medias, percentis, axis=0)
+        inferior[grupos[inicio:fim]] = limites[0]
+        superior[grupos[inicio:fim]] = limites[1]
+        inicio = fim
+
+    return inferior, superior
+
+def limites_grupo(intervalos, codigo, caracteristicas):
+    """
+    Limites (inferior, superior) do intervalo de um grupo nas características pedidas, na mesma ordem
+    """
+    colunas = intervalos['caracteristicas'].get_indexer(caracteristicas)
+    return np.asarray(intervalos['inferior'])[codigo, colunas], np.asarray(intervalos['superior'])[codigo, colunas]
+
+def barras_erro(intervalos, codigos, caracteristica, medias):
+    """
+    Barras de erro assimétricas (Plotly) de uma característica a partir de intervalos já calculados
+
+    Args:
+        intervalos (dict): 'caracteristicas' (pd.Index), 'inferior' e 'superior' (grupos × características)
+        codigos (np.ndarray): Código de cada grupo exibido
+        caracteristica (str): Coluna usada no cálculo dos intervalos
+        medias (np.ndarray): Médias exibidas (o centro das barras)
+
+    Returns:
+        dict: Argumentos para `error_x`/`error_y` ('array' acima e 'arrayminus' abaixo da média)
+    """
+    j = intervalos['caracteristicas'].get_loc(caracteristica)
+    codigos = np.asarray(codigos)
+    medias = np.asarray(medias, dtype=np.float64)
+    return {
+        'type': 'data',
+        'symmetric': False,
+        # Médias arredondadas podem cair um pouco fora do intervalo: a barra nunca fica negativa
+        'array': np.maximum(np.asarray(intervalos['superior'])[codigos, j] - medias, 0),
+        'arrayminus': np.maximum(medias - np.asarray(intervalos['inferior'])[codigos, j], 0),
+    }
@@ -0,0 +1,239 @@
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Posição do casamento no nome: começo do nome, começo de uma palavra, qualquer trecho
+NIVEL_NOME, NIVEL_PALAVRA, NIVEL_TRECHO, SEM_CASAMENTO = 0, 1, 2, 3
+# Peso de cada campo no ranking da busca de faixas (um termo no nome da faixa vale mais)
+PESOS_CAMPOS = {'track_name': 3.0, 'artists': 2.0, 'album_name': 1.0}
+
+
+def normalizar(texto):
+    """
+    Minúsculas e sem acentos, para comparar nomes digitados de qualquer jeito
+    """
+    decomposto = unicodedata.normalize('NFKD', str(texto).lower())
+    return ''.join(caractere for caractere in decomposto if not unicodedata.combining(caractere)).strip()
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+def construir_indice_nomes(nomes, pesos):
+    """
+    Constrói um índice de busca por prefixo e por trigramas sobre uma lista de nomes
+
+    O código de cada nome é a sua posição em `nomes` (ex.: o código do artista
+    em `utils.indices.construir_ponte_artistas`).
+
+    Args:
+        nomes (pd.Index): Nomes a indexar
+        pesos (np.ndarray): Relevância de cada nome (ex.: popularidade média), para ordenar os resultados
+
+    Returns:
+        dict: Índice com as chaves:
+            - 'nomes' (pd.Index): nomes originais, exibidos nos resultados
+            - 'normalizados' (pd.Index): nomes normalizados, na mesma ordem
+            - 'pesos' (np.ndarray): relevância de cada nome
+            - 'ordem' (np.ndarray): códigos do mais para o menos relevante
+            - 'ordenados' (pd.Index), 'ordenados_nomes' (np.ndarray): nomes normalizados em ordem alfabética e seus códigos
+            - 'palavras' (pd.Index), 'palavra_nomes' (np.ndarray): palavras ordenadas e o código do nome de cada uma
+            - 'trigramas' (pd.Index), 'trigrama_ptr', 'trigrama_nomes' (np.ndarray): CSR trigrama → códigos
+    """
+    normalizados = [normalizar(nome) for nome in nomes]
+    pesos = np.asarray(pesos, dtype=np.float64)
+
+    palavras, palavra_nomes = [], []
+    trigramas, trigrama_nomes = [], []
+    for codigo, nome in enumerate(normalizados):
+        for palavra in set(re.findall(r'\w+', nome)):
+            palavras.append(palavra)
+            palavra_nomes.append(codigo)
+        for trigrama in _trigramas(nome):
+            trigramas.append(trigrama)
+            trigrama_nomes.append(codigo)
+
+    ordem_nomes = np.argsort(np.array(normalizados, dtype=object), kind='stable')
+    ordem_palavras = np.argsort(np.array(palavras, dtype=object), kind='stable')
+    codigos_trigramas, dicionario = pd.factorize(pd.Series(trigramas, dtype=object), sort=True)
+    ordem_trigramas = np.argsort(codigos_trigramas, kind='stable')
+    trigrama_ptr = np.zeros(len(dicionario) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codigos_trigramas, minlength=len(dicionario)), out=trigrama_ptr[1:])
+
+    return {
+        'nomes': pd.Index(nomes, dtype=object),
+        'normalizados': pd.Index(normalizados, dtype=object),
+        'pesos': pesos,
+        'ordem': np.argsort(-pesos, kind='stable'),
+        'ordenados': pd.Index(np.array(normalizados, dtype=object)[ordem_nomes], dtype=object),
+        'ordenados_nomes': ordem_nomes.astype(np.int32),
+        'palavras': pd.Index(np.array(palavras, dtype=object)[ordem_palavras], dtype=object),
+        'palavra_nomes': np.array(palavra_nomes, dtype=np.int32)[ordem_palavras],
+        'trigramas': pd.Index(dicionario, dtype=object),
+        'trigrama_ptr': trigrama_ptr,
+        'trigrama_nomes': np.array(trigrama_nomes, dtype=np.int32)[ordem_trigramas],
+    }
+
+def _com_prefixo(ordenados, prefixo):
+    """
+    Intervalo [inicio, fim) dos valores de um pd.Index ordenado que começam com `prefixo`
+
+    `bisect` acessa só ~log2(n) posições; `searchsorted` em índices de texto
+    converte o índice inteiro a cada chamada.
+    """
+    return bisect.bisect_left(ordenados, prefixo), bisect.bisect_left(ordenados, prefixo + '\uffff')
+
+def _contendo(indice, consulta):
+    """
+    Códigos dos nomes que contêm `consulta` como trecho (interseção das listas de trigramas)
+    """
+    candidatos = None
+    for trigrama in _trigramas(consulta):
+        posicao = indice['trigramas'].get_indexer([trigrama])[0]
+        if posicao < 0:
+            return np.empty(0, dtype=np.int32)
+        lista = indice['trigrama_nomes'][indice['trigrama_ptr'][posicao]:indice['trigrama_ptr'][posicao + 1]]
+        candidatos = lista if candidatos is None else np.intersect1d(candidatos, lista, assume_unique=True)
+    # Trigramas em comum não garantem o trecho contíguo: confirma nos candidatos
+    contem = indice['normalizados'].take(candidatos).str.contains(consulta, regex=False)
+    return candidatos[np.asarray(contem, dtype=bool)]
+
+def buscar_nomes(indice, consulta, limite=20, permitidos=None):
+    """
+    Busca nomes enquanto o usuário digita, ordenando pelo tipo de casamento e pela relevância
+
+    Nomes que começam com a consulta vêm primeiro, depois os que têm uma
+    palavra começando com ela e, por fim (consultas com 3+ letras), os que a
+    contêm em qualquer posição. Dentro de cada grupo, os mais relevantes
+    primeiro. Consulta vazia devolve os mais relevantes.
+
+    Args:
+        indice (dict): Índice de `construir_indice_nomes`
+        consulta (str): Texto digitado (maiúsculas e acentos são ignorados)
+        limite (int): Máximo de resultados
+        permitidos (np.ndarray, opcional): Máscara booleana por código (ex.: artistas que passam nos filtros)
+
+    Returns:
+        np.ndarray: Códigos dos nomes encontrados, do melhor para o pior
+    """
+    consulta = normalizar(consulta)
+    ordem = indice['ordem']
+    if not consulta:
+        return ordem[permitidos[ordem]][:limite] if permitidos is not None else ordem[:limite]
+
+    # Nível de cada código; SEM_CASAMENTO fica de fora
+    niveis = np.full(len(ordem), SEM_CASAMENTO, dtype=np.int8)
+    if len(consulta) >= 3:
+        niveis[_contendo(indice, consulta)] = NIVEL_TRECHO
+    inicio, fim = _com_prefixo(indice['palavras'], consulta)
+    niveis[indice['palavra_nomes'][inicio:fim]] = NIVEL_PALAVRA
+    inicio, fim = _com_prefixo(indice['ordenados'], consulta)
+    niveis[indice['ordenados_nomes'][inicio:fim]] = NIVEL_NOME
+
+    # `ordem` já vem por relevância: uma ordenação estável por nível mantém o desempate
+    encontrados = niveis[ordem] < SEM_CASAMENTO
+    if permitidos is not None:
+        encontrados &= permitidos[ordem]
+    codigos = ordem[encontrados]
+    return codigos[np.argsort(niveis[codigos], kind='stable')][:limite]
+
+def _termos(texto):
+    return re.findall(r'\w+', normalizar(texto))
+
+def construir_indice_textual(campos, pesos):
+    """
+    Constrói um índice invertido termo → faixas sobre campos de texto
+
+    Cada campo é normalizado (minúsculas, sem acentos) e quebrado em termos.
+    Valores repetidos (álbuns, artistas) são processados uma única vez.
+
+    Args:
+        campos (dict): Nome do campo (chave de `PESOS_CAMPOS`) → pd.Series com uma linha por faixa
+        pesos (np.ndarray): Relevância de cada faixa (ex.: popularidade), para desempate
+
+    Returns:
+        dict: Índice com as chaves:
+            - 'termos' (pd.Index): termos em ordem alfabética
+            - 'termo_ptr' (np.ndarray): início das faixas de cada termo (CSR)
+            - 'termo_faixas' (np.ndarray): faixas (posição na tabela) de cada termo
+            - 'termo_campos' (np.ndarray): bits dos campos em que o termo aparece na faixa
+            - 'pesos' (np.ndarray): relevância de cada faixa
+    """
+    partes = []
+    for bit, (campo, serie) in enumerate(campos.items()):
+        codigos, valores = pd.factorize(serie)
+        termos_valor = pd.Series([_termos(valor) for valor in valores], dtype=object).explode().dropna()
+        # Faixas de cada valor distinto, replicadas para os termos do valor
+        faixas_valor = pd.DataFrame({'faixa': np.arange(len(codigos), dtype=np.int32), 'valor': codigos})
+        pares = faixas_valor.merge(
+            pd.DataFrame({'valor': termos_valor.index, 'termo': termos_valor.to_numpy()}), on='valor'
+        )
+        partes.append(pares[['termo', 'faixa']].assign(campo=np.int8(1 << bit)).drop_duplicates())
+
+    pares = pd.concat(partes, ignore_index=True)
+    codigos_termos, termos = pd.factorize(pares['termo'], sort=True)
+    pares = (
+        pd.DataFrame({'termo': codigos_termos, 'faixa': pares['faixa'].to_numpy(), 'campo': pares['campo'].to_numpy()})
+        .groupby(['termo', 'faixa'], sort=True)['campo'].sum()
+        .reset_index()
+    )
+    termo_ptr = np.zeros(len(termos) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pares['termo'], minlength=len(termos)), out=termo_ptr[1:])
+
+    return {
+        'termos': pd.Index(np.asarray(termos, dtype=object), dtype=object),
+        'termo_ptr': termo_ptr,
+        'termo_faixas': pares['faixa'].to_numpy(dtype=np.int32),
+        'termo_campos': pares['campo'].to_numpy(dtype=np.int8),
+        'pesos': np.asarray(pesos, dtype=np.float64),
+    }
+
+def buscar_faixas(indice, consulta, campos=tuple(PESOS_CAMPOS)):
+    """
+    Busca faixas que contêm todos os termos da consulta, da mais para a menos relevante
+
+    O último termo casa por prefixo (busca enquanto digita). A pontuação soma,
+    para cada termo, o peso dos campos em que ele aparece vezes a raridade do
+    termo (IDF); empates são desfeitos pela relevância da faixa.
+
+    Args:
+        indice (dict): Índice de `construir_indice_textual`
+        consulta (str): Texto digitado
+        campos (tuple): Campos do índice, na ordem em que foram indexados
+
+    Returns:
+        np.ndarray: Posições das faixas encontradas, ordenadas (todas; pagine com fatias)
+    """
+    termos = _termos(consulta)
+    if not termos:
+        return np.empty(0, dtype=np.int64)
+
+    # Peso de cada combinação de bits de campos
+    pesos_bits = np.array([
+        sum(PESOS_CAMPOS[campo] for bit, campo in enumerate(campos) if mascara >> bit & 1)
+        for mascara in range(1 << len(campos))
+    ])
+    total = len(indice['pesos'])
+    pontos = np.zeros(total, dtype=np.float64)
+    casados = np.zeros(total, dtype=np.int16)
+    for posicao, termo in enumerate(termos):
+        if posicao == len(termos) - 1:
+            inicio, fim = _com_prefixo(indice['termos'], termo)
+        else:
+            inicio, fim = bisect.bisect_left(indice['termos'], termo), bisect.bisect_right(indice['termos'], termo)
+        trecho = slice(indice['termo_ptr'][inicio], indice['termo_ptr'][fim])
+        faixas = indice['termo_faixas'][trecho]
+        if len(faixas) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # Um prefixo pode expandir para vários termos da mesma faixa: fica o melhor
+        pontos_termo = np.zeros(total, dtype=np.float64)
+        np.maximum.at(pontos_termo, faixas, pesos_bits[indice['termo_campos'][trecho]])
+        encontradas = pontos_termo > 0
+        pontos += pontos_termo * np.log1p(total / encontradas.sum())
+        casados += encontradas
+
+    resultado = np.flatnonzero(casados == len(termos))
+    return resultado[np.lexsort((-indice['pesos'][resultado], -pontos[resultado]))]
@@ -0,0 +1,216 @@
+import functools
+import glob
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+import pandas as pd
+from utils.metricas import adicionar_coletor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DIRETORIO_CACHE = './Dataset/cache'
+
+# Resultados já lidos neste processo: (nome, parâmetros) → (versão, valor)
+_memoria = {}
+# Contadores por artefato neste processo: nome → {evento: quantidade}
+_contadores = {}
+_trava_processo = threading.Lock()
+
+EVENTOS = ['acertos', 'faltas', 'esperas', 'antigos']
+
+
+def _contar(nome, evento):
+    """
+    Incrementa um contador de eventos do artefato
+    """
+    with _trava_processo:
+        contadores = _contadores.setdefault(nome, dict.fromkeys(EVENTOS, 0))
+        contadores[evento] += 1
+
+def _travar(arquivo, bloquear):
+    """
+    Obtém a trava exclusiva de um arquivo; retorna False se ela estiver ocupada e `bloquear` for falso
+    """
+    if fcntl is not None:
+        try:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | (0 if bloquear else fcntl.LOCK_NB))
+            return True
+        except BlockingIOError:
+            return False
+
+    while True:
+        try:
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not bloquear:
+                return False
+            time.sleep(0.05)
+
+def _destravar(arquivo):
+    """
+    Libera a trava obtida com `_travar`
+    """
+    if fcntl is not None:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+    else:
+        arquivo.seek(0)
+        msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _ler_pickle(caminho):
+    """
+    Lê um artefato gravado, ou retorna None se ele não existir
+    """
+    try:
+        with open(caminho, 'rb') as arquivo:
+            return pickle.load(arquivo)
+    except FileNotFoundError:
+        return None
+
+def _gravar_pickle(caminho, valor):
+    """
+    Grava um artefato de forma atômica (arquivo temporário + rename)
+    """
+    temporario = f"{caminho}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(temporario, 'wb') as arquivo:
+        pickle.dump(valor, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporario, caminho)
+
+def _versao_anterior(diretorio, versao):
+    """
+    Retorna o artefato de versão anterior mais recente, se houver
+    """
+    anteriores = [
+        caminho for caminho in glob.glob(os.path.join(diretorio, '*.pkl'))
+        if os.path.basename(caminho) != f"{versao}.pkl"
+    ]
+    if not anteriores:
+        return None
+    return _ler_pickle(max(anteriores, key=os.path.getmtime))
+
+def _remover_anteriores(diretorio, versao):
+    """
+    Remove as versões antigas de um artefato depois que a nova foi publicada
+    """
+    for caminho in glob.glob(os.path.join(diretorio, '*.pkl')):
+        if os.path.basename(caminho) != f"{versao}.pkl":
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+
+def obter_artefato(nome, parametros, versao, construir, servir_anterior=False):
+    """
+    Retorna um artefato do cache compartilhado entre processos, construindo-o se preciso
+
+    Apenas um processo constrói cada artefato por vez (trava de arquivo). Os
+    demais esperam a construção terminar e leem o resultado publicado. Com
+    `servir_anterior`, em vez de esperar servem a versão anterior do mesmo
+    artefato, se existir: só para artefatos apenas exibidos, que não são
+    indexados por códigos (que mudam a cada versão) nem usados para construir
+    outros artefatos.
+
+    Args:
+        nome (str): Nome do artefato (ex.: 'tabela_artistas')
+        parametros (str): Identificação dos argumentos usados na construção
+        versao (str): Versão dos dados de origem; muda quando o dataset muda
+        construir (callable): Função sem argumentos que produz o artefato da `versao`
+        servir_anterior (bool): Se a versão anterior pode ser servida enquanto outro processo constrói
+
+    Returns:
+        object: O artefato (compartilhado neste processo: não altere no lugar)
+    """
+    with _trava_processo:
+        versao_memoria, valor = _memoria.get((nome, parametros), (None, None))
+    if versao_memoria == versao:
+        _contar(nome, 'acertos')
+        return valor
+
+    diretorio = os.path.join(DIRETORIO_CACHE, nome, parametros)
+    caminho = os.path.join(diretorio, f"{versao}.pkl")
+    os.makedirs(diretorio, exist_ok=True)
+
+    valor = _ler_pickle(caminho)
+    evento = 'acertos'
+
+    if valor is None:
+        with open(os.path.join(diretorio, 'trava'), 'a+b') as trava:
+            if not _travar(trava, bloquear=False):
+                # Outro processo está construindo: serve a versão anterior (se permitido) ou espera
+                anterior = _versao_anterior(diretorio, versao) if servir_anterior else None
+                if anterior is not None:
+                    _contar(nome, 'antigos')
+                    return anterior
+                _travar(trava, bloquear=True)
+                evento = 'esperas'
+            try:
+                valor = _ler_pickle(caminho)
+                if valor is None:
+                    valor = construir()
+                    _gravar_pickle(caminho, valor)
+                    _remover_anteriores(diretorio, versao)
+                    evento = 'faltas'
+            finally:
+                _destravar(trava)
+
+    with _trava_processo:
+        _memoria[(nome, parametros)] = (versao, valor)
+    _contar(nome, evento)
+    return valor
+
+def compartilhado(nome, servir_anterior=False):
+    """
+    Decorador que guarda o resultado da função no cache compartilhado entre processos
+
+    O primeiro argumento da função é a versão dos dados: ela é a versão do
+    artefato e é repassada à função, que deve construí-lo a partir dos
+    carregadores dessa mesma versão. Os demais argumentos entram na chave
+    pelo `repr`, então devem ser valores simples (strings, números, listas e
+    tuplas deles).
+
+    Args:
+        nome (str): Nome do artefato
+        servir_anterior (bool): Ver `obter_artefato`
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(versao, *args, **kwargs):
+            # hashlib, e não hash(): o hash de strings muda a cada processo
+            parametros = hashlib.sha1(repr((args, sorted(kwargs.items()))).encode('utf-8')).hexdigest()[:16]
+            return obter_artefato(
+                nome, parametros, versao, lambda: funcao(versao, *args, **kwargs), servir_anterior=servir_anterior
+            )
+        return envoltorio
+    return decorador
+
+def estatisticas_cache():
+    """
+    Retorna os contadores de acertos, faltas, esperas e versões antigas servidas por artefato
+
+    Returns:
+        pd.DataFrame: Uma linha por artefato (contadores deste processo)
+    """
+    with _trava_processo:
+        linhas = [{'artefato': nome, **contadores} for nome, contadores in sorted(_contadores.items())]
+    return pd.DataFrame(linhas, columns=['artefato'] + EVENTOS)
+
+def _coletar_metricas():
+    """
+    Exporta os contadores por artefato como `spotify_cache_eventos_total`
+    """
+    with _trava_processo:
+        return [
+            ('spotify_cache_eventos_total', {'cache': nome, 'evento': evento}, quantidade)
+            for nome, contadores in _contadores.items()
+            for evento, quantidade in contadores.items()
+        ]
+
+adicionar_coletor(_coletar_metricas)
@@ -1,162 +1,962 @@
+import contextlib
+import hashlib
+import io
+import os
+
+import numpy as np
 import pandas as pd
 import streamlit as st
+from utils.agrupamento import agrupar, num_unicos
+from utils.armazem import (DIRETORIO_ARMAZEM, bytes_colunas, colunas_disponiveis, gravar_armazem, gravar_coluna,
+                           gravar_indice, ler_colunas, ler_indice, ler_manifesto, remover_versoes_antigas,
+                           trava_versoes, versao_arquivo)
+from utils.busca import PESOS_CAMPOS, construir_indice_nomes, construir_indice_textual
+from utils.bootstrap import intervalos_bootstrap
+from utils.cache_compartilhado import compartilhado
+from utils.clusters import atribuir_clusters, kmeans_minibatch
+from utils.colaboracoes import construir_grafo_colaboracoes
+from utils.coocorrencia import atualizar_coocorrencia, construir_coocorrencia
+from utils.indices import (agrupar_generos, construir_pertinencia_generos, construir_ponte_artistas,
+                           contagem_por_genero, expandir_por_artista, expandir_por_genero,
+                           genero_mais_comum_por_artista)
+from utils.metricas import contar_cache, definir, registrar, registrar_falta_cache
+from utils.projecao import pca_aleatoria
+from utils.segmentos import CARACTERISTICAS_SEGMENTO, DIMENSOES_SEGMENTO, construir_momentos
+from utils.semelhanca import (CARACTERISTICAS_SEMELHANCA, LIMITE_BUSCA_EXATA, construir_arvore, construir_ivf,
+                              construir_matriz_caracteristicas, distancias_generos, perfis_artistas,
+                              vizinhos_cosseno)
+
+CAMINHO_DATASET = './Dataset/dataset.csv'
+
+# Colunas originais do CSV (sem a coluna de índice 'Unnamed: 0')
+COLUNAS_BASE = [
+    'track_id', 'artists', 'album_name', 'track_name', 'popularity', 'duration_ms', 'explicit',
+    'danceability', 'energy', 'key', 'loudness', 'mode', 'speechiness', 'acousticness',
+    'instrumentalness', 'liveness', 'valence', 'tempo', 'time_signature', 'track_genre'
+]
+
+# Colunas de texto armazenadas como categóricas; agrupe-as com `utils.agrupamento`
+COLUNAS_CODIFICADAS = [
+    'primeiro_artista', 'album_name', 'track_genre', 'genero_principal', 'categoria_popularidade',
+    'categoria_energia', 'categoria_dancabilidade', 'categoria_duracao', 'categoria_tempo',
+    'chave_musical', 'modo_musical'
+]
+
+# Grupos de gêneros principais
+GENEROS_PRINCIPAIS = {
+    'Pop': ['pop', 'pop-film', 'power-pop', 'indie-pop', 'k-pop', 'j-pop', 'mandopop', 'cantopop'],
+    'Rock': ['rock', 'alt-rock', 'alternative', 'hard-rock', 'punk-rock', 'punk', 'rock-n-roll', 
+            'grunge', 'psych-rock', 'rockabilly'],
+    'Metal': ['metal', 'black-metal', 'death-metal', 'heavy-metal', 'metalcore', 'grindcore'],
+    'Eletrônica': ['electronic', 'edm', 'electro', 'house', 'techno', 'trance', 'dubstep', 
+                  'drum-and-bass', 'detroit-techno', 'deep-house', 'progressive-house', 'minimal-techno'],
+    'Hip-Hop/R&B': ['hip-hop', 'r-n-b'],
+    'Jazz/Blues': ['jazz', 'blues'],
+    'Latino': ['latin', 'latino', 'samba', 'salsa', 'reggaeton', 'tango', 'sertanejo'],
+    'Folk/Acoustic': ['folk', 'acoustic', 'singer-songwriter', 'songwriter', 'country'],
+    'Clássico/Opera': ['classical', 'opera', 'piano'],
+    'Mundial': ['world-music', 'afrobeat', 'brazilian', 'french', 'german', 'indian', 
+               'iranian', 'turkish', 'spanish', 'swedish', 'malay'],
+    'Outros': []  # Será preenchido com o restante
+}
+
+# Médias com intervalo de confiança bootstrap (as exibidas nos gráficos de gêneros e de artistas)
+COLUNAS_INTERVALOS_GENEROS = [
+    'popularity', 'danceability', 'energy', 'valence', 'acousticness', 'instrumentalness',
+    'liveness', 'speechiness', 'tempo', 'duration_min', 'loudness'
+]
+COLUNAS_INTERVALOS_ARTISTAS = ['popularity', 'danceability', 'energy', 'valence', 'acousticness', 'duration_min']
+
+registrar('spotify_dataset_bytes', 'gauge', "Bytes do dataset mapeados por este processo, por tabela")
+# Bytes por coluna já mapeada neste processo (uma coluna pode estar em vários manifestos)
+_bytes_mapeados = {}
+
+# Estados atualizados de forma incremental quando o CSV cresce (sobrevivem à troca de versão)
+DIRETORIO_INCREMENTAL = os.path.join(DIRETORIO_ARMAZEM, '_incremental')
+# Bytes do final do trecho já lido que identificam o conteúdo (detecta arquivos reescritos)
+BYTES_ASSINATURA = 1 << 16
+
+def classificar_genero_principal(genero):
+    """
+    Retorna o gênero principal (grupo) de um `track_genre`
+    """
+    for categoria, generos in GENEROS_PRINCIPAIS.items():
+        if genero in generos:
+            return categoria
+    return 'Outros'
+
+def _selecionar_faixas(valores, limites, rotulos):
+    """
+    Classifica valores em faixas fechadas à direita (valor <= limite), de forma vetorizada
+    """
+    valores = np.asarray(valores)
+    return np.select([valores <= limite for limite in limites], rotulos[:-1], default=rotulos[-1])
+
+def categorizar_popularidade(pop):
+    """
+    Cria categorias de popularidade (0 = sem dados)
+    """
+    categorias = _selecionar_faixas(
+        pop, [20, 40, 60, 80],
+        ['Baixa (1-20)', 'Média-baixa (21-40)', 'Média (41-60)', 'Alta (61-80)', 'Muito Alta (81-100)']
+    )
+    return np.where(np.asarray(pop) == 0, 'Sem dados', categorias)
+
+def categorizar_energia(energia):
+    """
+    Cria categorias de energia
+    """
+    return _selecionar_faixas(energia, [0.3, 0.6], ['Baixa energia', 'Média energia', 'Alta energia'])
+
+def categorizar_dancabilidade(dance):
+    """
+    Cria categorias de dançabilidade
+    """
+    return _selecionar_faixas(dance, [0.3, 0.6], ['Pouco dançável', 'Moderadamente dançável', 'Muito dançável'])
+
+def categorizar_duracao(duracao_min):
+    """
+    Cria categorias de tempo (duração)
+    """
+    return _selecionar_faixas(
+        duracao_min, [2, 3.5, 5, 7],
+        ['Muito curta (≤2min)', 'Curta (2-3.5min)', 'Média (3.5-5min)', 'Longa (5-7min)', 'Muito longa (>7min)']
+    )
+
+def categorizar_tempo(bpm):
+    """
+    Cria faixas de tempo (BPM)
+    """
+    return _selecionar_faixas(
+        bpm, [70, 100, 120, 140],
+        ['Muito Lento (≤70)', 'Lento (71-100)', 'Moderado (101-120)', 'Rápido (121-140)', 'Muito Rápido (>140)']
+    )
+
+# Mapeamento de chaves musicais
+CHAVES_MAPA = {
+    0: 'C', 1: 'C#/D♭', 2: 'D', 3: 'D#/E♭', 4: 'E', 5: 'F',
+    6: 'F#/G♭', 7: 'G', 8: 'G#/A♭', 9: 'A', 10: 'A#/B♭', 11: 'B'
+}
+
+def _mapear_valores(serie, funcao):
+    """
+    Aplica uma função a cada valor; em colunas categóricas, só aos valores distintos
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        mapeados = np.array([funcao(valor) for valor in serie.cat.categories] + [None], dtype=object)
+        return mapeados[serie.cat.codes.to_numpy()]
+    return serie.map(funcao)
+
+# Colunas derivadas: nome → (colunas de que depende, função que a calcula)
+COLUNAS_DERIVADAS = {
+    # Converte duração de milissegundos para segundos e minutos
+    'duration_sec': (['duration_ms'], lambda df: df['duration_ms'] / 1000),
+    # Mesma ordem de operações do cálculo original (ms → s → min): `/ 60000` difere na última casa
+    'duration_min': (['duration_ms'], lambda df: df['duration_ms'] / 1000 / 60),
+    'categoria_popularidade': (['popularity'], lambda df: categorizar_popularidade(df['popularity'])),
+    'categoria_energia': (['energy'], lambda df: categorizar_energia(df['energy'])),
+    'categoria_dancabilidade': (['danceability'], lambda df: categorizar_dancabilidade(df['danceability'])),
+    'categoria_duracao': (['duration_ms'], lambda df: categorizar_duracao(df['duration_ms'] / 1000 / 60)),
+    'chave_musical': (['key'], lambda df: df['key'].map(CHAVES_MAPA)),
+    'modo_musical': (['mode'], lambda df: df['mode'].map({0: 'Menor', 1: 'Maior'})),
+    # Limpa dados de artistas (alguns têm múltiplos artistas separados por ;)
+    'primeiro_artista': (['artists'], lambda df: df['artists'].str.split(';').str[0]),
+    'tem_feat': (['artists'], lambda df: df['artists'].str.contains(';', na=False)),
+    # Cria grupos de gêneros principais
+    'genero_principal': (['track_genre'], lambda df: _mapear_valores(df['track_genre'], classificar_genero_principal)),
+    'categoria_tempo': (['tempo'], lambda df: categorizar_tempo(df['tempo'])),
+}
+
+TODAS_AS_COLUNAS = COLUNAS_BASE + list(COLUNAS_DERIVADAS)
+
+def colunas_base_necessarias(colunas):
+    """
+    Resolve quais colunas do CSV são necessárias para montar as colunas pedidas
+    
+    Args:
+        colunas (list): Colunas base e/ou derivadas
+    
+    Returns:
+        list: Colunas base, na ordem de `COLUNAS_BASE`
+    """
+    necessarias = set()
+    for coluna in colunas:
+        if coluna in COLUNAS_DERIVADAS:
+            necessarias.update(COLUNAS_DERIVADAS[coluna][0])
+        elif coluna in COLUNAS_BASE:
+            necessarias.add(coluna)
+        else:
+            raise KeyError(f"Coluna desconhecida: {coluna}")
+    return [coluna for coluna in COLUNAS_BASE if coluna in necessarias]
+
+def processar_dados(df, colunas=None):
+    """
+    Cria as colunas derivadas usadas pelas páginas
+    
+    Apenas as derivadas listadas em `colunas` são calculadas; as demais nunca
+    são materializadas.
+    
+    Args:
+        df (pd.DataFrame): Dataset com as colunas base necessárias
+        colunas (list, opcional): Colunas desejadas (todas se None)
+    
+    Returns:
+        pd.DataFrame: Dataset com as colunas pedidas
+    """
+    colunas = TODAS_AS_COLUNAS if colunas is None else list(colunas)
+    
+    for coluna in colunas:
+        if coluna in COLUNAS_DERIVADAS and coluna not in df.columns:
+            df[coluna] = COLUNAS_DERIVADAS[coluna][1](df)
+    
+    # Codifica colunas de texto usadas em agrupamentos (códigos inteiros + dicionário)
+    for coluna in COLUNAS_CODIFICADAS:
+        if coluna in colunas and not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype('category')
+    
+    return df[colunas]
 
+@contar_cache('carregar_dados')
 @st.cache_data
 def carregar_dados():
     """
     Carrega e processa o dataset do Spotify com features de áudio
     
+    Mantém uma linha por par (faixa, gênero), exatamente como no CSV original.
+    As páginas usam `carregar_faixas`, que não duplica faixas.
+    
     Returns:
         pd.DataFrame: Dataset processado e limpo
     """
+    registrar_falta_cache('carregar_dados')
     # Carrega o dataset original
-    df_original = pd.read_csv('./Dataset/dataset.csv')
+    df_original = pd.read_csv(CAMINHO_DATASET)
     
     # Remove a coluna desnecessária
     df = df_original.drop('Unnamed: 0', axis=1)
+    df = processar_dados(df)
     
-    # Conversões e limpeza dos dados
-    
-    # Converte duração de milissegundos para segundos e minutos
-    df['duration_sec'] = df['duration_ms'] / 1000
-    df['duration_min'] = df['duration_sec'] / 60
-    
-    # Cria categorias de popularidade
-    def categorizar_popularidade(pop):
-        if pop == 0:
-            return 'Sem dados'
-        elif pop <= 20:
-            return 'Baixa (1-20)'
-        elif pop <= 40:
-            return 'Média-baixa (21-40)'
-        elif pop <= 60:
-            return 'Média (41-60)'
-        elif pop <= 80:
-            return 'Alta (61-80)'
-        else:
-            return 'Muito Alta (81-100)'
-    
-    df['categoria_popularidade'] = df['popularity'].apply(categorizar_popularidade)
+    # Ordena por popularidade descendente
+    return df.sort_values('popularity', ascending=False).reset_index(drop=True)
+
+def versao_dataset():
+    """
+    Versão atual do CSV de origem; chaveia o armazém e o cache compartilhado
+    """
+    return versao_arquivo(CAMINHO_DATASET)
+
+def garantir_armazem(versao):
+    """
+    Garante que o armazém colunar da tabela canônica existe para uma versão do dataset
     
-    # Cria categorias de energia
-    def categorizar_energia(energia):
-        if energia <= 0.3:
-            return 'Baixa energia'
-        elif energia <= 0.6:
-            return 'Média energia'
-        else:
-            return 'Alta energia'
+    Na primeira execução (ou quando o CSV muda) lê o CSV, remove faixas
+    duplicadas, ordena por popularidade e grava uma coluna por arquivo. Os
+    demais processos do servidor apenas mapeiam os arquivos já gravados.
     
-    df['categoria_energia'] = df['energy'].apply(categorizar_energia)
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
     
-    # Cria categorias de dançabilidade
-    def categorizar_dancabilidade(dance):
-        if dance <= 0.3:
-            return 'Pouco dançável'
-        elif dance <= 0.6:
-            return 'Moderadamente dançável'
-        else:
-            return 'Muito dançável'
-    
-    df['categoria_dancabilidade'] = df['danceability'].apply(categorizar_dancabilidade)
-    
-    # Cria categorias de tempo (duração)
-    def categorizar_duracao(duracao_min):
-        if duracao_min <= 2:
-            return 'Muito curta (≤2min)'
-        elif duracao_min <= 3.5:
-            return 'Curta (2-3.5min)'
-        elif duracao_min <= 5:
-            return 'Média (3.5-5min)'
-        elif duracao_min <= 7:
-            return 'Longa (5-7min)'
-        else:
-            return 'Muito longa (>7min)'
+    Returns:
+        str: Diretório da versão do armazém (com `faixas/` e `indices/`)
+    """
+    with trava_versoes(DIRETORIO_ARMAZEM):
+        raiz, construiu = _construir_armazem(versao)
+    if construiu:
+        remover_versoes_antigas(DIRETORIO_ARMAZEM, versao)
+    return raiz
+
+def _construir_armazem(versao):
+    """
+    Grava a tabela canônica da versão se ainda não existir, sem remover as antigas
+
+    Chame segurando `trava_versoes(DIRETORIO_ARMAZEM)`.
+
+    Returns:
+        tuple: Diretório da versão e se ela precisou ser gravada
+    """
+    raiz = os.path.join(DIRETORIO_ARMAZEM, versao)
+    diretorio = os.path.join(raiz, 'faixas')
     
-    df['categoria_duracao'] = df['duration_min'].apply(categorizar_duracao)
+    if ler_manifesto(diretorio) is not None:
+        return raiz, False
+    df = pd.read_csv(CAMINHO_DATASET, usecols=COLUNAS_BASE)[COLUNAS_BASE]
+    df = df.drop_duplicates('track_id')
+    df = df.sort_values('popularity', ascending=False, kind='stable').reset_index(drop=True)
+    gravar_armazem(df, diretorio, versao)
+    return raiz, True
+
+@contextlib.contextmanager
+def _versao_em_uso(versao):
+    """
+    Diretório da versão do armazém, protegido da remoção enquanto o bloco lê ou grava nele
+
+    Se outro processo removeu a versão entre `garantir_armazem` e a trava (o
+    CSV mudou de novo), ela é regravada aqui em vez de falhar na gravação.
+    """
+    garantir_armazem(versao)
+    with trava_versoes(DIRETORIO_ARMAZEM):
+        yield _construir_armazem(versao)[0]
+
+def _garantir_colunas(diretorio, colunas):
+    """
+    Calcula e grava no armazém as colunas derivadas pedidas que ainda não existem
     
-    # Mapeamento de chaves musicais
-    chaves_mapa = {
-        0: 'C', 1: 'C#/D♭', 2: 'D', 3: 'D#/E♭', 4: 'E', 5: 'F',
-        6: 'F#/G♭', 7: 'G', 8: 'G#/A♭', 9: 'A', 10: 'A#/B♭', 11: 'B'
-    }
-    df['chave_musical'] = df['key'].map(chaves_mapa)
+    Cada derivada é calculada uma única vez (por versão do dataset), pelo
+    primeiro processo que precisar dela.
+    """
+    faltantes = [coluna for coluna in colunas if coluna not in colunas_disponiveis(diretorio, colunas)]
+    if not faltantes:
+        return
     
-    # Mapeamento de modos
-    df['modo_musical'] = df['mode'].map({0: 'Menor', 1: 'Maior'})
+    base = ler_colunas(diretorio, colunas_base_necessarias(faltantes), categoricas=COLUNAS_CODIFICADAS)
+    derivadas = processar_dados(base, faltantes)
+    for coluna in faltantes:
+        gravar_coluna(diretorio, coluna, derivadas[coluna])
+
+@contar_cache('carregar_faixas')
+@st.cache_resource
+def carregar_faixas(versao, colunas=None):
+    """
+    Carrega a tabela canônica de faixas, com uma linha por `track_id`
     
-    # Limpa dados de artistas (alguns têm múltiplos artistas separados por ;)
-    df['primeiro_artista'] = df['artists'].str.split(';').str[0]
-    df['tem_feat'] = df['artists'].str.contains(';', na=False)
+    No dataset original a mesma faixa aparece uma vez para cada gênero em que
+    está classificada. Aqui fica apenas a primeira ocorrência; a relação
+    faixa × gênero completa está em `carregar_indice_generos`.
     
-    # Cria grupos de gêneros principais
-    generos_principais = {
-        'Pop': ['pop', 'pop-film', 'power-pop', 'indie-pop', 'k-pop', 'j-pop', 'mandopop', 'cantopop'],
-        'Rock': ['rock', 'alt-rock', 'alternative', 'hard-rock', 'punk-rock', 'punk', 'rock-n-roll', 
-                'grunge', 'psych-rock', 'rockabilly'],
-        'Metal': ['metal', 'black-metal', 'death-metal', 'heavy-metal', 'metalcore', 'grindcore'],
-        'Eletrônica': ['electronic', 'edm', 'electro', 'house', 'techno', 'trance', 'dubstep', 
-                      'drum-and-bass', 'detroit-techno', 'deep-house', 'progressive-house', 'minimal-techno'],
-        'Hip-Hop/R&B': ['hip-hop', 'r-n-b'],
-        'Jazz/Blues': ['jazz', 'blues'],
-        'Latino': ['latin', 'latino', 'samba', 'salsa', 'reggaeton', 'tango', 'sertanejo'],
-        'Folk/Acoustic': ['folk', 'acoustic', 'singer-songwriter', 'songwriter', 'country'],
-        'Clássico/Opera': ['classical', 'opera', 'piano'],
-        'Mundial': ['world-music', 'afrobeat', 'brazilian', 'french', 'german', 'indian', 
-                   'iranian', 'turkish', 'spanish', 'swedish', 'malay'],
-        'Outros': []  # Será preenchido com o restante
-    }
+    Cada página declara as colunas de que precisa e só elas são lidas do
+    armazém colunar. Derivadas são calculadas na primeira vez em que alguma
+    página as pede e ficam gravadas no armazém.
     
-    def classificar_genero_principal(genero):
-        for categoria, generos in generos_principais.items():
-            if genero in generos:
-                return categoria
-        return 'Outros'
-    
-    df['genero_principal'] = df['track_genre'].apply(classificar_genero_principal)
-    
-    # Cria faixas de tempo (BPM)
-    def categorizar_tempo(bpm):
-        if bpm <= 70:
-            return 'Muito Lento (≤70)'
-        elif bpm <= 100:
-            return 'Lento (71-100)'
-        elif bpm <= 120:
-            return 'Moderado (101-120)'
-        elif bpm <= 140:
-            return 'Rápido (121-140)'
-        else:
-            return 'Muito Rápido (>140)'
+    As colunas são memory-maps somente leitura compartilhados entre sessões e
+    entre processos do servidor: filtre ou copie, nunca altere no lugar.
     
-    df['categoria_tempo'] = df['tempo'].apply(categorizar_tempo)
+    A versão faz parte da chave do cache: quando o CSV muda, a próxima chamada
+    com `versao_dataset()` abre o armazém novo em vez de manter o antigo.
     
-    # Ordena por popularidade descendente
-    df = df.sort_values('popularity', ascending=False).reset_index(drop=True)
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+        colunas (list, opcional): Manifesto de colunas da página (todas se None)
     
+    Returns:
+        pd.DataFrame: Faixas únicas ordenadas por popularidade, indexadas pela posição canônica
+    """
+    registrar_falta_cache('carregar_faixas')
+    colunas = TODAS_AS_COLUNAS if colunas is None else list(colunas)
+    with _versao_em_uso(versao) as raiz:
+        diretorio = os.path.join(raiz, 'faixas')
+        _garantir_colunas(diretorio, colunas)
+        _bytes_mapeados.update(bytes_colunas(diretorio, colunas))
+        df = ler_colunas(diretorio, colunas, categoricas=COLUNAS_CODIFICADAS)
+    definir('spotify_dataset_bytes', {'tabela': 'faixas'}, sum(_bytes_mapeados.values()))
     return df
 
 @st.cache_data
-def obter_estatisticas_basicas():
+def relatorio_colunas(versao, colunas=None):
+    """
+    Lista as colunas carregadas para um manifesto e quantos bytes cada uma ocupa
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+        colunas (list, opcional): Manifesto de colunas da página (todas se None)
+    
+    Returns:
+        pd.DataFrame: Colunas com origem (base ou derivada) e bytes no armazém
+    """
+    colunas = TODAS_AS_COLUNAS if colunas is None else list(colunas)
+    with _versao_em_uso(versao) as raiz:
+        diretorio = os.path.join(raiz, 'faixas')
+        _garantir_colunas(diretorio, colunas)
+        lidas = bytes_colunas(diretorio, colunas)
+    
+    return pd.DataFrame([
+        {'coluna': coluna, 'origem': 'derivada' if coluna in COLUNAS_DERIVADAS else 'base', 'bytes': lidas[coluna]}
+        for coluna in colunas
+    ])
+
+def _carregar_ou_construir_indice(versao, nome, construir, cache=''):
+    """
+    Lê um índice do armazém da versão ou o constrói e grava, se ainda não existir
+
+    `cache` é o nome da falta em `registrar_falta_cache` e deve ser o mesmo do
+    `contar_cache` de quem chama (padrão: 'indice_<nome>'); None não conta a
+    falta (índice auxiliar carregado junto com outro já contado).
+
+    `construir` roda fora da trava da versão porque costuma chamar outros
+    carregadores, que tomam a trava por conta própria.
+    """
+    if cache is not None:
+        registrar_falta_cache(cache or f"indice_{nome}")
+    with _versao_em_uso(versao) as raiz:
+        indice = ler_indice(os.path.join(raiz, 'indices', nome))
+    if indice is None:
+        construido = construir()
+        with _versao_em_uso(versao) as raiz:
+            diretorio = os.path.join(raiz, 'indices', nome)
+            gravar_indice(diretorio, construido)
+            indice = ler_indice(diretorio)
+    definir('spotify_dataset_bytes', {'tabela': f"indice_{nome}"},
+            sum(getattr(valor, 'nbytes', 0) for valor in indice.values()))
+    return indice
+
+@contar_cache('indice_generos')
+@st.cache_resource
+def carregar_indice_generos(versao):
+    """
+    Retorna a matriz esparsa faixa × gênero sobre a tabela canônica
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: Índice no formato de `utils.indices.construir_pertinencia_generos`
+    """
+    def construir():
+        df = carregar_faixas(versao, ['track_id'])
+        pares = pd.read_csv(CAMINHO_DATASET, usecols=['track_id', 'track_genre'])
+        linhas = pd.Index(df['track_id']).get_indexer(pares['track_id'])
+        return construir_pertinencia_generos(linhas, pares['track_genre'], len(df))
+    
+    return _carregar_ou_construir_indice(versao, 'generos', construir)
+
+@contar_cache('indice_generos_principais')
+@st.cache_resource
+def carregar_indice_generos_principais(versao):
+    """
+    Retorna a matriz esparsa faixa × gênero principal (`GENEROS_PRINCIPAIS`)
+    
+    Uma faixa pertence a cada gênero principal de algum dos seus gêneros, como
+    no filtro por gênero principal; a coluna `genero_principal` da tabela
+    canônica só reflete o primeiro gênero de cada faixa.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: Índice no formato de `utils.indices.agrupar_generos`
+    """
+    def construir():
+        indice_generos = carregar_indice_generos(versao)
+        principais = pd.Series([classificar_genero_principal(genero) for genero in indice_generos['generos']],
+                               index=indice_generos['generos'], name='genero_principal')
+        return agrupar_generos(indice_generos, principais)
+    
+    return _carregar_ou_construir_indice(versao, 'generos_principais', construir)
+
+@contar_cache('indice_artistas')
+@st.cache_resource
+def carregar_indice_artistas(versao):
+    """
+    Retorna o índice de artistas construído sobre a tabela canônica de faixas
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: Índice no formato de `utils.indices.construir_ponte_artistas`
+    """
+    def construir():
+        df = carregar_faixas(versao, ['artists'])
+        return construir_ponte_artistas(df['artists'])
+    
+    return _carregar_ou_construir_indice(versao, 'artistas', construir)
+
+@contar_cache('indice_busca')
+@st.cache_resource
+def carregar_indice_busca(versao, entidade):
+    """
+    Retorna o índice de busca por nome (prefixo e trigramas) de artistas ou gêneros
+    
+    Os resultados são ordenados pela popularidade média. Para artistas, o
+    código de cada nome é o mesmo de `carregar_indice_artistas`; para gêneros,
+    é a posição em `estatisticas_generos()`.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+        entidade (str): 'artistas' ou 'generos'
+    
+    Returns:
+        dict: Índice no formato de `utils.busca.construir_indice_nomes`
+    """
+    def construir():
+        if entidade == 'artistas':
+            nomes = carregar_indice_artistas(versao)['nomes']
+            pesos = tabela_artistas(versao)['pop_media'].reindex(np.arange(len(nomes)), fill_value=0)
+            return construir_indice_nomes(nomes, pesos.to_numpy())
+        stats_generos = estatisticas_generos(versao)
+        return construir_indice_nomes(pd.Index(stats_generos['track_genre']), stats_generos['pop_media'].to_numpy())
+    
+    return _carregar_ou_construir_indice(versao, f"busca_{entidade}", construir, cache='indice_busca')
+
+@contar_cache('indice_textual')
+@st.cache_resource
+def carregar_indice_textual(versao):
+    """
+    Retorna o índice invertido de termos de nome da faixa, artistas e álbum
+    
+    As posições do índice são as linhas da tabela canônica de `carregar_faixas`.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: Índice no formato de `utils.busca.construir_indice_textual`
+    """
+    def construir():
+        df = carregar_faixas(versao, list(PESOS_CAMPOS) + ['popularity'])
+        return construir_indice_textual({campo: df[campo] for campo in PESOS_CAMPOS}, df['popularity'].to_numpy())
+    
+    return _carregar_ou_construir_indice(versao, 'textual', construir)
+
+@contar_cache('indice_semelhanca')
+@st.cache_resource
+def carregar_indice_semelhanca(versao):
+    """
+    Retorna a matriz padronizada de features de áudio e o índice de vizinhos sobre ela
+    
+    A matriz fica no armazém (memory-map). Até `LIMITE_BUSCA_EXATA` faixas, a
+    KD-tree exata é reconstruída uma vez por processo (poucas dezenas de
+    milissegundos); acima disso, o IVF aproximado é lido do armazém ou
+    construído e gravado uma vez por versão do dataset.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: Índice no formato de `utils.semelhanca.construir_matriz_caracteristicas`,
+            mais a chave 'arvore' (cKDTree) ou 'ivf' (`utils.semelhanca.construir_ivf`)
+    """
+    def construir():
+        return construir_matriz_caracteristicas(carregar_faixas(versao, CARACTERISTICAS_SEMELHANCA))
+    
+    indice = _carregar_ou_construir_indice(versao, 'semelhanca', construir)
+    if len(indice['matriz']) > LIMITE_BUSCA_EXATA:
+        indice['ivf'] = _carregar_ou_construir_indice(
+            versao, 'semelhanca_ivf', lambda: construir_ivf(indice['matriz']), cache=None
+        )
+    else:
+        indice['arvore'] = construir_arvore(indice['matriz'])
+    return indice
+
+@contar_cache('indice_artistas_semelhantes')
+@st.cache_resource
+def carregar_artistas_semelhantes(versao):
+    """
+    Retorna os artistas mais parecidos com cada artista, pelo perfil médio de features de áudio
+    
+    O perfil é a média das features padronizadas das faixas do artista; os
+    vizinhos são calculados uma vez por versão do dataset e gravados no armazém.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: Índice no formato de `utils.semelhanca.vizinhos_cosseno`, por código de artista
+    """
+    def construir():
+        matriz = carregar_indice_semelhanca(versao)['matriz']
+        return vizinhos_cosseno(perfis_artistas(matriz, carregar_indice_artistas(versao)))
+    
+    return _carregar_ou_construir_indice(versao, 'artistas_semelhantes', construir)
+
+@contar_cache('indice_colaboracoes')
+@st.cache_resource
+def carregar_grafo_colaboracoes(versao):
+    """
+    Retorna o grafo de colaborações entre artistas (faixas com mais de um artista creditado)
+    
+    Construído a partir da ponte faixa↔artista uma vez por versão do dataset,
+    com grau e PageRank, e gravado no armazém.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: Índice no formato de `utils.colaboracoes.construir_grafo_colaboracoes`, por código de artista
+    """
+    def construir():
+        return construir_grafo_colaboracoes(carregar_indice_artistas(versao))
+    
+    return _carregar_ou_construir_indice(versao, 'colaboracoes', construir)
+
+def _assinatura_csv(tamanho):
+    """
+    Identifica os primeiros `tamanho` bytes do CSV pelo sha1 do seu final
+    """
+    inicio = max(0, tamanho - BYTES_ASSINATURA)
+    with open(CAMINHO_DATASET, 'rb') as arquivo:
+        arquivo.seek(inicio)
+        return hashlib.sha1(arquivo.read(tamanho - inicio)).hexdigest()
+
+def _linhas_acrescentadas(estado, colunas):
+    """
+    Lê só as linhas acrescentadas ao CSV desde que o estado foi gravado
+    
+    Returns:
+        pd.DataFrame: Linhas novas, ou None se o arquivo não apenas cresceu
+            (foi reescrito, truncado ou a última linha lida não terminava em quebra de linha)
+    """
+    lidos = int(estado['bytes_lidos'][0])
+    if os.path.getsize(CAMINHO_DATASET) < lidos or _assinatura_csv(lidos) != str(estado['assinatura'][0]):
+        return None
+    with open(CAMINHO_DATASET, 'rb') as arquivo:
+        cabecalho = arquivo.readline()
+        arquivo.seek(lidos - 1)
+        if arquivo.read(1) != b'\n':
+            return None
+        return pd.read_csv(io.BytesIO(cabecalho + arquivo.read()), usecols=colunas)
+
+@contar_cache('indice_coocorrencia_generos')
+@st.cache_resource
+def carregar_coocorrencia_generos(versao):
+    """
+    Retorna a coocorrência gênero × gênero (faixas classificadas em mais de um gênero)
+    
+    O estado fica gravado fora das versões do armazém. Quando o CSV muda só
+    por linhas acrescentadas no final, apenas essas linhas são lidas e
+    aplicadas com `utils.coocorrencia.atualizar_coocorrencia`; qualquer outra
+    mudança reconstrói o estado do zero. A versão faz parte da chave do cache,
+    então o processo aplica as linhas acrescentadas assim que o CSV cresce.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: Estado no formato de `utils.coocorrencia.construir_coocorrencia`, com
+            'bytes_lidos' e 'assinatura' do trecho do CSV já contado
+    """
+    registrar_falta_cache('indice_coocorrencia_generos')
+    colunas = ['track_id', 'track_genre']
+    raiz = os.path.join(DIRETORIO_INCREMENTAL, 'coocorrencia_generos')
+    diretorio = os.path.join(raiz, versao)
+    estado = ler_indice(diretorio)
+    
+    if estado is None:
+        # Tamanho medido antes da leitura: linhas acrescentadas durante ela seriam
+        # aplicadas de novo na próxima atualização, o que não altera o resultado (pares são conjuntos)
+        tamanho = os.path.getsize(CAMINHO_DATASET)
+        with trava_versoes(raiz):
+            anteriores = [os.path.join(raiz, nome) for nome in os.listdir(raiz)
+                          if '.tmp-' not in nome and not nome.startswith('_')]
+            anterior = ler_indice(max(anteriores, key=os.path.getmtime)) if anteriores else None
+            novas = None if anterior is None else _linhas_acrescentadas(anterior, colunas)
+            
+            if novas is None:
+                pares = pd.read_csv(CAMINHO_DATASET, usecols=colunas)
+                estado = construir_coocorrencia(pares['track_id'], pares['track_genre'])
+            else:
+                estado = atualizar_coocorrencia(anterior, novas['track_id'], novas['track_genre'])
+            estado['bytes_lidos'] = np.array([tamanho], dtype=np.int64)
+            estado['assinatura'] = np.array([_assinatura_csv(tamanho)])
+            
+            gravar_indice(diretorio, estado)
+        remover_versoes_antigas(raiz, versao)
+        with trava_versoes(raiz):
+            estado = ler_indice(diretorio)
+    
+    definir('spotify_dataset_bytes', {'tabela': 'indice_coocorrencia_generos'},
+            sum(getattr(valor, 'nbytes', 0) for valor in estado.values()))
+    return estado
+
+@contar_cache('indice_distancias_generos')
+@st.cache_resource
+def carregar_distancias_generos(versao):
+    """
+    Retorna a matriz de distâncias entre gêneros e o agrupamento hierárquico deles
+    
+    Calculados a partir das features das faixas uma vez por versão do dataset
+    e gravados no armazém.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: Índice no formato de `utils.semelhanca.distancias_generos`
+    """
+    def construir():
+        return distancias_generos(carregar_indice_semelhanca(versao)['matriz'], carregar_indice_generos(versao))
+    
+    return _carregar_ou_construir_indice(versao, 'distancias_generos', construir)
+
+@contar_cache('indice_projecao')
+@st.cache_resource
+def carregar_projecao(versao):
+    """
+    Retorna a projeção 2D (PCA) de todas as faixas sobre as features de áudio padronizadas
+    
+    Calculada por SVD aleatória em passadas por blocos (escala para milhões de
+    faixas) uma vez por versão do dataset e gravada no armazém.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: Índice no formato de `utils.projecao.pca_aleatoria`, por posição canônica
+    """
+    def construir():
+        return pca_aleatoria(carregar_indice_semelhanca(versao)['matriz'])
+    
+    return _carregar_ou_construir_indice(versao, 'projecao', construir)
+
+@contar_cache('indice_segmentos')
+@st.cache_resource
+def carregar_momentos_segmentos(versao):
+    """
+    Retorna as estatísticas suficientes das features de áudio por célula de segmento
+    
+    Calculadas uma vez por versão do dataset e gravadas no armazém; qualquer
+    segmento (combinação de filtros) é a soma das suas células.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: Índice no formato de `utils.segmentos.construir_momentos`
+    """
+    def construir():
+        df = carregar_faixas(versao, list(DIMENSOES_SEGMENTO) + CARACTERISTICAS_SEGMENTO)
+        return construir_momentos(df, carregar_indice_generos(versao))
+    
+    return _carregar_ou_construir_indice(versao, 'segmentos', construir)
+
+def _intervalos_medias(versao, colunas, ptr, faixas):
+    """
+    Intervalos bootstrap das médias de `colunas` por grupo de um CSR grupo → posições canônicas
+    """
+    valores = carregar_faixas(versao, colunas)[colunas].to_numpy(dtype=np.float32)
+    inferior, superior = intervalos_bootstrap(ptr, valores[np.asarray(faixas)])
+    return {'caracteristicas': pd.Index(colunas), 'inferior': inferior, 'superior': superior}
+
+@contar_cache('indice_bootstrap_generos')
+@st.cache_resource
+def carregar_intervalos_generos(versao):
+    """
+    Retorna intervalos de confiança de 95% (bootstrap) das médias por gênero
+    
+    Cada faixa conta em todos os seus gêneros, como em `estatisticas_generos`.
+    Calculados uma vez por versão do dataset e gravados no armazém.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: 'caracteristicas' (pd.Index) e 'inferior'/'superior' (gêneros × características),
+            por código de gênero
+    """
+    def construir():
+        indice_generos = carregar_indice_generos(versao)
+        return _intervalos_medias(versao, COLUNAS_INTERVALOS_GENEROS, indice_generos['genero_ptr'], indice_generos['genero_faixas'])
+    
+    return _carregar_ou_construir_indice(versao, 'bootstrap_generos', construir)
+
+@contar_cache('indice_bootstrap_artistas')
+@st.cache_resource
+def carregar_intervalos_artistas(versao):
+    """
+    Retorna intervalos de confiança de 95% (bootstrap) das médias por artista
+    
+    Considera todos os artistas creditados, como em `tabela_artistas`; artistas
+    com uma única faixa ficam sem intervalo (NaN). Calculados uma vez por versão
+    do dataset e gravados no armazém.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: 'caracteristicas' (pd.Index) e 'inferior'/'superior' (artistas × características),
+            por código de artista
+    """
+    def construir():
+        indice_artistas = carregar_indice_artistas(versao)
+        return _intervalos_medias(versao, COLUNAS_INTERVALOS_ARTISTAS, indice_artistas['artista_ptr'], indice_artistas['artista_faixas'])
+    
+    return _carregar_ou_construir_indice(versao, 'bootstrap_artistas', construir)
+
+@contar_cache('clusters_faixas')
+@st.cache_data(max_entries=64)
+def clusters_faixas(versao, k, chave_filtros, _posicoes):
+    """
+    Agrupa faixas com k-means em mini-lotes sobre as features de áudio padronizadas
+    
+    O resultado fica em cache por (versão, k, filtros) e é compartilhado entre
+    sessões; `_posicoes` não entra na chave (é determinado pela versão do
+    dataset e pelos filtros).
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+        k (int): Número de clusters
+        chave_filtros (tuple): Valores dos filtros que produziram `_posicoes`
+        _posicoes (np.ndarray): Posições canônicas das faixas a agrupar (índice de `carregar_faixas`)
+    
+    Returns:
+        dict: Com as chaves:
+            - 'rotulos' (np.ndarray): cluster de cada faixa (1 = maior cluster), na ordem de `_posicoes`
+            - 'centroides' (pd.DataFrame): centroides nas unidades originais, um por cluster
+            - 'tamanhos' (np.ndarray): faixas por cluster
+    """
+    registrar_falta_cache('clusters_faixas')
+    indice = carregar_indice_semelhanca(versao)
+    matriz = indice['matriz'][_posicoes]
+    centroides = kmeans_minibatch(matriz, k)
+    rotulos, _ = atribuir_clusters(matriz, centroides)
+    
+    # Numera os clusters do maior para o menor, para a numeração não mudar a cada ajuste
+    tamanhos = np.bincount(rotulos, minlength=len(centroides))
+    ordem = np.argsort(-tamanhos, kind='stable')
+    novos = np.empty_like(ordem)
+    novos[ordem] = np.arange(1, len(ordem) + 1)
+    rotulos = novos[rotulos]
+    
+    originais = centroides[ordem] * indice['desvios'] + indice['medias']
+    return {
+        'rotulos': rotulos.astype(np.int16),
+        'centroides': pd.DataFrame(
+            originais, columns=CARACTERISTICAS_SEMELHANCA, index=pd.RangeIndex(1, len(ordem) + 1, name='cluster')
+        ),
+        'tamanhos': tamanhos[ordem]
+    }
+
+@compartilhado('estatisticas_basicas', servir_anterior=True)
+def obter_estatisticas_basicas(versao):
     """
     Retorna estatísticas básicas do dataset
     
+    Totais globais contam faixas únicas; contagens por gênero passam pela
+    matriz de pertinência faixa × gênero.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
     Returns:
         dict: Dicionário com estatísticas básicas
     """
-    df = carregar_dados()
+    df = carregar_faixas(
+        versao, ['primeiro_artista', 'album_name', 'duration_min', 'popularity', 'track_name', 'explicit']
+    )
+    contagem_generos = contagem_por_genero(carregar_indice_generos(versao))
     
     stats = {
         'total_tracks': len(df),
-        'total_artists': df['primeiro_artista'].nunique(),
-        'total_albums': df['album_name'].nunique(),
-        'total_genres': df['track_genre'].nunique(),
+        'total_artists': num_unicos(df['primeiro_artista']),
+        'total_albums': num_unicos(df['album_name']),
+        'total_genres': len(contagem_generos),
         'duracao_media_min': round(df['duration_min'].mean(), 2),
         'popularidade_media': round(df['popularity'].mean(), 1),
         'track_mais_popular': df.loc[df['popularity'].idxmax(), 'track_name'],
         'artista_track_mais_popular': df.loc[df['popularity'].idxmax(), 'primeiro_artista'],
-        'genero_mais_comum': df['track_genre'].value_counts().index[0],
+        'genero_mais_comum': contagem_generos.index[0],
+        'tracks_genero_mais_comum': contagem_generos.iloc[0],
         'tracks_explicitas': df['explicit'].sum(),
         'percentual_explicitas': round((df['explicit'].sum() / len(df)) * 100, 1)
     }
     
-    return stats
\ No newline at end of file
+    return stats
+
+@compartilhado('relatorio_deduplicacao', servir_anterior=True)
+def relatorio_deduplicacao(versao):
+    """
+    Compara o tamanho em memória do dataset original com a tabela canônica
+    
+    Considera apenas as colunas do CSV, que são as que o formato original repete.
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        dict: Pares faixa × gênero, faixas únicas e bytes antes/depois da deduplicação
+    """
+    df = carregar_faixas(versao, COLUNAS_BASE)
+    indice = carregar_indice_generos(versao)
+    
+    pares_faixa_genero = int(indice['faixa_ptr'][-1])
+    bytes_canonicos = int(df.memory_usage(deep=True).sum())
+    bytes_pertinencia = sum(v.nbytes for v in indice.values() if hasattr(v, 'nbytes'))
+    
+    # Estima o original replicando cada faixa pelo número de gêneros em que aparece
+    repeticoes = np.diff(indice['faixa_ptr'])
+    bytes_por_faixa = df.memory_usage(deep=True, index=False).sum() / max(len(df), 1)
+    bytes_originais = int(bytes_por_faixa * repeticoes.sum())
+    
+    return {
+        'pares_faixa_genero': pares_faixa_genero,
+        'faixas_unicas': len(df),
+        'linhas_duplicadas': pares_faixa_genero - len(df),
+        'bytes_originais': bytes_originais,
+        'bytes_canonicos': bytes_canonicos + bytes_pertinencia,
+        'bytes_economizados': bytes_originais - (bytes_canonicos + bytes_pertinencia)
+    }
+
+@compartilhado('tabela_artistas')
+def tabela_artistas(versao):
+    """
+    Estatísticas por artista, considerando todos os artistas creditados (incluindo feats)
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        pd.DataFrame: Uma linha por artista, indexada pelo código do artista
+    """
+    df = carregar_faixas(
+        versao, ['track_id', 'popularity', 'danceability', 'energy', 'valence', 'acousticness', 'duration_min']
+    )
+    indice_artistas = carregar_indice_artistas(versao)
+    
+    df_ponte = expandir_por_artista(df, indice_artistas, list(df.columns))
+    df_artistas = agrupar(df_ponte, 'artista_cod', {
+        'track_id': 'count',  # número de faixas
+        'popularity': ['mean', 'max'],
+        'danceability': 'mean',
+        'energy': 'mean',
+        'valence': 'mean',
+        'acousticness': 'mean',
+        'duration_min': 'mean'
+    }, num_grupos=len(indice_artistas['nomes'])).round(3)
+    
+    df_artistas.columns = ['num_faixas', 'pop_media', 'pop_maxima', 'danceability_media', 
+                        'energy_media', 'valence_media', 'acousticness_media', 
+                        'duracao_media']
+    
+    # Gênero mais comum considerando todos os gêneros de cada faixa
+    df_artistas['genero_principal'] = genero_mais_comum_por_artista(
+        indice_artistas, carregar_indice_generos(versao)
+    )[df_artistas.index]
+    
+    # O índice da tabela é o código do artista, permitindo lookup direto com .loc
+    df_artistas.insert(0, 'artista', indice_artistas['nomes'][df_artistas.index])
+    return df_artistas
+
+@compartilhado('estatisticas_generos')
+def estatisticas_generos(versao):
+    """
+    Estatísticas por gênero (cada faixa conta em todos os seus gêneros)
+    
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+    
+    Returns:
+        pd.DataFrame: Uma linha por gênero, com a coluna `track_genre`
+    """
+    colunas = ['track_id', 'popularity', 'danceability', 'energy', 'valence', 'acousticness', 'instrumentalness',
+               'liveness', 'speechiness', 'tempo', 'duration_min', 'loudness']
+    df_generos = expandir_por_genero(carregar_faixas(versao, colunas), carregar_indice_generos(versao), colunas)
+    
+    stats_generos = agrupar(df_generos, 'track_genre', {
+        'track_id': 'count',  # número de faixas
+        'popularity': ['mean', 'std', 'max'],
+        'danceability': 'mean',
+        'energy': 'mean',
+        'valence': 'mean',
+        'acousticness': 'mean',
+        'instrumentalness': 'mean',
+        'liveness': 'mean',
+        'speechiness': 'mean',
+        'tempo': 'mean',
+        'duration_min': 'mean',
+        'loudness': 'mean'
+    }).round(3)
+    
+    stats_generos.columns = ['num_faixas', 'pop_media', 'pop_std', 'pop_maxima', 'danceability', 'energy', 
+                            'valence', 'acousticness', 'instrumentalness', 'liveness', 'speechiness', 
+                            'tempo', 'duration_min', 'loudness']
+    
+    return stats_generos.reset_index()
@@ -0,0 +1,104 @@
+import numpy as np
+
+# Elementos da matriz de distâncias bloco × k calculados de cada vez (16M float32 = 64 MB)
+ELEMENTOS_BLOCO = 1 << 24
+
+
+def atribuir_clusters(matriz, centroides, tamanho_bloco=None):
+    """
+    Centroide mais próximo de cada linha, calculado em blocos
+
+    Usa ||x - c||² = ||x||² - 2·x·c + ||c||², de modo que o trabalho pesado
+    é uma multiplicação de matrizes por bloco.
+
+    Args:
+        matriz (np.ndarray): Linhas × dimensões (float32)
+        centroides (np.ndarray): k × dimensões
+        tamanho_bloco (int, opcional): Linhas processadas de cada vez (padrão: `ELEMENTOS_BLOCO` / k)
+
+    Returns:
+        tuple: (rótulos int32, distâncias quadradas float32) por linha
+    """
+    centroides = np.asarray(centroides, dtype=np.float32)
+    if tamanho_bloco is None:
+        tamanho_bloco = max(1024, ELEMENTOS_BLOCO // len(centroides))
+    normas_centroides = (centroides ** 2).sum(axis=1)
+    transpostos = np.ascontiguousarray(-2 * centroides.T)
+    rotulos = np.empty(len(matriz), dtype=np.int32)
+    distancias = np.empty(len(matriz), dtype=np.float32)
+    for inicio in range(0, len(matriz), tamanho_bloco):
+        bloco = np.asarray(matriz[inicio:inicio + tamanho_bloco], dtype=np.float32)
+        # Soma no lugar: uma única matriz bloco × k temporária
+        parciais = bloco @ transpostos
+        parciais += normas_centroides
+        melhores = parciais.argmin(axis=1)
+        rotulos[inicio:inicio + len(bloco)] = melhores
+        minimas = parciais[np.arange(len(bloco)), melhores] + (bloco ** 2).sum(axis=1)
+        distancias[inicio:inicio + len(bloco)] = np.maximum(minimas, 0)
+    return rotulos, distancias
+
+def _inicializar(amostra, k, gerador):
+    """
+    Sementes do k-means++ sobre uma amostra (distâncias atualizadas de forma incremental)
+    """
+    centroides = np.empty((k, amostra.shape[1]), dtype=np.float32)
+    centroides[0] = amostra[gerador.integers(len(amostra))]
+    minimas = ((amostra - centroides[0]) ** 2).sum(axis=1)
+    for i in range(1, k):
+        total = minimas.sum()
+        escolhido = gerador.choice(len(amostra), p=minimas / total) if total > 0 else gerador.integers(len(amostra))
+        centroides[i] = amostra[escolhido]
+        np.minimum(minimas, ((amostra - centroides[i]) ** 2).sum(axis=1), out=minimas)
+    return centroides
+
+def kmeans_minibatch(matriz, k, tamanho_lote=4096, iteracoes=100, tolerancia=1e-4, semente=0):
+    """
+    K-means em mini-lotes (Sculley, 2010), vetorizado por lote
+
+    A cada iteração um lote aleatório é atribuído aos centroides, e cada
+    centroide anda em direção à média dos seus pontos no lote com passo
+    igual à fração dos pontos que já recebeu. O custo por iteração depende
+    do lote, não do número de linhas, então escala para dezenas de milhões.
+
+    Args:
+        matriz (np.ndarray): Linhas × dimensões (ex.: features padronizadas)
+        k (int): Número de clusters
+        tamanho_lote (int): Linhas por lote (aumentado para pelo menos 4 por cluster)
+        iteracoes (int): Máximo de lotes
+        tolerancia (float): Para quando o deslocamento médio dos centroides fica abaixo dela
+        semente (int): Semente do gerador, para resultados reprodutíveis
+
+    Returns:
+        np.ndarray: Centroides k × dimensões (float32)
+    """
+    gerador = np.random.default_rng(semente)
+    total = len(matriz)
+    k = min(k, total)
+    tamanho_lote = min(max(tamanho_lote, 4 * k), total)
+
+    amostra = np.asarray(matriz[np.sort(gerador.choice(total, min(total, max(10 * k, 10000)), replace=False))],
+                         dtype=np.float32)
+    centroides = _inicializar(amostra, k, gerador)
+    contagens = np.zeros(k, dtype=np.float64)
+
+    for _ in range(iteracoes):
+        # Sorteio com reposição: O(lote), sem permutar todas as linhas a cada iteração
+        lote = np.asarray(matriz[np.sort(gerador.integers(0, total, tamanho_lote))], dtype=np.float32)
+        rotulos, _ = atribuir_clusters(lote, centroides)
+        contagens_lote = np.bincount(rotulos, minlength=k)
+        # Soma por cluster de todas as dimensões em um único bincount (bem mais rápido que np.add.at)
+        dimensoes = lote.shape[1]
+        somas = np.bincount(
+            (rotulos[:, None] * dimensoes + np.arange(dimensoes)).ravel(), weights=lote.ravel(), minlength=k * dimensoes
+        ).reshape(k, dimensoes)
+
+        presentes = contagens_lote > 0
+        contagens += contagens_lote
+        passo = (contagens_lote[presentes] / contagens[presentes])[:, None]
+        medias = somas[presentes] / contagens_lote[presentes, None]
+        anteriores = centroides[presentes].copy()
+        centroides[presentes] = (1 - passo) * anteriores + passo * medias
+        if np.abs(centroides[presentes] - anteriores).mean() < tolerancia:
+            break
+
+    return centroides
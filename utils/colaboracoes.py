@@ -0,0 +1,124 @@
+import numpy as np
+import scipy.sparse as sp
+
+# Fator de amortecimento do PageRank (probabilidade de seguir uma colaboração)
+AMORTECIMENTO = 0.85
+
+
+def construir_grafo_colaboracoes(indice_artistas):
+    """
+    Constrói o grafo de colaborações entre artistas em formato CSR
+
+    Dois artistas colaboram quando aparecem juntos nos créditos de uma faixa;
+    o peso da aresta é o número de faixas em comum. O grafo sai de uma única
+    multiplicação esparsa Bᵀ·B sobre a matriz faixa × artista, usando só as
+    faixas com mais de um artista.
+
+    Args:
+        indice_artistas (dict): Índice de artistas (`utils.indices.construir_ponte_artistas`)
+
+    Returns:
+        dict: Índice com as chaves:
+            - 'ptr', 'vizinhos', 'pesos' (np.ndarray): CSR artista → colaboradores (simétrico)
+            - 'grau' (np.ndarray): número de colaboradores distintos por artista
+            - 'grau_ponderado' (np.ndarray): total de faixas em colaboração por artista
+            - 'pagerank' (np.ndarray): centralidade de cada artista (soma 1)
+    """
+    num_artistas = len(indice_artistas['nomes'])
+    faixa_ptr = np.asarray(indice_artistas['faixa_ptr'])
+    faixa_artistas = np.asarray(indice_artistas['faixa_artistas'])
+
+    # Só faixas com colaboração geram arestas
+    por_faixa = np.diff(faixa_ptr)
+    colaborativas = por_faixa > 1
+    linhas = np.repeat(np.arange(colaborativas.sum()), por_faixa[colaborativas])
+    incidencia = sp.csr_matrix(
+        (np.ones(len(linhas), dtype=np.float32), (linhas, faixa_artistas[np.repeat(colaborativas, por_faixa)])),
+        shape=(colaborativas.sum(), num_artistas)
+    )
+    # Um artista creditado duas vezes na mesma faixa conta uma vez
+    incidencia.data[:] = 1
+
+    adjacencia = (incidencia.T @ incidencia).tocsr()
+    adjacencia.setdiag(0)
+    adjacencia.eliminate_zeros()
+    adjacencia.sort_indices()
+
+    pesos = adjacencia.data.astype(np.float32)
+    return {
+        'ptr': adjacencia.indptr.astype(np.int64),
+        'vizinhos': adjacencia.indices.astype(np.int32),
+        'pesos': pesos,
+        'grau': np.diff(adjacencia.indptr).astype(np.int32),
+        'grau_ponderado': np.asarray(adjacencia.sum(axis=1)).ravel().astype(np.float32),
+        'pagerank': pagerank(adjacencia),
+    }
+
+def pagerank(adjacencia, amortecimento=AMORTECIMENTO, tolerancia=1e-10, iteracoes=100):
+    """
+    PageRank ponderado por iterações de potência com multiplicações esparsas
+
+    Artistas sem colaborações (a maioria) distribuem sua massa uniformemente,
+    de modo que o vetor continua somando 1.
+
+    Args:
+        adjacencia (sp.csr_matrix): Matriz de pesos artista × artista
+        amortecimento (float): Probabilidade de seguir uma aresta
+        tolerancia (float): Para quando a variação (norma L1) fica abaixo dela
+        iteracoes (int): Máximo de iterações
+
+    Returns:
+        np.ndarray: Centralidade de cada artista (float64, soma 1)
+    """
+    total = adjacencia.shape[0]
+    saida = np.asarray(adjacencia.sum(axis=1)).ravel()
+    sem_saida = saida == 0
+    # Transposta da matriz de transição (linhas normalizadas): r ← d·Pᵀr + teleporte
+    transicao_t = (sp.diags(np.divide(1.0, saida, out=np.zeros(total), where=~sem_saida)) @ adjacencia).T.tocsr()
+
+    ranks = np.full(total, 1.0 / total)
+    for _ in range(iteracoes):
+        teleporte = (amortecimento * ranks[sem_saida].sum() + 1 - amortecimento) / total
+        novos = amortecimento * (transicao_t @ ranks) + teleporte
+        variacao = np.abs(novos - ranks).sum()
+        ranks = novos
+        if variacao < tolerancia:
+            break
+    return ranks
+
+def colaboradores(grafo, codigo):
+    """
+    Retorna (códigos, pesos) dos colaboradores de um artista, do maior peso para o menor
+    """
+    inicio, fim = grafo['ptr'][codigo], grafo['ptr'][codigo + 1]
+    vizinhos, pesos = np.asarray(grafo['vizinhos'][inicio:fim]), np.asarray(grafo['pesos'][inicio:fim])
+    ordem = np.lexsort((vizinhos, -pesos))
+    return vizinhos[ordem], pesos[ordem]
+
+def rede_ego(grafo, codigo, limite=25):
+    """
+    Rede ego de um artista: ele, os colaboradores mais frequentes e as arestas entre eles
+
+    Args:
+        grafo (dict): Grafo de `construir_grafo_colaboracoes`
+        codigo (int): Código do artista central
+        limite (int): Máximo de colaboradores incluídos
+
+    Returns:
+        tuple: (nós, origens, destinos, pesos) — nós[0] é o artista central;
+            as arestas usam posições em `nós`, cada uma aparece uma vez
+    """
+    vizinhos, _ = colaboradores(grafo, codigo)
+    nos = np.r_[codigo, vizinhos[:limite]].astype(np.int64)
+
+    # Arestas do subgrafo induzido: vizinhos de cada nó que também estão na rede
+    ptr = grafo['ptr']
+    quantos = ptr[nos + 1] - ptr[nos]
+    origens = np.repeat(np.arange(len(nos)), quantos)
+    alvos = np.concatenate([np.asarray(grafo['vizinhos'][ptr[no]:ptr[no + 1]]) for no in nos])
+    pesos = np.concatenate([np.asarray(grafo['pesos'][ptr[no]:ptr[no + 1]]) for no in nos])
+
+    posicao_no = {no: posicao for posicao, no in enumerate(nos.tolist())}
+    destinos = np.array([posicao_no.get(alvo, -1) for alvo in alvos.tolist()], dtype=np.int64)
+    mantidas = (destinos >= 0) & (origens < destinos)
+    return nos, origens[mantidas], destinos[mantidas], pesos[mantidas]
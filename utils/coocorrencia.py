@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+def _matriz_pertinencia(faixas, generos, num_faixas, num_generos):
+    """
+    Matriz esparsa faixa × gênero (0/1) a partir de pares já sem repetição
+    """
+    return sp.csr_matrix(
+        (np.ones(len(faixas), dtype=np.int64), (faixas, generos)), shape=(num_faixas, num_generos)
+    )
+
+def _contar(faixas, generos, num_generos):
+    """
+    Coocorrências gênero × gênero (diagonal = faixas do gênero) de pares (faixa, gênero) sem repetição
+    """
+    locais, faixas = np.unique(faixas, return_inverse=True)
+    pertinencia = _matriz_pertinencia(faixas, generos, len(locais), num_generos)
+    return (pertinencia.T @ pertinencia).tocsr()
+
+def _pares_unicos(hashes, codigos):
+    """
+    Pares (faixa, gênero) sem repetição, ordenados por faixa e depois por gênero
+    """
+    ordem = np.lexsort((codigos, hashes))
+    hashes, codigos = hashes[ordem], codigos[ordem]
+    novos = np.r_[True, (hashes[1:] != hashes[:-1]) | (codigos[1:] != codigos[:-1])]
+    return hashes[novos], codigos[novos]
+
+def _estado(generos, hashes, codigos, contagens):
+    contagens = contagens.tocsr()
+    contagens.eliminate_zeros()
+    contagens.sort_indices()
+    return {
+        'generos': pd.Index(generos, name='track_genre'),
+        'hashes': hashes,
+        'pares_generos': codigos.astype(np.int32),
+        'ptr': contagens.indptr.astype(np.int64),
+        'indices': contagens.indices.astype(np.int32),
+        'contagens': contagens.data.astype(np.int64),
+    }
+
+def hashes_faixas(track_ids):
+    """
+    Identificador inteiro de 64 bits de cada `track_id` (estável entre processos e execuções)
+    """
+    return pd.util.hash_pandas_object(pd.Series(track_ids, dtype=object), index=False).to_numpy()
+
+def construir_coocorrencia(track_ids, generos):
+    """
+    Constrói a matriz esparsa de coocorrência gênero × gênero
+
+    Duas classificações coocorrem quando o mesmo `track_id` aparece nos dois
+    gêneros. A contagem sai de uma única multiplicação esparsa Bᵀ·B sobre a
+    matriz faixa × gênero; a diagonal guarda o número de faixas de cada gênero.
+    Os pares (faixa, gênero) ficam no estado para permitir `atualizar_coocorrencia`.
+
+    Args:
+        track_ids (pd.Series): `track_id` de cada linha do dataset
+        generos (pd.Series): `track_genre` de cada linha do dataset
+
+    Returns:
+        dict: Estado com as chaves:
+            - 'generos' (pd.Index): dicionário código → gênero
+            - 'hashes', 'pares_generos' (np.ndarray): pares (faixa, gênero) ordenados, sem repetição
+            - 'ptr', 'indices', 'contagens' (np.ndarray): CSR gênero × gênero das coocorrências
+    """
+    codigos, nomes = pd.factorize(pd.Series(generos), sort=True)
+    hashes, codigos = _pares_unicos(hashes_faixas(track_ids), codigos)
+    return _estado(nomes, hashes, codigos, _contar(hashes, codigos, len(nomes)))
+
+def matriz_coocorrencia(estado):
+    """
+    Retorna a matriz de coocorrência do estado como `sp.csr_matrix`
+    """
+    num_generos = len(estado['generos'])
+    return sp.csr_matrix(
+        (np.asarray(estado['contagens']), np.asarray(estado['indices']), np.asarray(estado['ptr'])),
+        shape=(num_generos, num_generos)
+    )
+
+def atualizar_coocorrencia(estado, track_ids, generos):
+    """
+    Acrescenta linhas novas do dataset a um estado de `construir_coocorrencia`
+
+    Só as faixas que aparecem nas linhas novas são recontadas: a contribuição
+    antiga delas (Bᵀ·B restrita a essas faixas) é subtraída e a nova, com os
+    gêneros antigos mais os novos, é somada. Gêneros inéditos recebem os
+    próximos códigos, sem mudar os existentes.
+
+    Args:
+        estado (dict): Estado atual
+        track_ids (pd.Series): `track_id` das linhas novas
+        generos (pd.Series): `track_genre` das linhas novas
+
+    Returns:
+        dict: Novo estado, igual ao que `construir_coocorrencia` daria para todas as linhas
+            (exceto pela ordem dos códigos de gênero)
+    """
+    nomes = estado['generos']
+    generos = pd.Series(generos, dtype=object)
+    ineditos = pd.Index(generos.unique()).difference(nomes)
+    nomes = nomes.append(ineditos)
+    num_generos = len(nomes)
+    hashes_novos, codigos_novos = _pares_unicos(hashes_faixas(track_ids), nomes.get_indexer(generos))
+
+    # Pares antigos das faixas afetadas (intervalos dos hashes na lista ordenada)
+    hashes_antigos = np.asarray(estado['hashes'])
+    codigos_antigos = np.asarray(estado['pares_generos'])
+    afetadas = np.unique(hashes_novos)
+    inicios = np.searchsorted(hashes_antigos, afetadas, side='left')
+    fins = np.searchsorted(hashes_antigos, afetadas, side='right')
+    quantos = fins - inicios
+    posicoes = np.repeat(inicios, quantos) + np.arange(quantos.sum()) - np.repeat(np.cumsum(quantos) - quantos, quantos)
+    hashes_afetados, codigos_afetados = hashes_antigos[posicoes], codigos_antigos[posicoes]
+
+    # Pares realmente novos: os que a faixa ainda não tinha
+    todos_hashes, todos_codigos = _pares_unicos(
+        np.r_[hashes_afetados, hashes_novos], np.r_[codigos_afetados, codigos_novos]
+    )
+
+    contagens = matriz_coocorrencia(estado)
+    contagens.resize((num_generos, num_generos))
+    contagens = (
+        contagens
+        - _contar(hashes_afetados, codigos_afetados, num_generos)
+        + _contar(todos_hashes, todos_codigos, num_generos)
+    )
+
+    # Lista completa de pares: remove os antigos das afetadas e insere os delas já unidos
+    mantidos = np.ones(len(hashes_antigos), dtype=bool)
+    mantidos[posicoes] = False
+    hashes, codigos = _pares_unicos(
+        np.r_[hashes_antigos[mantidos], todos_hashes], np.r_[codigos_antigos[mantidos], todos_codigos]
+    )
+    return _estado(nomes, hashes, codigos, contagens)
+
+def jaccard_generos(estado):
+    """
+    Sobreposição de Jaccard entre gêneros: |A ∩ B| / |A ∪ B| em número de faixas
+
+    Calculada só nas entradas não nulas da coocorrência (pares que
+    compartilham ao menos uma faixa), sem a diagonal.
+
+    Args:
+        estado (dict): Estado de `construir_coocorrencia`
+
+    Returns:
+        sp.csr_matrix: Matriz gênero × gênero simétrica (float64)
+    """
+    contagens = matriz_coocorrencia(estado)
+    tamanhos = contagens.diagonal()
+    contagens = contagens.tocoo()
+    fora_diagonal = contagens.row != contagens.col
+    linhas, colunas = contagens.row[fora_diagonal], contagens.col[fora_diagonal]
+    intersecoes = contagens.data[fora_diagonal].astype(np.float64)
+    valores = intersecoes / (tamanhos[linhas] + tamanhos[colunas] - intersecoes)
+    return sp.csr_matrix((valores, (linhas, colunas)), shape=contagens.shape)
+
+def faixas_em_varios_generos(estado):
+    """
+    Número de faixas classificadas em mais de um gênero
+    """
+    hashes = np.asarray(estado['hashes'])
+    inicios = np.flatnonzero(np.r_[True, hashes[1:] != hashes[:-1]])
+    return int((np.diff(np.r_[inicios, len(hashes)]) > 1).sum())
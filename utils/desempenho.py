@@ -0,0 +1,205 @@
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.memoria_sessao import iniciar_execucao
+from utils.metricas import adicionar_coletor, iniciar_exportacao, observar, registrar
+
+# Instrumentação ligada com SPOTIFY_DESEMPENHO=1; desligada, `medir` não faz nada
+ATIVO = os.environ.get('SPOTIFY_DESEMPENHO', '0') not in ('', '0')
+CAMINHO_TRACE = os.environ.get('SPOTIFY_TRACE', './desempenho.jsonl')
+DIRETORIO_PERFIS = os.environ.get('SPOTIFY_PERFIS', './perfis')
+
+# Chave do toggle "perfilar a próxima interação" no session_state
+CHAVE_PERFILAR = 'desempenho_perfilar'
+_CHAVE_IGNORAR = 'desempenho_ignorar_execucao'
+
+# Cada execução de página roda em uma thread própria do Streamlit
+_estado = threading.local()
+_trava_trace = threading.Lock()
+_NULO = contextlib.nullcontext()
+
+# Sessões com alguma execução nos últimos JANELA_SESSOES segundos contam como ativas
+JANELA_SESSOES = 300
+_sessoes = {}
+_trava_sessoes = threading.Lock()
+
+registrar('spotify_execucao_pagina_segundos', 'histogram', "Duração de cada execução (rerun) das páginas")
+registrar('spotify_sessoes_ativas', 'gauge', f"Sessões com execução nos últimos {JANELA_SESSOES} s neste processo")
+
+
+def iniciar_medicao(pagina):
+    """
+    Começa a medição de uma nova execução (rerun) da página
+
+    Se o toggle de perfil estiver ligado, o restante desta execução roda sob
+    o cProfile e o toggle é desligado (uma captura por pedido).
+
+    Args:
+        pagina (str): Nome da página, gravado junto com cada trecho
+    """
+    _estado.perfil = None
+    _estado.pagina = pagina
+    _estado.inicio = time.perf_counter()
+    _registrar_sessao()
+    iniciar_execucao(pagina)
+    if not ATIVO:
+        return
+    _estado.execucao = uuid.uuid4().hex[:12]
+    _estado.trechos = []
+
+    if st.session_state.pop(_CHAVE_IGNORAR, False):
+        # Execução causada pelo próprio toggle: perfila a próxima
+        return
+    if st.session_state.get(CHAVE_PERFILAR):
+        st.session_state[CHAVE_PERFILAR] = False
+        _iniciar_perfil()
+
+def encerrar_execucao():
+    """
+    Registra a duração da execução atual no histograma de métricas (uma vez por execução)
+    """
+    inicio = getattr(_estado, 'inicio', None)
+    if inicio is None:
+        return
+    observar('spotify_execucao_pagina_segundos', {'pagina': _estado.pagina}, time.perf_counter() - inicio)
+    _estado.inicio = None
+
+def _registrar_sessao():
+    """
+    Marca a sessão atual como ativa e inicia a exportação de métricas do processo
+    """
+    iniciar_exportacao()
+    contexto = get_script_run_ctx()
+    if contexto is None:
+        return
+    with _trava_sessoes:
+        _sessoes[contexto.session_id] = time.monotonic()
+
+def _coletar_sessoes():
+    limite = time.monotonic() - JANELA_SESSOES
+    with _trava_sessoes:
+        for sessao in [sessao for sessao, visto in _sessoes.items() if visto < limite]:
+            del _sessoes[sessao]
+        return [('spotify_sessoes_ativas', None, len(_sessoes))]
+
+adicionar_coletor(_coletar_sessoes)
+
+def armar_perfil():
+    """
+    Callback do toggle de perfil: a execução que ele dispara não é perfilada, só a seguinte
+    """
+    st.session_state[_CHAVE_IGNORAR] = True
+
+def _iniciar_perfil():
+    """
+    Liga o profiler determinístico (cProfile) para o restante da execução
+    """
+    perfil = cProfile.Profile()
+    try:
+        perfil.enable()
+    except ValueError:
+        # Outro profiler já está ativo no processo (ex.: depurador)
+        return
+    _estado.perfil = perfil
+
+def encerrar_perfil(limite=30):
+    """
+    Desliga o profiler da execução atual, grava o perfil bruto e resume as funções mais caras
+
+    O arquivo `.prof` (formato pstats) pode ser aberto com `snakeviz`,
+    `python -m pstats` ou outros visualizadores.
+
+    Args:
+        limite (int): Número de funções no resumo
+
+    Returns:
+        tuple: (caminho do arquivo, lista de dicts ordenada por tempo acumulado) ou None se
+            a execução não foi perfilada
+    """
+    perfil = getattr(_estado, 'perfil', None)
+    if perfil is None:
+        return None
+    perfil.disable()
+    _estado.perfil = None
+
+    os.makedirs(DIRETORIO_PERFIS, exist_ok=True)
+    nome = f"{time.strftime('%Y%m%d-%H%M%S')}-{_estado.pagina}-{_estado.execucao}.prof".replace(' ', '_')
+    caminho = os.path.join(DIRETORIO_PERFIS, nome)
+    perfil.dump_stats(caminho)
+
+    funcoes = []
+    for (arquivo, linha, funcao), (_, chamadas, proprio, acumulado, _) in pstats.Stats(perfil).stats.items():
+        funcoes.append({
+            'funcao': funcao,
+            'local': f"{os.path.basename(arquivo)}:{linha}" if linha else arquivo,
+            'chamadas': chamadas,
+            'proprio_ms': round(proprio * 1000, 3),
+            'acumulado_ms': round(acumulado * 1000, 3)
+        })
+    funcoes.sort(key=lambda item: item['acumulado_ms'], reverse=True)
+    return caminho, funcoes[:limite]
+
+@contextlib.contextmanager
+def _medir(nome, categoria):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        fim = time.perf_counter()
+        trechos = getattr(_estado, 'trechos', None)
+        if trechos is not None:
+            trechos.append({
+                'nome': nome,
+                'categoria': categoria,
+                'inicio_ms': round((inicio - _estado.inicio) * 1000, 3),
+                'duracao_ms': round((fim - inicio) * 1000, 3)
+            })
+
+def medir(nome, categoria='secao'):
+    """
+    Mede o tempo de um trecho da página (use com `with`)
+
+    Args:
+        nome (str): Descrição do trecho (ex.: 'filtros', 'tabela de artistas')
+        categoria (str): 'dados', 'filtro', 'agregacao', 'grafico' ou 'secao'
+    """
+    if not ATIVO:
+        return _NULO
+    return _medir(nome, categoria)
+
+def trechos_atuais():
+    """
+    Retorna os trechos medidos na execução atual e o tempo total decorrido (ms)
+    """
+    if not ATIVO or not hasattr(_estado, 'trechos'):
+        return [], 0.0
+    return list(_estado.trechos), (time.perf_counter() - _estado.inicio) * 1000
+
+def gravar_trace():
+    """
+    Acrescenta os trechos da execução atual ao arquivo JSONL de trace
+    """
+    trechos, total_ms = trechos_atuais()
+    if not trechos:
+        return
+
+    momento = time.strftime('%Y-%m-%dT%H:%M:%S')
+    linhas = [
+        json.dumps({
+            'momento': momento, 'pid': os.getpid(), 'pagina': _estado.pagina, 'execucao': _estado.execucao,
+            'total_ms': round(total_ms, 3), **trecho
+        }, ensure_ascii=False)
+        for trecho in trechos
+    ]
+    with _trava_trace, open(CAMINHO_TRACE, 'a', encoding='utf-8') as arquivo:
+        arquivo.write('\n'.join(linhas) + '\n')
+    # Evita gravar a mesma execução duas vezes
+    _estado.trechos = []
@@ -0,0 +1,298 @@
+import numpy as np
+import pandas as pd
+
+
+def construir_ponte_artistas(artists):
+    """
+    Constrói a dimensão de artistas e a ponte faixa↔artista em formato CSR
+
+    Todos os artistas de cada faixa (separados por ';') entram no índice,
+    não apenas o primeiro. A construção é feita em uma única passada vetorizada.
+
+    Args:
+        artists (pd.Series): Coluna `artists` do dataset, na ordem das linhas do DataFrame
+
+    Returns:
+        dict: Índice com as chaves:
+            - 'nomes' (pd.Index): dicionário código → nome do artista
+            - 'artista_ptr', 'artista_faixas' (np.ndarray): CSR artista → posições de linha
+            - 'faixa_ptr', 'faixa_artistas' (np.ndarray): CSR faixa → códigos de artista
+    """
+    num_faixas = len(artists)
+
+    # Uma entrada por par (faixa, artista), preservando a ordem dos artistas na faixa
+    pares = artists.reset_index(drop=True).str.split(';').explode().str.strip()
+    pares = pares[pares.notna() & (pares != '')]
+
+    linhas = pares.index.to_numpy(dtype=np.int64)
+    codigos, nomes = pd.factorize(pares, sort=False)
+    codigos = codigos.astype(np.int32)
+
+    # Faixa → artistas: o explode já deixa os pares agrupados por linha
+    faixa_ptr = np.zeros(num_faixas + 1, dtype=np.int64)
+    np.cumsum(np.bincount(linhas, minlength=num_faixas), out=faixa_ptr[1:])
+
+    # Artista → faixas: ordenação estável mantém as faixas na ordem do DataFrame
+    ordem = np.argsort(codigos, kind='stable')
+    artista_ptr = np.zeros(len(nomes) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codigos, minlength=len(nomes)), out=artista_ptr[1:])
+
+    return {
+        'nomes': pd.Index(nomes, name='artista'),
+        'artista_ptr': artista_ptr,
+        'artista_faixas': linhas[ordem],
+        'faixa_ptr': faixa_ptr,
+        'faixa_artistas': codigos,
+    }
+
+def codigo_artista(indice, artista):
+    """
+    Retorna o código inteiro de um artista, ou -1 se ele não existir no índice
+    """
+    try:
+        return indice['nomes'].get_loc(artista)
+    except KeyError:
+        return -1
+
+def faixas_do_artista(indice, artista):
+    """
+    Retorna as posições de linha de todas as faixas de um artista, incluindo participações
+
+    O custo é proporcional ao número de faixas do artista, sem varrer o DataFrame.
+
+    Args:
+        indice (dict): Índice de artistas
+        artista (str): Nome do artista
+
+    Returns:
+        np.ndarray: Posições de linha (para uso com `df.iloc`)
+    """
+    codigo = codigo_artista(indice, artista)
+    if codigo < 0:
+        return np.empty(0, dtype=np.int64)
+    inicio, fim = indice['artista_ptr'][codigo], indice['artista_ptr'][codigo + 1]
+    return indice['artista_faixas'][inicio:fim]
+
+def artistas_da_faixa(indice, linha):
+    """
+    Retorna os nomes dos artistas de uma faixa (posição de linha), na ordem de créditos
+    """
+    inicio, fim = indice['faixa_ptr'][linha], indice['faixa_ptr'][linha + 1]
+    return indice['nomes'][indice['faixa_artistas'][inicio:fim]].tolist()
+
+def expandir_por_artista(df, indice, colunas=None):
+    """
+    Expande o DataFrame pela ponte artista → faixas
+
+    Cada faixa aparece uma vez para cada artista creditado, com a coluna
+    `artista_cod` identificando o artista. Útil para agregações por artista
+    que devem considerar participações (feats).
+
+    Args:
+        df (pd.DataFrame): DataFrame na mesma ordem usada para construir o índice
+        indice (dict): Índice de artistas
+        colunas (list, opcional): Colunas a manter na expansão
+
+    Returns:
+        pd.DataFrame: DataFrame expandido com a coluna `artista_cod`
+    """
+    base = df if colunas is None else df[colunas]
+    expandido = base.iloc[indice['artista_faixas']].reset_index(drop=True)
+    expandido['artista_cod'] = np.repeat(
+        np.arange(len(indice['nomes']), dtype=np.int32),
+        np.diff(indice['artista_ptr'])
+    )
+    return expandido
+
+def construir_pertinencia_generos(linhas, generos, num_faixas):
+    """
+    Constrói a matriz esparsa faixa × gênero em formato CSR
+
+    No dataset original cada `track_id` aparece uma vez por gênero em que está
+    classificado. Esta matriz guarda essa relação sem duplicar as faixas.
+
+    Args:
+        linhas (np.ndarray): Posição na tabela canônica de cada linha original
+        generos (pd.Series): `track_genre` de cada linha original
+        num_faixas (int): Número de faixas da tabela canônica
+
+    Returns:
+        dict: Índice com as chaves:
+            - 'generos' (pd.Index): dicionário código → gênero (ordem alfabética)
+            - 'faixa_ptr', 'faixa_generos' (np.ndarray): CSR faixa → códigos de gênero
+            - 'genero_ptr', 'genero_faixas' (np.ndarray): CSR gênero → posições de linha
+    """
+    codigos, nomes = pd.factorize(generos, sort=True)
+    num_generos = len(nomes)
+
+    # Remove pares repetidos; a chave combinada já ordena por faixa e depois por gênero
+    chaves = np.unique(np.asarray(linhas, dtype=np.int64) * num_generos + codigos)
+    faixas_pares = chaves // num_generos
+    generos_pares = (chaves % num_generos).astype(np.int32)
+
+    faixa_ptr = np.zeros(num_faixas + 1, dtype=np.int64)
+    np.cumsum(np.bincount(faixas_pares, minlength=num_faixas), out=faixa_ptr[1:])
+
+    ordem = np.argsort(generos_pares, kind='stable')
+    genero_ptr = np.zeros(num_generos + 1, dtype=np.int64)
+    np.cumsum(np.bincount(generos_pares, minlength=num_generos), out=genero_ptr[1:])
+
+    return {
+        'generos': pd.Index(nomes, name='track_genre'),
+        'faixa_ptr': faixa_ptr,
+        'faixa_generos': generos_pares,
+        'genero_ptr': genero_ptr,
+        'genero_faixas': faixas_pares[ordem],
+    }
+
+def agrupar_generos(indice, grupos):
+    """
+    Agrupa a matriz de pertinência faixa × gênero em faixa × grupo de gêneros
+
+    Uma faixa pertence a cada grupo de algum dos seus gêneros, uma vez só
+    (ex.: uma faixa em 'pop' e 'pop-film' conta uma vez em 'Pop').
+
+    Args:
+        indice (dict): Índice de gêneros
+        grupos (pd.Series): Grupo de cada gênero, indexado pelo nome do gênero
+
+    Returns:
+        dict: Índice no formato de `construir_pertinencia_generos`, com os grupos em 'generos'
+    """
+    faixa_ptr = np.asarray(indice['faixa_ptr'])
+    linhas = np.repeat(np.arange(len(faixa_ptr) - 1), np.diff(faixa_ptr))
+    grupo_por_genero = grupos.reindex(indice['generos']).to_numpy()
+    agrupado = construir_pertinencia_generos(
+        linhas, grupo_por_genero[np.asarray(indice['faixa_generos'])], len(faixa_ptr) - 1
+    )
+    agrupado['generos'] = agrupado['generos'].rename(grupos.name)
+    return agrupado
+
+def faixas_do_genero(indice, genero):
+    """
+    Retorna as posições de linha das faixas classificadas em um gênero
+    """
+    try:
+        codigo = indice['generos'].get_loc(genero)
+    except KeyError:
+        return np.empty(0, dtype=np.int64)
+    return indice['genero_faixas'][indice['genero_ptr'][codigo]:indice['genero_ptr'][codigo + 1]]
+
+def mascara_faixas_com_generos(indice, generos, num_faixas):
+    """
+    Retorna uma máscara booleana das faixas classificadas em pelo menos um dos gêneros
+
+    Cada faixa é marcada uma única vez, mesmo que pertença a vários gêneros da lista.
+
+    Args:
+        indice (dict): Índice de gêneros
+        generos (list): Nomes dos gêneros
+        num_faixas (int): Número de faixas da tabela canônica
+
+    Returns:
+        np.ndarray: Máscara booleana na ordem da tabela canônica
+    """
+    mascara = np.zeros(num_faixas, dtype=bool)
+    for genero in generos:
+        mascara[faixas_do_genero(indice, genero)] = True
+    return mascara
+
+def _expandir_csr(ptr, valores, linhas):
+    """
+    Expande um subconjunto de linhas de uma estrutura CSR em pares (linha, valor)
+    """
+    linhas = np.asarray(linhas, dtype=np.int64)
+    inicios = ptr[linhas]
+    contagens = ptr[linhas + 1] - inicios
+    deslocamentos = np.arange(contagens.sum()) - np.repeat(np.cumsum(contagens) - contagens, contagens)
+    return np.repeat(linhas, contagens), valores[np.repeat(inicios, contagens) + deslocamentos]
+
+def contagem_por_genero(indice, linhas=None):
+    """
+    Conta faixas por gênero através da matriz de pertinência (equivale a `value_counts`)
+
+    Args:
+        indice (dict): Índice de gêneros
+        linhas (np.ndarray, opcional): Posições das faixas a considerar (todas se None)
+
+    Returns:
+        pd.Series: Número de faixas por gênero, em ordem decrescente, sem gêneros vazios
+    """
+    if linhas is None:
+        codigos = indice['faixa_generos']
+    else:
+        _, codigos = _expandir_csr(indice['faixa_ptr'], indice['faixa_generos'], linhas)
+    contagens = pd.Series(np.bincount(codigos, minlength=len(indice['generos'])), index=indice['generos'], name='count')
+    return contagens[contagens > 0].sort_values(ascending=False, kind='stable')
+
+def expandir_por_genero(df, indice, colunas=None, coluna='track_genre'):
+    """
+    Expande faixas pela matriz de pertinência faixa × gênero
+
+    Cada faixa de `df` aparece uma vez para cada gênero em que está classificada,
+    com a coluna `coluna` vinda da matriz. Deve ser usada nas visões por
+    gênero; visões globais usam a tabela canônica diretamente.
+
+    Args:
+        df (pd.DataFrame): Tabela canônica ou um filtro dela (índice = posição canônica)
+        indice (dict): Índice de gêneros (ou de grupos, de `agrupar_generos`)
+        colunas (list, opcional): Colunas a manter na expansão
+        coluna (str): Nome da coluna do gênero na expansão (ex.: 'genero_principal')
+
+    Returns:
+        pd.DataFrame: DataFrame expandido com a coluna categórica `coluna`
+    """
+    linhas, codigos = _expandir_csr(indice['faixa_ptr'], indice['faixa_generos'], df.index.to_numpy())
+    base = df if colunas is None else df[[c for c in colunas if c != coluna]]
+    expandido = base.loc[linhas].reset_index(drop=True)
+    expandido[coluna] = pd.Categorical.from_codes(codigos, indice['generos'])
+    return expandido
+
+def generos_das_faixas(indice, linhas, separador=', '):
+    """
+    Lista, para exibição, todos os gêneros de cada faixa (ordem alfabética)
+
+    Args:
+        indice (dict): Índice de gêneros (ou de grupos)
+        linhas (np.ndarray): Posições das faixas na tabela canônica
+        separador (str): Separador entre os gêneros de uma faixa
+
+    Returns:
+        list: Um texto por faixa, na ordem de `linhas`
+    """
+    ptr, codigos = np.asarray(indice['faixa_ptr']), np.asarray(indice['faixa_generos'])
+    nomes = np.asarray(indice['generos'], dtype=object)
+    return [separador.join(nomes[codigos[ptr[linha]:ptr[linha + 1]]]) for linha in np.asarray(linhas)]
+
+def genero_mais_comum_por_artista(indice_artistas, indice_generos):
+    """
+    Calcula o gênero mais comum de cada artista considerando todas as classificações das faixas
+
+    Empates são resolvidos pela ordem alfabética do gênero, como em `Series.mode`.
+
+    Args:
+        indice_artistas (dict): Índice de artistas
+        indice_generos (dict): Índice de gêneros, sobre a mesma tabela de faixas
+
+    Returns:
+        np.ndarray: Nome do gênero mais comum para cada código de artista
+    """
+    num_artistas = len(indice_artistas['nomes'])
+    num_generos = len(indice_generos['generos'])
+
+    # Pares (artista, faixa) expandidos pelos gêneros de cada faixa
+    artista_por_par = np.repeat(np.arange(num_artistas, dtype=np.int64), np.diff(indice_artistas['artista_ptr']))
+    generos_por_faixa = np.diff(indice_generos['faixa_ptr'])[indice_artistas['artista_faixas']]
+    _, generos = _expandir_csr(indice_generos['faixa_ptr'], indice_generos['faixa_generos'], indice_artistas['artista_faixas'])
+    artistas = np.repeat(artista_por_par, generos_por_faixa)
+
+    chaves, frequencias = np.unique(artistas * num_generos + generos, return_counts=True)
+    artistas, generos = chaves // num_generos, chaves % num_generos
+
+    # Primeiro par de cada artista na ordem (artista, frequência desc, gênero)
+    ordem = np.lexsort((generos, -frequencias, artistas))
+    primeiros = ordem[np.r_[True, artistas[ordem][1:] != artistas[ordem][:-1]]]
+
+    resultado = np.full(num_artistas, 'N/A', dtype=object)
+    resultado[artistas[primeiros]] = indice_generos['generos'][generos[primeiros]]
+    return resultado
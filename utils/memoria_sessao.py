@@ -0,0 +1,260 @@
+import gc
+import mmap
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.metricas import adicionar_coletor, registrar
+
+# Limite flexível por sessão: acima dele, os derivados da sessão são descartados (LRU)
+LIMITE_SESSAO = int(float(os.environ.get('SPOTIFY_LIMITE_SESSAO_MB', '256')) * 1024**2)
+# Teto próprio dos derivados guardados na sessão, mesmo com a sessão abaixo do limite
+LIMITE_DERIVADOS = int(float(os.environ.get('SPOTIFY_LIMITE_DERIVADOS_MB', '64')) * 1024**2)
+# Objetos de execuções anteriores acompanhados por sessão (para detectar retenções)
+MAX_ANTERIORES = 200
+# Sessões sem execução há mais que isso saem da contabilidade
+JANELA_SESSOES = 1800
+
+_CHAVE_DERIVADOS = 'memoria_derivados'
+
+# id da sessão → {'pagina', 'visto', 'atual': {nome: (bytes, ref)}, 'anteriores': [(nome, bytes, ref)], 'derivados'}
+_sessoes = {}
+_trava = threading.Lock()
+
+registrar('spotify_sessoes_memoria_bytes', 'gauge', "Bytes contabilizados nas sessões deste processo, por tipo")
+
+
+def _compartilhado(array):
+    """
+    Indica se o array aponta para um memory-map (colunas do armazém, comuns a todas as sessões)
+    """
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+def _tamanho_array(array):
+    if _compartilhado(array):
+        return 0
+    tamanho = array.nbytes
+    if array.dtype == object and len(array):
+        # Estima as strings pelo tamanho médio de uma amostra
+        amostra = array[:: max(1, len(array) // 1000)]
+        tamanho += int(len(array) * sum(sys.getsizeof(valor) for valor in amostra) / len(amostra))
+    return tamanho
+
+def _tamanho_serie(serie):
+    valores = serie.values
+    if isinstance(valores, pd.Categorical):
+        valores = valores.codes
+    if isinstance(valores, np.ndarray):
+        return _tamanho_array(valores)
+    return int(getattr(valores, 'nbytes', 0))
+
+def _tamanho_valor(valor):
+    """
+    Tamanho aproximado de um valor das propriedades de uma figura (listas, dicts, arrays)
+    """
+    if isinstance(valor, np.ndarray):
+        return _tamanho_array(valor)
+    if isinstance(valor, dict):
+        return sum(_tamanho_valor(item) for item in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return 8 * len(valor) + sum(_tamanho_valor(item) for item in valor if isinstance(item, (str, list, tuple, dict, np.ndarray)))
+    if isinstance(valor, str):
+        return len(valor)
+    return 8
+
+def tamanho_objeto(objeto):
+    """
+    Estima os bytes próprios de um objeto grande (DataFrame, Series, array ou figura Plotly)
+
+    Colunas que são memory-maps do armazém não contam: são compartilhadas
+    entre sessões e processos. Cópias e resultados de filtros contam.
+
+    Returns:
+        int: Bytes estimados
+    """
+    if isinstance(objeto, pd.DataFrame):
+        return sum(_tamanho_serie(serie) for _, serie in objeto.items()) + _tamanho_serie(objeto.index.to_series())
+    if isinstance(objeto, pd.Series):
+        return _tamanho_serie(objeto)
+    if isinstance(objeto, np.ndarray):
+        return _tamanho_array(objeto)
+    if hasattr(objeto, 'to_plotly_json'):
+        # `_props` são as propriedades do traço sem cópia; `to_plotly_json` copia tudo (várias vezes mais lento)
+        return sum(_tamanho_valor(getattr(traco, '_props', None) or traco.to_plotly_json()) for traco in objeto.data)
+    return sys.getsizeof(objeto)
+
+def _id_sessao():
+    contexto = get_script_run_ctx()
+    return None if contexto is None else contexto.session_id
+
+def _estado_sessao(sessao):
+    """
+    Estado da sessão na contabilidade, criado se ainda não existir (chame com `_trava`)
+    """
+    return _sessoes.setdefault(
+        sessao, {'pagina': None, 'visto': time.monotonic(), 'atual': {}, 'anteriores': [], 'derivados': 0}
+    )
+
+def iniciar_execucao(pagina):
+    """
+    Abre a contabilidade de uma nova execução da sessão atual
+
+    Os objetos da execução anterior passam a ser acompanhados por referência
+    fraca: se continuarem vivos depois que a execução terminou, algo os retém.
+    """
+    sessao = _id_sessao()
+    if sessao is None:
+        return
+    agora = time.monotonic()
+    # Derivados guardados de propósito na sessão não são retenções
+    guardados = {id(item[1]) for item in _derivados().values()}
+    with _trava:
+        estado = _estado_sessao(sessao)
+        anteriores = [
+            (nome, tamanho, ref) for nome, (tamanho, ref) in estado['atual'].items()
+            if ref() is not None and id(ref()) not in guardados
+        ]
+        estado['anteriores'] = ([item for item in estado['anteriores'] if item[2]() is not None] + anteriores)[-MAX_ANTERIORES:]
+        estado.update(pagina=pagina, visto=agora, atual={})
+
+        for antiga in [s for s, e in _sessoes.items() if agora - e['visto'] > JANELA_SESSOES]:
+            del _sessoes[antiga]
+
+def contabilizar(nome, objeto):
+    """
+    Registra um objeto grande criado pela execução atual da página
+
+    Args:
+        nome (str): Descrição do objeto (ex.: 'df_filtrado', 'gráfico: Top 10')
+        objeto: DataFrame, Series, array ou figura Plotly
+
+    Returns:
+        O próprio objeto, para uso em atribuições
+    """
+    sessao = _id_sessao()
+    if sessao is None or any(item[1] is objeto for item in _derivados().values()):
+        # Derivados da sessão já são contabilizados por `derivado_sessao`
+        return objeto
+    tamanho = tamanho_objeto(objeto)
+    try:
+        ref = weakref.ref(objeto)
+    except TypeError:
+        ref = lambda: None
+    with _trava:
+        estado = _sessoes.get(sessao)
+        if estado is not None:
+            estado['atual'][nome] = (tamanho, ref)
+    _aplicar_limite()
+    return objeto
+
+def _derivados():
+    return st.session_state.setdefault(_CHAVE_DERIVADOS, OrderedDict())
+
+def derivado_sessao(nome, chave, construir):
+    """
+    Guarda na sessão um objeto derivado (ex.: o DataFrame filtrado) para reaproveitá-lo
+
+    O valor é reconstruído quando `chave` muda (ex.: os valores dos filtros).
+    Interações que não mudam a chave, como trocar a seleção de um gráfico,
+    reaproveitam o objeto em vez de refiltrar. Há um valor por nome (o da
+    chave anterior é substituído), os derivados contam no limite da sessão e
+    são descartados do menos usado para o mais usado quando ela excede
+    `LIMITE_SESSAO` ou quando eles passam de `LIMITE_DERIVADOS`.
+
+    Args:
+        nome (str): Nome do derivado na sessão
+        chave (tuple): Parâmetros de que o derivado depende (hasháveis)
+        construir (callable): Função sem argumentos que calcula o valor
+
+    Returns:
+        O valor derivado
+    """
+    derivados = _derivados()
+    if nome in derivados and derivados[nome][0] == chave:
+        derivados.move_to_end(nome)
+        return derivados[nome][1]
+
+    valor = construir()
+    derivados[nome] = (chave, valor, tamanho_objeto(valor))
+    derivados.move_to_end(nome)
+    _aplicar_limite(preservar=nome)
+    return valor
+
+def _aplicar_limite(preservar=None):
+    """
+    Descarta derivados da sessão (do menos usado para o mais usado) enquanto ela excede os limites
+    """
+    sessao = _id_sessao()
+    if sessao is None:
+        return
+    derivados = _derivados()
+    with _trava:
+        execucao = sum(tamanho for tamanho, _ in _estado_sessao(sessao)['atual'].values())
+    guardados = sum(item[2] for item in derivados.values())
+    for nome in list(derivados):
+        if execucao + guardados <= LIMITE_SESSAO and guardados <= LIMITE_DERIVADOS:
+            break
+        if nome != preservar:
+            guardados -= derivados.pop(nome)[2]
+    with _trava:
+        _estado_sessao(sessao)['derivados'] = guardados
+
+def relatorio_sessoes(coletar_lixo=False):
+    """
+    Lista a memória contabilizada por sessão, da mais pesada para a mais leve
+
+    Args:
+        coletar_lixo (bool): Roda o coletor de ciclos antes de procurar retenções
+            (figuras Plotly formam ciclos e só somem depois dele)
+
+    Returns:
+        pd.DataFrame: Uma linha por sessão com bytes da última execução, dos
+            derivados guardados e de objetos de execuções anteriores ainda vivos
+    """
+    if coletar_lixo:
+        gc.collect()
+    sessao_atual = _id_sessao()
+    agora = time.monotonic()
+    with _trava:
+        copia = {
+            sessao: (estado['pagina'], estado['visto'], dict(estado['atual']), list(estado['anteriores']), estado['derivados'])
+            for sessao, estado in _sessoes.items()
+        }
+
+    linhas = []
+    for sessao, (pagina, visto, atual, anteriores, derivados) in copia.items():
+        retidos = [(nome, tamanho) for nome, tamanho, ref in anteriores if ref() is not None]
+        linhas.append({
+            'sessao': sessao[:8] + (' (esta)' if sessao == sessao_atual else ''),
+            'pagina': pagina,
+            'ocioso_s': round(agora - visto),
+            'execucao_bytes': sum(tamanho for tamanho, _ in atual.values()),
+            'derivados_bytes': derivados,
+            'retidos_bytes': sum(tamanho for _, tamanho in retidos),
+            'retidos': ', '.join(sorted({nome for nome, _ in retidos}))
+        })
+    relatorio = pd.DataFrame(linhas, columns=[
+        'sessao', 'pagina', 'ocioso_s', 'execucao_bytes', 'derivados_bytes', 'retidos_bytes', 'retidos'
+    ])
+    relatorio['total_bytes'] = relatorio[['execucao_bytes', 'derivados_bytes', 'retidos_bytes']].sum(axis=1)
+    return relatorio.sort_values('total_bytes', ascending=False).reset_index(drop=True)
+
+def _coletar_metricas():
+    relatorio = relatorio_sessoes()
+    return [
+        ('spotify_sessoes_memoria_bytes', {'tipo': tipo}, int(relatorio[f"{tipo}_bytes"].sum()))
+        for tipo in ('execucao', 'derivados', 'retidos')
+    ]
+
+adicionar_coletor(_coletar_metricas)
@@ -0,0 +1,244 @@
+import bisect
+import functools
+import http.server
+import logging
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Exportação: HTTP local (SPOTIFY_METRICAS_PORTA) e/ou arquivo periódico (SPOTIFY_METRICAS_ARQUIVO)
+PORTA = os.environ.get('SPOTIFY_METRICAS_PORTA')
+HOST = os.environ.get('SPOTIFY_METRICAS_HOST', '127.0.0.1')
+ARQUIVO = os.environ.get('SPOTIFY_METRICAS_ARQUIVO')
+INTERVALO_ARQUIVO = float(os.environ.get('SPOTIFY_METRICAS_INTERVALO', '15'))
+
+BUCKETS_SEGUNDOS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# nome → {'tipo', 'ajuda', 'buckets', 'valores': {rótulos: valor}}
+_metricas = {}
+# Funções chamadas a cada exportação, que retornam [(nome, rótulos, valor)] de gauges/counters
+_coletores = []
+_trava = threading.Lock()
+_exportacao_iniciada = False
+# Faltas de cache já contadas nesta thread, para o envoltório distinguir acerto de falta
+_faltas_thread = threading.local()
+
+_log = logging.getLogger(__name__)
+
+
+def registrar(nome, tipo, ajuda, buckets=None):
+    """
+    Declara uma métrica (idempotente)
+
+    Args:
+        nome (str): Nome no padrão Prometheus (ex.: 'spotify_execucao_pagina_segundos')
+        tipo (str): 'counter', 'gauge' ou 'histogram'
+        ajuda (str): Descrição exibida em `# HELP`
+        buckets (tuple, opcional): Limites superiores dos buckets de um histograma
+    """
+    with _trava:
+        _metricas.setdefault(nome, {
+            'tipo': tipo, 'ajuda': ajuda, 'buckets': tuple(buckets or BUCKETS_SEGUNDOS), 'valores': {}
+        })
+
+def _chave(rotulos):
+    return tuple(sorted(rotulos.items())) if rotulos else ()
+
+def incrementar(nome, rotulos=None, valor=1):
+    """
+    Soma `valor` a um counter
+    """
+    chave = _chave(rotulos)
+    with _trava:
+        valores = _metricas[nome]['valores']
+        valores[chave] = valores.get(chave, 0) + valor
+
+def definir(nome, rotulos=None, valor=0):
+    """
+    Define o valor atual de um gauge
+    """
+    with _trava:
+        _metricas[nome]['valores'][_chave(rotulos)] = valor
+
+def observar(nome, rotulos=None, valor=0.0):
+    """
+    Registra uma observação em um histograma
+    """
+    chave = _chave(rotulos)
+    with _trava:
+        metrica = _metricas[nome]
+        estado = metrica['valores'].get(chave)
+        if estado is None:
+            estado = metrica['valores'][chave] = {'buckets': [0] * len(metrica['buckets']), 'soma': 0.0, 'contagem': 0}
+        posicao = bisect.bisect_left(metrica['buckets'], valor)
+        if posicao < len(estado['buckets']):
+            estado['buckets'][posicao] += 1
+        estado['soma'] += valor
+        estado['contagem'] += 1
+
+def adicionar_coletor(coletor):
+    """
+    Registra uma função chamada a cada exportação para atualizar métricas sob demanda
+
+    O coletor retorna uma lista de (nome, rótulos, valor) aplicados com `definir`.
+    Útil para valores que já são mantidos em outro módulo (ex.: contadores do
+    cache compartilhado) ou que só fazem sentido no momento da leitura (memória).
+    """
+    with _trava:
+        if coletor not in _coletores:
+            _coletores.append(coletor)
+
+def registrar_falta_cache(cache):
+    """
+    Conta uma falta de cache; chame no corpo da função decorada com `st.cache_*`
+
+    O corpo só executa quando o valor não está em cache, então cada chamada
+    aqui é uma falta. O envoltório de `contar_cache` conta as demais como acertos.
+    """
+    incrementar('spotify_cache_eventos_total', {'cache': cache, 'evento': 'faltas'})
+    faltas = getattr(_faltas_thread, 'contagem', {})
+    faltas[cache] = faltas.get(cache, 0) + 1
+    _faltas_thread.contagem = faltas
+
+def contar_cache(cache):
+    """
+    Decorador aplicado por fora de `st.cache_data`/`st.cache_resource` que conta os acertos
+
+    Uso:
+        @contar_cache('carregar_faixas')
+        @st.cache_resource
+        def carregar_faixas(...):
+            registrar_falta_cache('carregar_faixas')
+            ...
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            faltas = getattr(_faltas_thread, 'contagem', {})
+            antes = faltas.get(cache, 0)
+            resultado = funcao(*args, **kwargs)
+            if getattr(_faltas_thread, 'contagem', {}).get(cache, 0) == antes:
+                incrementar('spotify_cache_eventos_total', {'cache': cache, 'evento': 'acertos'})
+            return resultado
+        return envoltorio
+    return decorador
+
+def _formatar_rotulos(chave, extra=None):
+    itens = list(chave) + (list(extra.items()) if extra else [])
+    if not itens:
+        return ''
+    escapar = lambda valor: str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{rotulo}="{escapar(valor)}"' for rotulo, valor in itens) + '}'
+
+def texto_prometheus():
+    """
+    Retorna todas as métricas no formato de exposição de texto do Prometheus
+    """
+    for coletor in list(_coletores):
+        try:
+            for nome, rotulos, valor in coletor():
+                definir(nome, rotulos, valor)
+        except Exception:
+            _log.exception("Falha no coletor de métricas %s", coletor)
+
+    linhas = []
+    with _trava:
+        for nome, metrica in sorted(_metricas.items()):
+            linhas.append(f"# HELP {nome} {metrica['ajuda']}")
+            linhas.append(f"# TYPE {nome} {metrica['tipo']}")
+            for chave, valor in sorted(metrica['valores'].items()):
+                if metrica['tipo'] != 'histogram':
+                    linhas.append(f"{nome}{_formatar_rotulos(chave)} {valor}")
+                    continue
+                acumulado = 0
+                for limite, quantidade in zip(metrica['buckets'], valor['buckets']):
+                    acumulado += quantidade
+                    linhas.append(f"{nome}_bucket{_formatar_rotulos(chave, {'le': limite})} {acumulado}")
+                linhas.append(f"{nome}_bucket{_formatar_rotulos(chave, {'le': '+Inf'})} {valor['contagem']}")
+                linhas.append(f"{nome}_sum{_formatar_rotulos(chave)} {valor['soma']}")
+                linhas.append(f"{nome}_count{_formatar_rotulos(chave)} {valor['contagem']}")
+    return '\n'.join(linhas) + '\n'
+
+class _ManipuladorMetricas(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        corpo = texto_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+def _gravar_periodicamente(caminho):
+    while True:
+        # Uma falha (disco cheio, coletor com erro) não pode encerrar a thread em silêncio
+        try:
+            temporario = f"{caminho}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(texto_prometheus())
+            os.replace(temporario, caminho)
+        except Exception:
+            _log.exception("Métricas: falha ao gravar %s", caminho)
+        time.sleep(INTERVALO_ARQUIVO)
+
+def iniciar_exportacao():
+    """
+    Inicia (uma vez por processo) a exportação configurada pelas variáveis de ambiente
+
+    - SPOTIFY_METRICAS_PORTA: serve `GET /metrics` em HOST:PORTA. Com vários
+      processos servindo o app, só o primeiro consegue a porta; use o arquivo.
+    - SPOTIFY_METRICAS_ARQUIVO: grava o texto a cada SPOTIFY_METRICAS_INTERVALO
+      segundos (padrão 15). `{pid}` no caminho é trocado pelo PID, para o
+      textfile collector do node_exporter.
+    """
+    global _exportacao_iniciada
+    with _trava:
+        if _exportacao_iniciada:
+            return
+        _exportacao_iniciada = True
+
+    if PORTA:
+        try:
+            servidor = http.server.ThreadingHTTPServer((HOST, int(PORTA)), _ManipuladorMetricas)
+        except OSError as erro:
+            _log.warning("Métricas: porta %s indisponível neste processo (%s)", PORTA, erro)
+        else:
+            threading.Thread(target=servidor.serve_forever, name='metricas-http', daemon=True).start()
+
+    if ARQUIVO:
+        caminho = ARQUIVO.replace('{pid}', str(os.getpid()))
+        threading.Thread(target=_gravar_periodicamente, args=(caminho,), name='metricas-arquivo', daemon=True).start()
+
+def _coletar_processo():
+    """
+    Memória do processo: residente atual (Linux) e pico
+    """
+    amostras = []
+    if resource is not None:
+        # ru_maxrss vem em bytes no macOS e em KiB no Linux (e nos demais Unix)
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        amostras.append(('spotify_processo_memoria_pico_bytes', None, pico if sys.platform == 'darwin' else pico * 1024))
+    try:
+        with open('/proc/self/statm') as arquivo:
+            residentes = int(arquivo.read().split()[1])
+        amostras.append(('spotify_processo_memoria_residente_bytes', None, residentes * os.sysconf('SC_PAGE_SIZE')))
+    except (OSError, AttributeError, ValueError):
+        pass
+    return amostras
+
+
+registrar('spotify_cache_eventos_total', 'counter', "Acertos e faltas dos caches do Streamlit e eventos do cache compartilhado")
+registrar('spotify_processo_memoria_pico_bytes', 'gauge', "Pico de memória residente do processo")
+registrar('spotify_processo_memoria_residente_bytes', 'gauge', "Memória residente atual do processo (Linux)")
+adicionar_coletor(_coletar_processo)
@@ -0,0 +1,199 @@
+import pandas as pd
+import streamlit as st
+from utils.busca import buscar_nomes
+from utils.cache_compartilhado import estatisticas_cache
+from utils.carrega_dados import relatorio_colunas
+from utils.desempenho import ATIVO as DESEMPENHO_ATIVO
+from utils.desempenho import (CHAVE_PERFILAR, armar_perfil, encerrar_execucao, encerrar_perfil, gravar_trace, medir,
+                              trechos_atuais)
+from utils.memoria_sessao import LIMITE_SESSAO, contabilizar, relatorio_sessoes
+
+
+def exibir_relatorio_colunas(versao, colunas):
+    """
+    Mostra na barra lateral as colunas carregadas pela página e os bytes de cada uma
+
+    Args:
+        versao (str): Versão do dataset (`versao_dataset()`)
+        colunas (list): Manifesto de colunas declarado pela página
+    """
+    with st.sidebar.expander("📦 Colunas carregadas"):
+        relatorio = relatorio_colunas(versao, colunas)
+        st.caption(f"{len(relatorio)} colunas | {relatorio['bytes'].sum() / 1024**2:.2f} MB")
+        st.dataframe(
+            relatorio,
+            column_config={
+                'coluna': 'Coluna',
+                'origem': 'Origem',
+                'bytes': st.column_config.NumberColumn('Bytes', format="%d")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+
+def exibir_estatisticas_cache():
+    """
+    Mostra na barra lateral os contadores do cache compartilhado entre processos
+    """
+    with st.sidebar.expander("🗄️ Cache compartilhado"):
+        estatisticas = estatisticas_cache()
+        st.caption("Contadores deste processo do servidor")
+        st.dataframe(
+            estatisticas,
+            column_config={
+                'artefato': 'Artefato',
+                'acertos': 'Acertos',
+                'faltas': 'Faltas (construído aqui)',
+                'esperas': 'Esperas',
+                'antigos': 'Versão anterior servida'
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+
+def exibir_grafico(figura, **kwargs):
+    """
+    Exibe uma figura Plotly medindo o tempo de serialização e envio
+
+    O tamanho da figura sempre conta no limite de memória da sessão (figuras
+    costumam ser os maiores objetos da execução); o tempo só é medido com a
+    instrumentação ligada.
+
+    Args:
+        figura (go.Figure): Figura a exibir
+        **kwargs: Repassados para `st.plotly_chart`
+    """
+    contabilizar(f"gráfico: {figura.layout.title.text or 'sem título'}", figura)
+    if not DESEMPENHO_ATIVO:
+        return st.plotly_chart(figura, **kwargs)
+    with medir(f"gráfico: {figura.layout.title.text or 'sem título'}", 'grafico'):
+        return st.plotly_chart(figura, **kwargs)
+
+def selecionar_com_busca(rotulo, indice, chave, permitidos=None, limite=20):
+    """
+    Caixa de seleção com busca no servidor: só os nomes encontrados vão para o navegador
+
+    A busca roda a cada Enter (ou ao sair do campo) sobre o índice de
+    `utils.busca`; sem texto, lista os nomes mais relevantes.
+
+    Args:
+        rotulo (str): Rótulo da caixa de seleção
+        indice (dict): Índice de `utils.carrega_dados.carregar_indice_busca`
+        chave (str): Chave do widget (a busca usa `{chave}_busca`)
+        permitidos (np.ndarray, opcional): Máscara booleana dos códigos selecionáveis
+        limite (int): Máximo de opções exibidas
+
+    Returns:
+        str | None: Nome selecionado, ou None se nada foi encontrado
+    """
+    consulta = st.text_input(
+        f"🔎 Buscar ({rotulo.rstrip(':').lower()})",
+        key=f"{chave}_busca",
+        placeholder="Digite parte do nome e tecle Enter"
+    )
+    with medir(f"busca: {chave}", 'filtro'):
+        codigos = buscar_nomes(indice, consulta, limite=limite, permitidos=permitidos)
+    if len(codigos) == 0:
+        st.info(f"Nenhum resultado para \"{consulta}\".")
+        return None
+    return st.selectbox(rotulo, indice['nomes'][codigos].tolist(), key=chave)
+
+def exibir_painel_desempenho():
+    """
+    Mostra na barra lateral o tempo de cada trecho da execução atual e grava o trace
+
+    Chame no fim da página (e antes de `st.stop()`). Com a instrumentação
+    desligada, só registra a duração da execução nas métricas.
+    """
+    if not DESEMPENHO_ATIVO:
+        encerrar_execucao()
+        return
+    perfil = encerrar_perfil()
+    trechos, total_ms = trechos_atuais()
+    gravar_trace()
+    encerrar_execucao()
+
+    with st.sidebar.expander("⏱️ Desempenho"):
+        st.caption(f"Execução atual: {total_ms:.0f} ms no total")
+        tabela = pd.DataFrame(trechos, columns=['nome', 'categoria', 'inicio_ms', 'duracao_ms'])
+        tabela['percentual'] = 100 * tabela['duracao_ms'] / max(total_ms, 1e-9)
+        st.dataframe(
+            tabela.sort_values('duracao_ms', ascending=False),
+            column_config={
+                'nome': 'Trecho',
+                'categoria': 'Categoria',
+                'inicio_ms': st.column_config.NumberColumn('Início (ms)', format="%.1f"),
+                'duracao_ms': st.column_config.NumberColumn('Duração (ms)', format="%.1f"),
+                'percentual': st.column_config.ProgressColumn('% do total', format="%.0f%%", min_value=0, max_value=100)
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        por_categoria = tabela.groupby('categoria')['duracao_ms'].sum().sort_values(ascending=False)
+        st.caption(" | ".join(f"{categoria}: {ms:.0f} ms" for categoria, ms in por_categoria.items()))
+
+    _exibir_perfil(perfil)
+    _exibir_memoria_sessoes()
+
+def _exibir_perfil(perfil):
+    """
+    Mostra o toggle que perfila a próxima interação e o resultado da última captura
+
+    Args:
+        perfil (tuple): Retorno de `encerrar_perfil` nesta execução (ou None)
+    """
+    if perfil is not None:
+        caminho, funcoes = perfil
+        st.session_state['desempenho_ultimo_perfil'] = (caminho, pd.DataFrame(funcoes))
+
+    st.sidebar.toggle(
+        "🔬 Perfilar a próxima interação",
+        key=CHAVE_PERFILAR,
+        on_change=armar_perfil,
+        help="A próxima execução desta página roda sob o cProfile; o toggle desliga sozinho depois"
+    )
+
+    if 'desempenho_ultimo_perfil' in st.session_state:
+        caminho, funcoes = st.session_state['desempenho_ultimo_perfil']
+        with st.sidebar.expander("🔬 Último perfil (tempo acumulado)", expanded=perfil is not None):
+            st.caption(f"Perfil completo: `{caminho}` (abra com `snakeviz` ou `python -m pstats`)")
+            st.dataframe(
+                funcoes,
+                column_config={
+                    'funcao': 'Função',
+                    'local': 'Local',
+                    'chamadas': 'Chamadas',
+                    'proprio_ms': st.column_config.NumberColumn('Próprio (ms)', format="%.1f"),
+                    'acumulado_ms': st.column_config.NumberColumn('Acumulado (ms)', format="%.1f")
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+
+def _exibir_memoria_sessoes():
+    """
+    Lista as sessões deste processo da mais pesada para a mais leve, com objetos retidos
+    """
+    with st.sidebar.expander("🧠 Memória por sessão"):
+        coletar = st.button("Coletar lixo e procurar retenções", key='memoria_coletar_lixo')
+        relatorio = relatorio_sessoes(coletar_lixo=coletar)
+        st.caption(
+            f"{len(relatorio)} sessões | {relatorio['total_bytes'].sum() / 1024**2:.1f} MB contabilizados | "
+            f"limite por sessão: {LIMITE_SESSAO / 1024**2:.0f} MB"
+        )
+        st.dataframe(
+            relatorio[['sessao', 'pagina', 'total_bytes', 'execucao_bytes', 'derivados_bytes', 'retidos_bytes',
+                       'retidos', 'ocioso_s']],
+            column_config={
+                'sessao': 'Sessão',
+                'pagina': 'Página',
+                'total_bytes': st.column_config.NumberColumn('Total (bytes)', format="%d"),
+                'execucao_bytes': st.column_config.NumberColumn('Última execução', format="%d"),
+                'derivados_bytes': st.column_config.NumberColumn('Derivados guardados', format="%d"),
+                'retidos_bytes': st.column_config.NumberColumn('Retidos', format="%d"),
+                'retidos': 'Objetos retidos',
+                'ocioso_s': st.column_config.NumberColumn('Ociosa há (s)', format="%d")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
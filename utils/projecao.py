@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+# Linhas processadas por vez nas passadas sobre a matriz
+TAMANHO_BLOCO = 1 << 18
+
+
+def _blocos(matriz, tamanho_bloco=TAMANHO_BLOCO):
+    for inicio in range(0, len(matriz), tamanho_bloco):
+        yield inicio, np.asarray(matriz[inicio:inicio + tamanho_bloco], dtype=np.float64)
+
+def pca_aleatoria(matriz, componentes=2, sobreamostragem=5, iteracoes=4, semente=0):
+    """
+    PCA por SVD aleatória (iteração de subespaço), em passadas por blocos sobre a matriz
+
+    Em vez de guardar o esboço linhas × l, cada passada calcula Xᵀ(XΩ) bloco
+    a bloco: a memória extra é d × l, então o custo cresce só linearmente com
+    o número de linhas. Ao final, Rayleigh-Ritz no subespaço dá as direções
+    principais e as variâncias.
+
+    Args:
+        matriz (np.ndarray): Linhas × dimensões (ex.: features padronizadas)
+        componentes (int): Dimensões da projeção
+        sobreamostragem (int): Direções extras do subespaço aleatório (precisão)
+        iteracoes (int): Iterações de potência (precisão com espectro pouco decrescente)
+        semente (int): Semente do vetor aleatório inicial
+
+    Returns:
+        dict: Índice com as chaves:
+            - 'coordenadas' (np.ndarray): linhas × componentes (float32)
+            - 'componentes' (np.ndarray): dimensões × componentes (cargas)
+            - 'variancia' (np.ndarray): fração da variância explicada por componente
+            - 'media' (np.ndarray): média das colunas (a projeção é sobre os dados centrados)
+            - 'limites' (np.ndarray): [x_min, x_max, y_min, y_max] sem os 0,5% extremos
+    """
+    total, dimensoes = matriz.shape
+    media = sum(bloco.sum(axis=0) for _, bloco in _blocos(matriz)) / total
+    largura = min(dimensoes, componentes + sobreamostragem)
+
+    def aplicar_gram(base):
+        # (X - μ)ᵀ (X - μ) · base, acumulado por blocos; também devolve a variância total
+        acumulado = np.zeros((dimensoes, base.shape[1]))
+        soma_quadrados = 0.0
+        for _, bloco in _blocos(matriz):
+            # Nova cópia centrada: com entrada float64, `bloco` é uma vista da matriz de quem chama
+            bloco = bloco - media
+            acumulado += bloco.T @ (bloco @ base)
+            soma_quadrados += (bloco ** 2).sum()
+        return acumulado, soma_quadrados
+
+    base, _ = np.linalg.qr(np.random.default_rng(semente).standard_normal((dimensoes, largura)))
+    for _ in range(iteracoes):
+        base, _ = np.linalg.qr(aplicar_gram(base)[0])
+
+    imagem, soma_quadrados = aplicar_gram(base)
+    autovalores, autovetores = np.linalg.eigh(base.T @ imagem)
+    ordem = np.argsort(autovalores)[::-1][:componentes]
+    cargas = base @ autovetores[:, ordem]
+    # Sinal determinístico: a maior carga (em módulo) de cada componente é positiva
+    cargas *= np.sign(cargas[np.abs(cargas).argmax(axis=0), np.arange(cargas.shape[1])])
+
+    coordenadas = np.empty((total, componentes), dtype=np.float32)
+    for inicio, bloco in _blocos(matriz):
+        coordenadas[inicio:inicio + len(bloco)] = (bloco - media) @ cargas
+
+    return {
+        'coordenadas': coordenadas,
+        'componentes': cargas,
+        'variancia': autovalores[ordem] / soma_quadrados,
+        'media': media,
+        'limites': np.concatenate([np.percentile(coordenadas[:, eixo], [0.5, 99.5]) for eixo in range(2)]),
+    }
+
+def celulas(coordenadas, limites, num_celulas):
+    """
+    Célula da grade num_celulas × num_celulas de cada ponto, ou -1 fora dos limites
+
+    Args:
+        coordenadas (np.ndarray): Pontos × 2
+        limites (array-like): [x_min, x_max, y_min, y_max]
+        num_celulas (int): Células por eixo
+
+    Returns:
+        np.ndarray: Código da célula (coluna * num_celulas + linha) por ponto
+    """
+    x_min, x_max, y_min, y_max = limites
+    x = (coordenadas[:, 0] - x_min) / (x_max - x_min) * num_celulas
+    y = (coordenadas[:, 1] - y_min) / (y_max - y_min) * num_celulas
+    dentro = (x >= 0) & (x < num_celulas) & (y >= 0) & (y < num_celulas)
+    codigos = np.full(len(coordenadas), -1, dtype=np.int64)
+    codigos[dentro] = x[dentro].astype(np.int64) * num_celulas + y[dentro].astype(np.int64)
+    return codigos
+
+def resumir_celulas(codigos_celula, limites, num_celulas, codigos_categoria, num_categorias, relevancia, exemplos=3,
+                    ptr_categorias=None):
+    """
+    Resume os pontos de cada célula ocupada: contagem, categoria dominante e exemplos
+
+    Args:
+        codigos_celula (np.ndarray): Saída de `celulas`
+        limites (array-like): Limites usados em `celulas`
+        num_celulas (int): Células por eixo
+        codigos_categoria (np.ndarray): Código da categoria de cada ponto (0..num_categorias-1; -1 = sem categoria),
+            ou os códigos de um CSR ponto → categorias quando `ptr_categorias` é dado
+        num_categorias (int): Número de categorias
+        relevancia (np.ndarray): Critério dos exemplos (ex.: popularidade)
+        exemplos (int): Exemplos por célula
+        ptr_categorias (np.ndarray, opcional): CSR ponto → intervalo em `codigos_categoria`, para pontos
+            em várias categorias (ex.: faixa × gênero principal); o ponto conta em cada uma delas
+
+    Returns:
+        pd.DataFrame: Uma linha por célula ocupada, com 'celula', 'x', 'y'
+            (centro), 'pontos', 'categoria' (código dominante), 'participacao'
+            (fração dos pontos na dominante) e 'exemplos' (posições dos pontos mais relevantes)
+    """
+    codigos_categoria = np.asarray(codigos_categoria)
+    if ptr_categorias is None:
+        ponto_por_par = np.arange(len(codigos_celula))
+    else:
+        ponto_por_par = np.repeat(np.arange(len(codigos_celula)), np.diff(np.asarray(ptr_categorias)))
+    validos = (codigos_celula[ponto_por_par] >= 0) & (codigos_categoria >= 0)
+    dentro = np.unique(ponto_por_par[validos])
+    celula = codigos_celula[dentro]
+    ocupadas, compactas = np.unique(celula, return_inverse=True)
+    pontos = np.bincount(compactas, minlength=len(ocupadas))
+
+    # Contagem célula × categoria em um único bincount (um par por ponto e categoria)
+    celula_por_par = np.searchsorted(ocupadas, codigos_celula[ponto_por_par[validos]])
+    tabela = np.bincount(
+        celula_por_par * num_categorias + codigos_categoria[validos], minlength=len(ocupadas) * num_categorias
+    ).reshape(len(ocupadas), num_categorias)
+
+    # Exemplos: os mais relevantes de cada célula (ordenação por célula e relevância decrescente)
+    ordem = np.lexsort((-relevancia[dentro], compactas))
+    inicios = np.searchsorted(compactas[ordem], np.arange(len(ocupadas)))
+    lista_exemplos = [
+        dentro[ordem[inicio:inicio + min(exemplos, quantidade)]].tolist()
+        for inicio, quantidade in zip(inicios, pontos)
+    ]
+
+    x_min, x_max, y_min, y_max = limites
+    return pd.DataFrame({
+        'celula': ocupadas,
+        'x': x_min + (ocupadas // num_celulas + 0.5) * (x_max - x_min) / num_celulas,
+        'y': y_min + (ocupadas % num_celulas + 0.5) * (y_max - y_min) / num_celulas,
+        'pontos': pontos,
+        'categoria': tabela.argmax(axis=1),
+        'participacao': tabela.max(axis=1) / pontos,
+        'exemplos': lista_exemplos,
+    })
+
+def limites_das_celulas(selecionadas, limites, num_celulas):
+    """
+    Retângulo [x_min, x_max, y_min, y_max] que cobre as células selecionadas (para ampliar a região)
+    """
+    selecionadas = np.asarray(selecionadas)
+    x_min, x_max, y_min, y_max = limites
+    largura_x, largura_y = (x_max - x_min) / num_celulas, (y_max - y_min) / num_celulas
+    colunas, linhas = selecionadas // num_celulas, selecionadas % num_celulas
+    return (
+        float(x_min + colunas.min() * largura_x), float(x_min + (colunas.max() + 1) * largura_x),
+        float(y_min + linhas.min() * largura_y), float(y_min + (linhas.max() + 1) * largura_y),
+    )
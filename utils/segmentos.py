@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+# Dimensões discretas dos segmentos: coluna → rótulo (equivalentes categóricos dos filtros das páginas)
+DIMENSOES_SEGMENTO = {
+    'explicit': 'Conteúdo explícito',
+    'time_signature': 'Assinatura temporal',
+    'modo_musical': 'Modo',
+    'categoria_popularidade': 'Popularidade',
+    'categoria_energia': 'Energia',
+    'categoria_dancabilidade': 'Dançabilidade',
+    'categoria_tempo': 'Tempo (BPM)',
+}
+
+CARACTERISTICAS_SEGMENTO = [
+    'danceability', 'energy', 'valence', 'acousticness', 'instrumentalness',
+    'speechiness', 'liveness', 'tempo', 'loudness'
+]
+
+# Intervalos do histograma de cada feature (sobreposição das distribuições)
+NUM_INTERVALOS = 16
+
+
+def _acumular(chaves, valores, intervalos, num_intervalos):
+    """
+    Momentos e histogramas por chave, só para as chaves ocupadas
+
+    Returns:
+        tuple: (chaves ocupadas, contagens, momentos chaves × features × 2 [Σx, Σx²],
+            histogramas chaves × features × intervalos)
+    """
+    ocupadas, compactas = np.unique(chaves, return_inverse=True)
+    num_chaves, num_features = len(ocupadas), valores.shape[1]
+
+    contagens = np.bincount(compactas, minlength=num_chaves).astype(np.int64)
+    momentos = np.empty((num_chaves, num_features, 2))
+    histogramas = np.empty((num_chaves, num_features, num_intervalos), dtype=np.int32)
+    for j in range(num_features):
+        momentos[:, j, 0] = np.bincount(compactas, weights=valores[:, j], minlength=num_chaves)
+        momentos[:, j, 1] = np.bincount(compactas, weights=valores[:, j] ** 2, minlength=num_chaves)
+        histogramas[:, j] = np.bincount(
+            compactas * num_intervalos + intervalos[:, j], minlength=num_chaves * num_intervalos
+        ).reshape(num_chaves, num_intervalos)
+    return ocupadas, contagens, momentos, histogramas
+
+def construir_momentos(df, indice_generos, num_intervalos=NUM_INTERVALOS):
+    """
+    Estatísticas suficientes (aditivas) das features de áudio por célula de segmento
+
+    Cada célula é uma combinação de valores das `DIMENSOES_SEGMENTO`. Guarda
+    contagem, soma e soma dos quadrados (centradas na média global, para
+    precisão) e um histograma por feature. Como tudo é aditivo, a estatística
+    de qualquer segmento é a soma das células que ele seleciona. Há um cubo
+    sem gênero e outro por gênero (uma faixa conta em cada gênero em que está).
+
+    Args:
+        df (pd.DataFrame): Tabela canônica com as dimensões e as features
+        indice_generos (dict): Índice de gêneros sobre a mesma tabela
+        num_intervalos (int): Intervalos do histograma de cada feature
+
+    Returns:
+        dict: Índice com as chaves:
+            - '<dimensão>' (pd.Index): valores de cada dimensão (código → valor)
+            - 'centros', 'bordas' (np.ndarray): média global e bordas dos histogramas por feature
+            - 'celulas', 'contagens', 'momentos', 'histogramas': cubo sem gênero
+              (chave = código misto das dimensões; momentos = [Σx, Σx²] centrados)
+            - 'celulas_generos', 'contagens_generos', 'momentos_generos', 'histogramas_generos': cubo com gênero
+              (chave = gênero × número de células + célula)
+    """
+    indice = {}
+    chaves = np.zeros(len(df), dtype=np.int64)
+    for dimensao in DIMENSOES_SEGMENTO:
+        # Valores ausentes formam uma célula própria (NaN no fim): o sentinela -1 corromperia o código misto
+        codigos, valores = pd.factorize(df[dimensao], sort=True, use_na_sentinel=False)
+        indice[dimensao] = pd.Index(valores, name=dimensao)
+        chaves = chaves * len(valores) + codigos
+    num_celulas = int(np.prod([len(indice[dimensao]) for dimensao in DIMENSOES_SEGMENTO]))
+
+    valores = df[CARACTERISTICAS_SEGMENTO].to_numpy(dtype=np.float64)
+    centros = valores.mean(axis=0)
+    minimos, maximos = valores.min(axis=0), valores.max(axis=0)
+    bordas = np.linspace(minimos, np.where(maximos > minimos, maximos, minimos + 1), num_intervalos + 1).T
+    intervalos = np.clip(
+        ((valores - bordas[:, 0]) / (bordas[:, -1] - bordas[:, 0]) * num_intervalos).astype(np.int64), 0, num_intervalos - 1
+    )
+    valores -= centros
+
+    indice['celulas'], indice['contagens'], indice['momentos'], indice['histogramas'] = _acumular(
+        chaves, valores, intervalos, num_intervalos
+    )
+
+    # Pares (faixa, gênero) da matriz de pertinência
+    generos_por_faixa = np.diff(indice_generos['faixa_ptr'])
+    faixas = np.repeat(np.arange(len(df)), generos_por_faixa)
+    chaves_generos = np.asarray(indice_generos['faixa_generos'], dtype=np.int64) * num_celulas + chaves[faixas]
+    (indice['celulas_generos'], indice['contagens_generos'], indice['momentos_generos'],
+     indice['histogramas_generos']) = _acumular(
+        chaves_generos, valores[faixas], intervalos[faixas], num_intervalos
+    )
+
+    indice['centros'] = centros
+    indice['bordas'] = bordas
+    return indice
+
+def somar_segmento(momentos, selecao, genero=None):
+    """
+    Soma as células de um segmento
+
+    Args:
+        momentos (dict): Índice de `construir_momentos`
+        selecao (dict): Dimensão → valores aceitos (dimensões ausentes ou vazias aceitam tudo)
+        genero (int, opcional): Código do gênero (no índice de gêneros), ou None para todos
+
+    Returns:
+        tuple: (número de faixas, momentos features × 2, histogramas features × intervalos) do segmento
+    """
+    sufixo = '' if genero is None else '_generos'
+    chaves = np.asarray(momentos[f'celulas{sufixo}'])
+    tamanhos = [len(momentos[dimensao]) for dimensao in DIMENSOES_SEGMENTO]
+    num_celulas = int(np.prod(tamanhos))
+
+    mascara = np.ones(len(chaves), dtype=bool)
+    if genero is not None:
+        mascara = chaves // num_celulas == genero
+    restantes = chaves % num_celulas
+    # Decodifica o código misto da última dimensão para a primeira
+    for dimensao, tamanho in zip(reversed(list(DIMENSOES_SEGMENTO)), reversed(tamanhos)):
+        aceitos = selecao.get(dimensao)
+        if aceitos:
+            mascara &= np.isin(restantes % tamanho, momentos[dimensao].get_indexer(aceitos))
+        restantes //= tamanho
+
+    linhas = np.flatnonzero(mascara)
+    return (
+        int(np.asarray(momentos[f'contagens{sufixo}'])[linhas].sum()),
+        np.asarray(momentos[f'momentos{sufixo}'])[linhas].sum(axis=0),
+        np.asarray(momentos[f'histogramas{sufixo}'])[linhas].sum(axis=0)
+    )
+
+def comparar_segmentos(momentos, segmento_a, segmento_b):
+    """
+    Compara dois segmentos feature a feature a partir das somas de `somar_segmento`
+
+    Returns:
+        pd.DataFrame: Uma linha por feature com médias, desvios-padrão (amostrais),
+            diferença (B - A), d de Cohen (desvio combinado) e sobreposição dos
+            histogramas (Σ min(pA, pB), de 0 a 1)
+    """
+    (n_a, momentos_a, hist_a), (n_b, momentos_b, hist_b) = segmento_a, segmento_b
+
+    def media_e_variancia(n, somas):
+        soma, quadrados = somas[:, 0], somas[:, 1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = soma / n
+            variancia = np.maximum(quadrados - n * media ** 2, 0) / (n - 1)
+        return media + np.asarray(momentos['centros']), variancia
+
+    media_a, var_a = media_e_variancia(n_a, momentos_a)
+    media_b, var_b = media_e_variancia(n_b, momentos_b)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        desvio_combinado = np.sqrt(((n_a - 1) * var_a + (n_b - 1) * var_b) / (n_a + n_b - 2))
+        cohen = (media_b - media_a) / desvio_combinado
+        sobreposicao = np.minimum(
+            hist_a / hist_a.sum(axis=1, keepdims=True), hist_b / hist_b.sum(axis=1, keepdims=True)
+        ).sum(axis=1)
+
+    return pd.DataFrame({
+        'caracteristica': CARACTERISTICAS_SEGMENTO,
+        'media_a': media_a,
+        'media_b': media_b,
+        'desvio_a': np.sqrt(var_a),
+        'desvio_b': np.sqrt(var_b),
+        'diferenca': media_b - media_a,
+        'cohen_d': cohen,
+        'sobreposicao': sobreposicao,
+    })
@@ -0,0 +1,274 @@
+import os
+
+import numpy as np
+from scipy.cluster.hierarchy import leaves_list, linkage
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import pdist, squareform
+from utils.clusters import ELEMENTOS_BLOCO, atribuir_clusters, kmeans_minibatch
+
+# Features de áudio que descrevem o "som" da faixa (tempo e loudness entram padronizados como as demais)
+CARACTERISTICAS_SEMELHANCA = [
+    'danceability', 'energy', 'valence', 'acousticness', 'instrumentalness',
+    'speechiness', 'liveness', 'tempo', 'loudness'
+]
+
+# Acima desse número de faixas a busca passa a ser aproximada (IVF) em vez da KD-tree exata
+LIMITE_BUSCA_EXATA = int(os.environ.get('SPOTIFY_SEMELHANCA_EXATA_MAX', '2000000'))
+# Listas do IVF visitadas por consulta: mais listas, maior recall e maior latência
+SONDAS_PADRAO = 8
+# Vizinhos pré-calculados por artista
+VIZINHOS_ARTISTAS = 20
+
+
+def construir_matriz_caracteristicas(df):
+    """
+    Monta a matriz padronizada (z-score) de features de áudio, contígua e em float32
+
+    Sem a padronização, tempo (BPM) e loudness (dB) dominariam a distância
+    euclidiana sobre as features que vão de 0 a 1.
+
+    Args:
+        df (pd.DataFrame): Faixas com as colunas de `CARACTERISTICAS_SEMELHANCA`
+
+    Returns:
+        dict: Índice com as chaves:
+            - 'matriz' (np.ndarray): faixas × características, float32 C-contígua
+            - 'medias', 'desvios' (np.ndarray): parâmetros da padronização
+    """
+    valores = df[CARACTERISTICAS_SEMELHANCA].to_numpy(dtype=np.float64)
+    medias = np.nanmean(valores, axis=0)
+    desvios = np.nanstd(valores, axis=0)
+    desvios[desvios == 0] = 1.0
+    # Valores ausentes ficam na média (zero depois da padronização)
+    matriz = np.nan_to_num((valores - medias) / desvios, nan=0.0)
+    return {
+        'matriz': np.ascontiguousarray(matriz, dtype=np.float32),
+        'medias': medias,
+        'desvios': desvios,
+    }
+
+def construir_arvore(matriz):
+    """
+    Constrói a KD-tree sobre a matriz padronizada (9 dimensões: bem abaixo do limite em que a árvore degrada)
+    """
+    return cKDTree(matriz, leafsize=32, balanced_tree=False, compact_nodes=True)
+
+def construir_ivf(matriz, num_listas=None, semente=0):
+    """
+    Constrói um índice IVF: as faixas são repartidas em listas pelo centroide mais próximo
+
+    Os centroides vêm de `utils.clusters.kmeans_minibatch`. Os vetores são
+    regravados na ordem das listas, então visitar uma lista é ler um trecho
+    contíguo da matriz.
+
+    Args:
+        matriz (np.ndarray): Matriz de `construir_matriz_caracteristicas`
+        num_listas (int, opcional): Número de listas (padrão: √linhas)
+        semente (int): Semente do k-means
+
+    Returns:
+        dict: Índice com as chaves:
+            - 'centroides' (np.ndarray): listas × características (float32)
+            - 'lista_ptr' (np.ndarray): início de cada lista (CSR)
+            - 'lista_faixas' (np.ndarray): posição original de cada vetor, na ordem das listas
+            - 'vetores' (np.ndarray): vetores na ordem das listas (float32)
+    """
+    if num_listas is None:
+        num_listas = max(1, int(np.sqrt(len(matriz))))
+    centroides = kmeans_minibatch(matriz, num_listas, iteracoes=50, semente=semente)
+    rotulos, _ = atribuir_clusters(matriz, centroides)
+
+    ordem = np.argsort(rotulos, kind='stable').astype(np.int64)
+    lista_ptr = np.zeros(len(centroides) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rotulos, minlength=len(centroides)), out=lista_ptr[1:])
+    return {
+        'centroides': centroides,
+        'lista_ptr': lista_ptr,
+        'lista_faixas': ordem,
+        'vetores': np.ascontiguousarray(matriz[ordem], dtype=np.float32),
+    }
+
+def buscar_ivf(ivf, consultas, k=10, sondas=SONDAS_PADRAO):
+    """
+    K vizinhos aproximados: compara cada consulta só com as faixas das `sondas` listas mais próximas
+
+    Args:
+        ivf (dict): Índice de `construir_ivf`
+        consultas (np.ndarray): Vetores de consulta (consultas × características)
+        k (int): Vizinhos por consulta
+        sondas (int): Listas visitadas por consulta (o ajuste entre recall e latência)
+
+    Returns:
+        tuple: (distâncias, posições) com forma (consultas, k); faltando
+            candidatos, as posições vêm como -1 e as distâncias como infinito
+    """
+    consultas = np.atleast_2d(np.asarray(consultas, dtype=np.float32))
+    centroides, ptr = ivf['centroides'], ivf['lista_ptr']
+    sondas = min(sondas, len(centroides))
+
+    distancias = np.full((len(consultas), k), np.inf, dtype=np.float32)
+    posicoes = np.full((len(consultas), k), -1, dtype=np.int64)
+    parciais = (centroides ** 2).sum(axis=1) - 2 * (consultas @ centroides.T)
+    listas = np.argpartition(parciais, sondas - 1, axis=1)[:, :sondas]
+
+    for i, consulta in enumerate(consultas):
+        trechos = [slice(ptr[lista], ptr[lista + 1]) for lista in listas[i]]
+        vetores = np.concatenate([ivf['vetores'][trecho] for trecho in trechos])
+        candidatas = np.concatenate([ivf['lista_faixas'][trecho] for trecho in trechos])
+        quadrados = ((vetores - consulta) ** 2).sum(axis=1)
+        quantos = min(k, len(candidatas))
+        melhores = np.argpartition(quadrados, quantos - 1)[:quantos] if quantos < len(candidatas) else np.arange(quantos)
+        melhores = melhores[np.argsort(quadrados[melhores], kind='stable')]
+        distancias[i, :quantos] = np.sqrt(quadrados[melhores])
+        posicoes[i, :quantos] = candidatas[melhores]
+    return distancias, posicoes
+
+def faixas_semelhantes(indice, sementes, k=10, sondas=SONDAS_PADRAO):
+    """
+    Vizinhos mais próximos de várias faixas em uma única chamada
+
+    Usa a KD-tree (exata) ou, em catálogos acima de `LIMITE_BUSCA_EXATA`,
+    o IVF (aproximado, ajustado por `sondas`).
+
+    Args:
+        indice (dict): Índice de `utils.carrega_dados.carregar_indice_semelhanca`
+        sementes (array-like): Posições das faixas de referência
+        k (int): Vizinhos por semente
+        sondas (int): Listas visitadas no modo aproximado
+
+    Returns:
+        tuple: (posições, distâncias), ambos com forma (len(sementes), k), do
+            mais para o menos semelhante; a própria semente não entra
+    """
+    sementes = np.asarray(sementes, dtype=np.int64)
+    if len(sementes) == 0:
+        return np.empty((0, k), dtype=np.int64), np.empty((0, k), dtype=np.float32)
+
+    # Um vizinho a mais para descartar a própria semente (ou uma duplicata exata dela)
+    matriz = indice['matriz']
+    quantos = min(k + 1, len(matriz))
+    if 'ivf' in indice:
+        distancias, posicoes = buscar_ivf(indice['ivf'], matriz[sementes], quantos, sondas)
+    else:
+        distancias, posicoes = indice['arvore'].query(matriz[sementes], k=quantos, workers=-1)
+    distancias = distancias.reshape(len(sementes), -1)
+    posicoes = posicoes.reshape(len(sementes), -1)
+    propria = posicoes == sementes[:, None]
+    # Sem a semente entre os vizinhos (empates), descarta o último
+    propria[~propria.any(axis=1), -1] = True
+    manter = ~propria
+    return (
+        posicoes[manter].reshape(len(sementes), -1)[:, :k],
+        distancias[manter].reshape(len(sementes), -1)[:, :k].astype(np.float32)
+    )
+
+def combinar_vizinhos(posicoes, distancias, sementes, k=10):
+    """
+    Junta os vizinhos de várias sementes: cada faixa fica com a menor distância a alguma semente
+
+    Returns:
+        tuple: (posições, distâncias, índice da semente mais próxima), até `k` faixas
+            que não são sementes, da mais para a menos semelhante
+    """
+    sementes = np.asarray(sementes, dtype=np.int64)
+    origem = np.repeat(np.arange(len(sementes)), posicoes.shape[1])
+    posicoes, distancias = posicoes.ravel(), distancias.ravel()
+
+    ordem = np.argsort(distancias, kind='stable')
+    posicoes, distancias, origem = posicoes[ordem], distancias[ordem], origem[ordem]
+    _, primeiras = np.unique(posicoes, return_index=True)
+    primeiras = np.sort(primeiras)
+    primeiras = primeiras[~np.isin(posicoes[primeiras], sementes) & (posicoes[primeiras] >= 0)][:k]
+    return posicoes[primeiras], distancias[primeiras], origem[primeiras]
+
+def perfis_artistas(matriz, indice_artistas):
+    """
+    Perfil de cada artista: média das features padronizadas das suas faixas (incluindo participações)
+
+    Args:
+        matriz (np.ndarray): Matriz de `construir_matriz_caracteristicas`
+        indice_artistas (dict): Índice de `utils.indices.construir_ponte_artistas`
+
+    Returns:
+        np.ndarray: Artistas × características (float32), na ordem dos códigos de artista
+    """
+    ptr = np.asarray(indice_artistas['artista_ptr'])
+    somas = np.add.reduceat(np.asarray(matriz, dtype=np.float64)[indice_artistas['artista_faixas']], ptr[:-1], axis=0)
+    return (somas / np.diff(ptr)[:, None]).astype(np.float32)
+
+def vizinhos_cosseno(vetores, k=VIZINHOS_ARTISTAS):
+    """
+    Top-k vizinhos de cada linha pela similaridade de cosseno, em multiplicações por blocos
+
+    Só uma matriz bloco × linhas existe de cada vez (`ELEMENTOS_BLOCO`
+    elementos), então a memória não cresce com o quadrado do número de linhas.
+
+    Args:
+        vetores (np.ndarray): Linhas × dimensões (ex.: perfis de artistas)
+        k (int): Vizinhos por linha
+
+    Returns:
+        dict: Índice com as chaves:
+            - 'vizinhos' (np.ndarray): linhas × k códigos (int32), do mais para o menos semelhante
+            - 'similaridades' (np.ndarray): linhas × k cossenos (float32)
+    """
+    vetores = np.asarray(vetores, dtype=np.float32)
+    normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+    unitarios = vetores / np.where(normas > 0, normas, 1)
+    total = len(unitarios)
+    k = min(k, total - 1)
+
+    vizinhos = np.empty((total, max(k, 0)), dtype=np.int32)
+    similaridades = np.empty((total, max(k, 0)), dtype=np.float32)
+    # Com menos de duas linhas (ou k = 0) ninguém tem vizinho: argpartition receberia k - 1 < 0
+    if k < 1:
+        return {'vizinhos': vizinhos, 'similaridades': similaridades}
+    tamanho_bloco = max(1, ELEMENTOS_BLOCO // max(total, 1))
+    for inicio in range(0, total, tamanho_bloco):
+        bloco = unitarios[inicio:inicio + tamanho_bloco] @ unitarios.T
+        linhas = np.arange(len(bloco))
+        bloco[linhas, inicio + linhas] = -np.inf  # a própria linha não é vizinha
+        melhores = np.argpartition(-bloco, k - 1, axis=1)[:, :k]
+        valores = np.take_along_axis(bloco, melhores, axis=1)
+        ordem = np.argsort(-valores, axis=1, kind='stable')
+        vizinhos[inicio:inicio + len(bloco)] = np.take_along_axis(melhores, ordem, axis=1)
+        similaridades[inicio:inicio + len(bloco)] = np.take_along_axis(valores, ordem, axis=1)
+    return {'vizinhos': vizinhos, 'similaridades': similaridades}
+
+def distancias_generos(matriz, indice_generos):
+    """
+    Distâncias entre gêneros pela distribuição das features e o agrupamento hierárquico deles
+
+    Cada gênero é resumido pela média e pelo desvio padrão de cada feature
+    padronizada das suas faixas. A distância entre dois gêneros é a de
+    Wasserstein-2 entre gaussianas diagonais, que é a euclidiana no espaço
+    [médias, desvios]; por isso o agrupamento pode usar o método de Ward.
+
+    Args:
+        matriz (np.ndarray): Matriz de `construir_matriz_caracteristicas`
+        indice_generos (dict): Índice de `utils.indices.construir_pertinencia_generos`
+
+    Returns:
+        dict: Índice com as chaves:
+            - 'generos' (pd.Index): gêneros, na ordem dos códigos
+            - 'medias', 'desvios' (np.ndarray): gêneros × características
+            - 'distancias' (np.ndarray): matriz gêneros × gêneros (float32)
+            - 'ligacoes' (np.ndarray): matriz de ligação do SciPy (Ward)
+            - 'ordem' (np.ndarray): códigos na ordem das folhas do dendrograma
+    """
+    ptr = np.asarray(indice_generos['genero_ptr'])
+    valores = np.asarray(matriz, dtype=np.float64)[indice_generos['genero_faixas']]
+    contagens = np.maximum(np.diff(ptr), 1)[:, None]
+    medias = np.add.reduceat(valores, ptr[:-1], axis=0) / contagens
+    desvios = np.sqrt(np.maximum(np.add.reduceat(valores ** 2, ptr[:-1], axis=0) / contagens - medias ** 2, 0))
+
+    perfis = np.hstack([medias, desvios])
+    ligacoes = linkage(perfis, method='ward')
+    return {
+        'generos': indice_generos['generos'],
+        'medias': medias,
+        'desvios': desvios,
+        'distancias': squareform(pdist(perfis)).astype(np.float32),
+        'ligacoes': ligacoes,
+        'ordem': leaves_list(ligacoes),
+    }